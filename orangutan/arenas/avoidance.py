@@ -5,7 +5,8 @@ import numpy as np
 from animalai.envs.arena_config import Vector3, RGB, Item, Arena, ArenaConfig
 
 from orangutan.arenas.utils import GRAY, PINK, BLUE
-from orangutan.arenas.geometry import detect_collisions, CollisionDetected
+from orangutan.arenas.placement import place_items, get_items_sampler
+from orangutan.arenas.occupancy import OccupancyGrid
 from orangutan.arenas.obstacles import (
     _add_obstacles_to_arena,
     _add_badgoals_to_arena,
@@ -16,22 +17,23 @@ from orangutan.arenas.obstacles import (
     _add_random_box,
     _add_random_wooden_object,
     _split_arena_in_two,
-    _split_arena_in_four
+    _split_arena_in_four,
+    _add_items
 )
 
 DEFAULT_TIME_LIMIT = 500
 DEFAULT_REWARD = 2
 
-def create_arena_with_obstacles_and_deathzones(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_obstacles_and_deathzones(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_rewards_to_arena(arena)
-    _add_zones_to_arena(arena, np.random.randint(2, 5))
-    _add_agent_to_arena(arena)
-    _add_obstacles_to_arena(arena, np.random.randint(5, 10))
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
+    _add_rewards_to_arena(arena, random_state=random_state)
+    _add_zones_to_arena(arena, random_state.randint(2, 5), random_state=random_state)
+    _add_agent_to_arena(arena, random_state=random_state)
+    _add_obstacles_to_arena(arena, random_state.randint(5, 10), random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
     return arena
 
-def _add_rewards_to_arena(arena):
+def _add_rewards_to_arena(arena, random_state=np.random):
     funcs = {
         0: _add_goal_on_top_of_platform,
         1: _add_goal_on_top_of_box,
@@ -39,152 +41,123 @@ def _add_rewards_to_arena(arena):
         3: _add_goal_above_hot_zone,
         4: _add_simple_goal,
     }
-    func_keys = np.short(np.random.randint(0, np.max(list(funcs.keys()))+1, 2))
+    occupancy_grid = OccupancyGrid(arena.items)
+    func_keys = np.short(random_state.randint(0, np.max(list(funcs.keys()))+1, 2))
     for key in func_keys:
-        funcs[key](arena)
-    if np.random.uniform() < 0.2:
-        _add_goal_on_top_of_platform(arena, empty_platform=True)
+        funcs[key](arena, occupancy_grid=occupancy_grid, random_state=random_state)
+    if random_state.uniform() < 0.2:
+        _add_goal_on_top_of_platform(arena, empty_platform=True, occupancy_grid=occupancy_grid,
+                                     random_state=random_state)
     # commented because the episode did not end because of that goal
-    # if np.random.uniform() > 0.2:
+    # if random_state.uniform() > 0.2:
     #     _add_goal_above_death_zone(arena)
 
-def _add_simple_goal(arena):
-    while 1:
-        try:
-            x, z = np.random.uniform(1, 39, 2).tolist()
-            goal = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], rotations=[0])
-            goal.positions = [Vector3(x, 0, z)]
-            detect_collisions(goal, arena.items)
-            arena.items.append(goal)
-            break
-        except CollisionDetected:
-            pass
+def _add_simple_goal(arena, occupancy_grid=None, random_state=np.random):
+    goal, = place_items(get_items_sampler(
+        lambda: [Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], rotations=[0])],
+        border_distance=1, occupancy_grid=occupancy_grid, random_state=random_state), arena.items)
+    _add_items(arena, [goal], occupancy_grid)
 
-def _add_goal_above_hot_zone(arena):
-    while 1:
-        try:
-            zone = _create_random_zone(['HotZone'])
-            border_distance = np.max([zone.sizes[0].x, zone.sizes[0].z])*1.2
-            x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-            zone.positions = [Vector3(x, 0, z)]
-            detect_collisions(zone, arena.items)
-            arena.items.append(zone)
-            break
-        except CollisionDetected:
-            pass
+def _add_goal_above_hot_zone(arena, occupancy_grid=None, random_state=np.random):
+    zone, = place_items(get_items_sampler(lambda: [_create_random_zone(['HotZone'], random_state)],
+                                          occupancy_grid=occupancy_grid,
+                                          random_state=random_state), arena.items)
+    x, z = zone.positions[0].x, zone.positions[0].z
     goal = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], positions=[Vector3(x, 0, z)])
-    arena.items.append(goal)
+    _add_items(arena, [zone, goal], occupancy_grid)
 
-def _add_goal_above_death_zone(arena):
-    while 1:
-        try:
-            zone = _create_random_zone(['DeathZone'])
-            border_distance = np.max([zone.sizes[0].x, zone.sizes[0].z])*1.2
-            x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-            zone.positions = [Vector3(x, 0, z)]
-            detect_collisions(zone, arena.items)
-            arena.items.append(zone)
-            break
-        except CollisionDetected:
-            pass
-    name = str(np.random.choice(['GoodGoalMulti', 'GoodGoal']))
+def _add_goal_above_death_zone(arena, random_state=np.random):
+    zone, = place_items(get_items_sampler(lambda: [_create_random_zone(['DeathZone'], random_state)],
+                                          random_state=random_state), arena.items)
+    arena.items.append(zone)
+    x, z = zone.positions[0].x, zone.positions[0].z
+    name = str(random_state.choice(['GoodGoalMulti', 'GoodGoal']))
     goal = Item(name=name, sizes=[Vector3(*[1]*3)], positions=[Vector3(x, 0, z)])
     arena.items.append(goal)
 
-def _add_zones_to_arena(arena, n_zones):
+def _add_zones_to_arena(arena, n_zones, random_state=np.random):
+    occupancy_grid = OccupancyGrid(arena.items)
     for _ in range(n_zones):
-        while 1:
-            try:
-                zone = _create_random_zone()
-                border_distance = np.max([zone.sizes[0].x, zone.sizes[0].z])*1.2
-                x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-                zone.positions = [Vector3(x, 0, z)]
-                detect_collisions(zone, arena.items)
-                arena.items.append(zone)
-                break
-            except CollisionDetected:
-                pass
+        zone, = place_items(get_items_sampler(lambda: [_create_random_zone(random_state=random_state)],
+                                              occupancy_grid=occupancy_grid,
+                                              random_state=random_state), arena.items)
+        arena.items.append(zone)
+        occupancy_grid.add(zone)
 
-def _create_random_zone(zone_types=None):
+def _create_random_zone(zone_types=None, random_state=np.random):
     if zone_types is None:
         zone_types = ['DeathZone', 'HotZone']
-    name = str(np.random.choice(zone_types))
-    sizes = [Vector3(*np.random.randint(2, 10, 3).tolist())]
-    item = Item(name=name, sizes=sizes, rotations=[float(np.random.randint(0, 360))])
+    name = str(random_state.choice(zone_types))
+    sizes = [Vector3(*random_state.randint(2, 10, 3).tolist())]
+    item = Item(name=name, sizes=sizes, rotations=[float(random_state.randint(0, 360))])
     return item
 
-def _add_agent_to_arena(arena):
-    while 1:
-        try:
-            x, z = np.random.uniform(1, 39, 2).tolist()
-            goal = Item(name='Agent', sizes=[Vector3(*[1]*3)])
-            goal.positions = [Vector3(x, 0, z)]
-            detect_collisions(goal, arena.items)
-            arena.items.append(goal)
-            break
-        except CollisionDetected:
-            pass
+def _add_agent_to_arena(arena, random_state=np.random):
+    agent, = place_items(get_items_sampler(
+        lambda: [Item(name='Agent', sizes=[Vector3(*[1]*3)])], border_distance=1,
+        random_state=random_state), arena.items)
+    arena.items.append(agent)
 
 """
 More levels
 """
 
-def create_center_blocked_arena_deathzone(t):
+def create_center_blocked_arena_deathzone(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_center_blocking_wall(arena)
+    _add_center_blocking_wall(arena, random_state=random_state)
     for item in arena.items:
         item.name = 'DeathZone'
-    _add_agent_to_arena(arena)
+    _add_agent_to_arena(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 6)):
-        _add_random_box(arena)
-    if np.random.randint(0, 2):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 6)):
+        _add_random_box(arena, random_state=random_state)
+    if random_state.randint(0, 2):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def create_arena_splitted_in_two_deathzone(t):
+def create_arena_splitted_in_two_deathzone(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_two(arena)
+    _split_arena_in_two(arena, random_state=random_state)
     for item in arena.items:
         item.name = 'DeathZone'
-    _add_agent_to_arena(arena)
+    _add_agent_to_arena(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def create_arena_splitted_in_four_deathzone(t):
+def create_arena_splitted_in_four_deathzone(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_four(arena)
+    _split_arena_in_four(arena, random_state=random_state)
     for item in arena.items:
         item.name = 'DeathZone'
-    _add_agent_to_arena(arena)
+    _add_agent_to_arena(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def create_arena_splitted_in_two_with_path_blocked_deathzone(t):
+def create_arena_splitted_in_two_with_path_blocked_deathzone(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_two(arena, block_path=True)
+    _split_arena_in_two(arena, block_path=True, random_state=random_state)
     for item in arena.items[:-1]:
         item.name = 'DeathZone'
-    _add_agent_to_arena(arena)
+    _add_agent_to_arena(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
\ No newline at end of file
@@ -3,60 +3,61 @@ Functions for creating arenas for food category
 """
 import numpy as np
 import os
-from animalai.envs.arena_config import Vector3, RGB, Item, Arena, ArenaConfig
-import copy
+from animalai.envs.arena_config import Vector3, RGB, Item, Arena
 
 from orangutan.arenas.geometry import get_angle_looking_center, get_random_position, normalize_angle, get_position_in_front_of_agent, get_random_position_close_to_center
+from orangutan.arenas.utils import LazyArenaTemplates
 
 DEFAULT_TIME_LIMIT = 500
 DEFAULT_REWARD = 2
 
-FOOD_HANDWRITTEN_ARENAS = ArenaConfig(
-    os.path.join(os.path.dirname(os.path.realpath(__file__)), 'food.yaml')).arenas
+FOOD_HANDWRITTEN_ARENAS = LazyArenaTemplates(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), 'food.yaml'))
 
-def create_arena_with_green_and_yellow_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_green_and_yellow_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
-    size = np.random.uniform(0.5, DEFAULT_REWARD - 0.5)
-    angle_yellow = angle + np.random.randint(-20, 21)
+    size = random_state.uniform(0.5, DEFAULT_REWARD - 0.5)
+    angle_yellow = angle + random_state.randint(-20, 21)
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_yellow, goal_type='GoodGoalMulti',
-        min_distance=5, max_distance=20, size=size))
+        min_distance=5, max_distance=20, size=size, random_state=random_state))
     size = DEFAULT_REWARD - size
-    angle_green = angle + np.random.randint(-20, 21)
+    angle_green = angle + random_state.randint(-20, 21)
     while abs(angle_yellow - angle_green) < 5:
-        angle_green = angle + np.random.randint(-20, 21)
+        angle_green = angle + random_state.randint(-20, 21)
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_green, goal_type='GoodGoal',
-        min_distance=5, max_distance=20, size=size))
+        min_distance=5, max_distance=20, size=size, random_state=random_state))
     return arena
 
-def create_arena_with_red_goal_coming(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_red_goal_coming(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_closer_to_center()
+    agent, x, z, angle = _create_agent_looking_center_closer_to_center(random_state=random_state)
 
     arena.items.append(agent)
     arena.items.append(_create_goal_in_front_of_agent(
-        x, z, angle, goal_type='BadGoalBounce', min_distance=15, max_distance=20))
-    arena = _add_reward_to_arena(arena)
+        x, z, angle, goal_type='BadGoalBounce', min_distance=15, max_distance=20, random_state=random_state))
+    arena = _add_reward_to_arena(arena, random_state=random_state)
     return arena
 
-def create_arena_with_red_wall(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_red_wall(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    orientation = np.random.choice(['horizontal', 'vertical'])
-    goal_size = float(np.random.choice([1, 2, 3]))
-    _add_wall_to_arena(arena, orientation='horizontal', position=np.random.randint(10, 30), goal_size=goal_size)
+    orientation = random_state.choice(['horizontal', 'vertical'])
+    goal_size = float(random_state.choice([1, 2, 3]))
+    _add_wall_to_arena(arena, orientation='horizontal', position=random_state.randint(10, 30), goal_size=goal_size,
+                       random_state=random_state)
     if orientation == 'horizontal':
         arena.items.append(Item(name='GoodGoalMulti', sizes=[Vector3(1,1,1)]*2,
-        positions=[Vector3(-1,0, float(np.random.randint(1, 7))), Vector3(-1,0, 40 - float(np.random.randint(1, 7)))]))
+        positions=[Vector3(-1,0, float(random_state.randint(1, 7))), Vector3(-1,0, 40 - float(random_state.randint(1, 7)))]))
     else:
         arena.items.append(Item(name='GoodGoalMulti', sizes=[Vector3(1,1,1)]*2,
-        positions=[Vector3(float(np.random.randint(1, 7)), 0, -1), Vector3(40 - float(np.random.randint(1, 7)), 0, -1)]))
+        positions=[Vector3(float(random_state.randint(1, 7)), 0, -1), Vector3(40 - float(random_state.randint(1, 7)), 0, -1)]))
     return arena
 
-def create_arena_with_red_houses(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_red_houses(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
     centers, radiuses = [], []
 
@@ -64,53 +65,55 @@ def create_arena_with_red_houses(t=DEFAULT_TIME_LIMIT):
         not_good_center = True
         while not_good_center:
             not_good_center = False
-            radius = np.random.uniform(2, 4)
-            center = np.random.randint(5, 35, 2)
+            radius = random_state.uniform(2, 4)
+            center = random_state.randint(5, 35, 2)
             for _center, _radius in zip(centers, radiuses):
                 distance = np.sqrt(np.sum((center - _center)**2))
                 if distance < radius + _radius + 4:
                     not_good_center = True
         centers.append(center)
         radiuses.append(radius)
-        goal_size = float(np.random.uniform(1, 2))
-        _add_red_circle_to_arena(arena, center=center, radius=radius, goal_size=goal_size)
+        goal_size = float(random_state.uniform(1, 2))
+        _add_red_circle_to_arena(arena, center=center, radius=radius, goal_size=goal_size,
+                                 random_state=random_state)
         if idx < 2:
             arena.items.append(Item(name='GoodGoalMulti', sizes=[Vector3(1,1,1)],
                                     positions=[Vector3(center[0], 0, center[1])]))
     return arena
 
-def create_arena_with_small_goal(t):
+def create_arena_with_small_goal(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    if np.random.randint(0, 2):
+    if random_state.randint(0, 2):
         arena.items.append(Item(name='GoodGoalMulti', sizes=[Vector3(0.5, 0.5, 0.5)]))
     else:
         arena.items.append(Item(name='GoodGoal', sizes=[Vector3(0.5, 0.5, 0.5)]))
     return arena
 
-def create_arena_with_bouncing_goal(t):
+def create_arena_with_bouncing_goal(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    size = float(np.random.choice([0.5, 1]))
-    if np.random.randint(0, 2):
+    size = float(random_state.choice([0.5, 1]))
+    if random_state.randint(0, 2):
         arena.items.append(Item(name='GoodGoalMultiBounce', sizes=[Vector3(size, size, size)]))
     else:
         arena.items.append(Item(name='GoodGoalBounce', sizes=[Vector3(size, size, size)]))
     return arena
 
-def _create_agent_looking_center_at_random_position():
-    x, z = get_random_position()
+def _create_agent_looking_center_at_random_position(random_state=np.random):
+    x, z = get_random_position(random_state=random_state)
     angle = get_angle_looking_center(x, z)
     agent = Item(name='Agent', positions=[Vector3(x, 0, z)], rotations=[angle])
     return agent, x, z, angle
 
-def _create_agent_looking_center_closer_to_center():
-    x, z = get_random_position_close_to_center()
+def _create_agent_looking_center_closer_to_center(random_state=np.random):
+    x, z = get_random_position_close_to_center(random_state=random_state)
     angle = get_angle_looking_center(x, z)
     agent = Item(name='Agent', positions=[Vector3(x, 0, z)], rotations=[angle])
     return agent, x, z, angle
 
-def _create_goal_in_front_of_agent(x, z, angle, goal_type='BadGoalBounce', min_distance=15, max_distance=20, size=-1):
+def _create_goal_in_front_of_agent(x, z, angle, goal_type='BadGoalBounce', min_distance=15, max_distance=20, size=-1,
+                                   random_state=np.random):
     while 1:
-        distance = np.random.randint(min_distance, max_distance)
+        distance = random_state.randint(min_distance, max_distance)
         x_new, z_new = get_position_in_front_of_agent(x, z, angle, distance)
         if x_new > 0 + size/2 and x_new < 40 - size/2 and z_new > 0 + size/2 and z_new < 40 - size/2:
             break
@@ -118,10 +121,10 @@ def _create_goal_in_front_of_agent(x, z, angle, goal_type='BadGoalBounce', min_d
                 rotations=[normalize_angle(angle+180)])
     return goal
 
-def _add_reward_to_arena(arena, reward=DEFAULT_REWARD):
+def _add_reward_to_arena(arena, reward=DEFAULT_REWARD, random_state=np.random):
     remaining_reward = reward
     while remaining_reward:
-        new_reward = np.random.uniform(0, remaining_reward)
+        new_reward = random_state.uniform(0, remaining_reward)
         if new_reward < 0.5:
             new_reward = 0.5
         if remaining_reward - new_reward < 0.5:
@@ -131,9 +134,9 @@ def _add_reward_to_arena(arena, reward=DEFAULT_REWARD):
         arena.items.append(goal)
     return arena
 
-def _add_wall_to_arena(arena, orientation, position, goal_size):
+def _add_wall_to_arena(arena, orientation, position, goal_size, random_state=np.random):
     x_range = np.linspace(goal_size/2, 40 - goal_size/2, int((40 - goal_size)/(goal_size + 0.5))).tolist()
-    x_range.pop(np.random.randint(len(x_range)))
+    x_range.pop(random_state.randint(len(x_range)))
     if orientation == 'horizontal':
         positions = [Vector3(float(position), 0, float(z)) for z in x_range]
     elif orientation == 'vertical':
@@ -144,11 +147,11 @@ def _add_wall_to_arena(arena, orientation, position, goal_size):
     goal = Item(name='BadGoal', sizes=sizes, positions=positions)
     arena.items.append(goal)
 
-def _add_red_circle_to_arena(arena, center, radius, goal_size):
+def _add_red_circle_to_arena(arena, center, radius, goal_size, random_state=np.random):
     theta_range = np.linspace(0, np.pi*2, int((2*np.pi*radius)/(goal_size + 0.5)), endpoint=False)
-    theta_range += np.random.uniform(0, np.pi)
+    theta_range += random_state.uniform(0, np.pi)
     theta_range = theta_range.tolist()
-    theta_range.pop(np.random.randint(len(theta_range)))
+    theta_range.pop(random_state.randint(len(theta_range)))
     positions = [Vector3(float(radius*np.cos(theta) + center[0]), 0, float(radius*np.sin(theta)+ center[1])) for theta in theta_range]
     sizes = [Vector3(goal_size, goal_size, goal_size)]*len(positions)
     goal = Item(name='BadGoal', sizes=sizes, positions=positions)
@@ -158,37 +161,23 @@ def _add_red_circle_to_arena(arena, center, radius, goal_size):
 Handwritten levels
 """
 
-def create_arena_with_4_goodgoalmulti(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[0])
-    arena.t = t
-    return arena
+def create_arena_with_4_goodgoalmulti(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[0].create(t=t)
 
-def create_arena_with_4_goodgoalmultibounce(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[1])
-    arena.t = t
-    return arena
+def create_arena_with_4_goodgoalmultibounce(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[1].create(t=t)
 
-def create_arena_with_15_badgoal_labyrinth(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[2])
-    arena.t = t
-    return arena
+def create_arena_with_15_badgoal_labyrinth(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[2].create(t=t)
 
-def create_arena_with_30_badgoal_labyrinth(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[3])
-    arena.t = t
-    return arena
+def create_arena_with_30_badgoal_labyrinth(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[3].create(t=t)
 
-def create_arena_with_5_badgoalbounce_labyrinth(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[4])
-    arena.t = t
-    return arena
+def create_arena_with_5_badgoalbounce_labyrinth(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[4].create(t=t)
 
-def create_arena_with_10_badgoalbounce_labyrinth(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[5])
-    arena.t = t
-    return arena
+def create_arena_with_10_badgoalbounce_labyrinth(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[5].create(t=t)
 
-def create_arena_with_15_badgoalbounce_labyrinth(t):
-    arena= copy.deepcopy(FOOD_HANDWRITTEN_ARENAS[6])
-    arena.t = t
-    return arena
\ No newline at end of file
+def create_arena_with_15_badgoalbounce_labyrinth(t, random_state=np.random):
+    return FOOD_HANDWRITTEN_ARENAS[6].create(t=t)
\ No newline at end of file
@@ -1,7 +1,13 @@
 """
 Functions for generalization levels
 """
+import copy
 
 def remove_color_information(arena):
-    for item in arena.items:
-        item.colors = []
+    # Items may be shared with other arenas, so they are copied instead of modified
+    arena.items = [_copy_item_without_colors(item) for item in arena.items]
+
+def _copy_item_without_colors(item):
+    item = copy.copy(item)
+    item.colors = []
+    return item
@@ -24,6 +24,7 @@ create_arena_with_red_wall
 ## 8
 
 """
+from multiprocessing import Pool
 import numpy as np
 from animalai.envs.arena_config import ArenaConfig
 
@@ -125,7 +126,18 @@ GENERALIZATION_FUNC_WEIGHTS = OBSTACLES_FUNC_WEIGHTS[:7] + AVOIDANCE_FUNC_WEIGHT
 INTERNAL_MODELS_FUNC_WEIGHTS = FOOD_FUNC_WEIGHTS + OBSTACLES_FUNC_WEIGHTS + AVOIDANCE_FUNC_WEIGHTS
 INTERNAL_MODELS_FUNC_WEIGHTS = [(ret[0], int(ret[1]//4)) for ret in INTERNAL_MODELS_FUNC_WEIGHTS]
 
-def generate_arena_config(t, n):
+# name, funcs_weights and options for creating the arenas of each category
+CATEGORIES = [
+    ('food', FOOD_FUNC_WEIGHTS, dict()),
+    ('preferences', PREFERENCES_FUNC_WEIGHTS, dict()),
+    ('obstacles', OBSTACLES_FUNC_WEIGHTS, dict()),
+    ('avoidance', AVOIDANCE_FUNC_WEIGHTS, dict()),
+    ('spatial_reasoning', SPATIAL_REASONING_FUNC_WEIGHTS, dict()),
+    ('generalization', GENERALIZATION_FUNC_WEIGHTS, dict(remove_color=True)),
+    ('internal_models', INTERNAL_MODELS_FUNC_WEIGHTS, dict(add_blackouts=True)),
+]
+
+def generate_arena_config(t, n, seed=None, n_jobs=1):
     """
     Creates an ArenaConfig object
 
@@ -135,39 +147,207 @@ def generate_arena_config(t, n):
         Max number of steps on the level
     n : int
         Controls the size of the generated arena, the bigger n the bigger the number of arenas
+    seed : int
+        Master seed, each arena is created with its own seed drawn from it so the result
+        does not depend on n_jobs. If None it is drawn from np.random
+    n_jobs : int
+        Number of processes used to create the arenas
     """
     _summarize_funcs_weights()
+    if seed is None:
+        seed = np.random.randint(2**31)
+    random_state = np.random.RandomState(seed)
+    tasks = []
+    for _, funcs_weights, options in CATEGORIES:
+        tasks.extend(_get_tasks_using_functions_and_weights(funcs_weights, t, n, **options))
+    seeds = random_state.randint(2**31, size=len(tasks))
+    tasks = [task + (int(task_seed),) for task, task_seed in zip(tasks, seeds)]
+    if n_jobs == 1:
+        arenas = [_create_arena_from_task(task) for task in tasks]
+    else:
+        with Pool(n_jobs) as pool:
+            chunksize = max(1, len(tasks)//(n_jobs*4))
+            arenas = pool.map(_create_arena_from_task, tasks, chunksize=chunksize)
     arena_config = ArenaConfig()
-    _add_arenas_using_functions_and_weights(arena_config, FOOD_FUNC_WEIGHTS, t, n)
-    _add_arenas_using_functions_and_weights(arena_config, PREFERENCES_FUNC_WEIGHTS, t, n)
-    _add_arenas_using_functions_and_weights(arena_config, OBSTACLES_FUNC_WEIGHTS, t, n)
-    _add_arenas_using_functions_and_weights(arena_config, AVOIDANCE_FUNC_WEIGHTS, t, n)
-    _add_arenas_using_functions_and_weights(arena_config, SPATIAL_REASONING_FUNC_WEIGHTS, t, n)
-    _add_arenas_using_functions_and_weights(arena_config, GENERALIZATION_FUNC_WEIGHTS, t, n,
-                                            remove_color=True)
-    _add_arenas_using_functions_and_weights(arena_config, INTERNAL_MODELS_FUNC_WEIGHTS, t, n,
-                                            add_blackouts=True)
-    _shuffle_arenas(arena_config)
+    for idx, arena_idx in enumerate(random_state.permutation(len(arenas))):
+        arena_config.arenas[idx] = arenas[arena_idx]
     return arena_config
 
-def _shuffle_arenas(arena_config):
-    arenas_copy = arena_config.arenas.copy()
-    keys = list(arena_config.arenas.keys())
-    np.random.shuffle(keys)
-    for key, new_key in zip(arena_config.arenas, keys):
-        arena_config.arenas[key] = arenas_copy[new_key]
+def generate_arenas(t, n_arenas=None, seed=None, categories=CATEGORIES):
+    """
+    Yields arenas one by one, sampling the functions with the same proportions as
+    generate_arena_config. Unlike generate_arena_config the arenas are not kept in memory.
+
+    Parameters
+    ----------
+    t : int
+        Max number of steps on the level
+    n_arenas : int
+        Number of arenas to yield, if None it never stops
+    seed : int
+        Seed used for sampling the functions and the seed of each arena
+    categories : list
+        List of (name, funcs_weights, options) as CATEGORIES
+    """
+    arena_sampler = ArenaSampler(t, categories, seed)
+    n_yielded = 0
+    while n_arenas is None or n_yielded < n_arenas:
+        yield arena_sampler.create_arena()
+        n_yielded += 1
+
+class ArenaSampler(object):
+    '''
+    Samples the function used to create each arena by its weight
+
+    It uses an alias table so each draw is O(1) and the weights can be changed at any
+    time with set_weights. It can be given to EnvWrapper.reset instead of an ArenaConfig.
+    '''
+    def __init__(self, t, categories=CATEGORIES, seed=None):
+        """
+        Parameters
+        ----------
+        t : int
+            Max number of steps on the level
+        categories : list
+            List of (name, funcs_weights, options) as CATEGORIES
+        seed : int
+            Seed used for sampling the functions and the seed of each arena
+        """
+        self._t = t
+        self._keys, self._tasks, weights = [], [], []
+        for name, funcs_weights, options in categories:
+            for func, weight in funcs_weights:
+                self._keys.append((name, func.__name__))
+                self._tasks.append((func, t, options.get('remove_color', False),
+                                    options.get('add_blackouts', False)))
+                weights.append(weight)
+        self._random_state = np.random.RandomState(seed)
+        self._weights = np.array(weights, dtype=np.float64)
+        self._probabilities, self._aliases = _build_alias_table(self._weights)
+
+    def get_weights(self):
+        """ Returns a dict with the weight of each (category, function name) """
+        return dict(zip(self._keys, self._weights.tolist()))
+
+    def set_weights(self, weights):
+        """
+        Changes the weights of the functions
+
+        Parameters
+        ----------
+        weights : dict
+            Weight of each (category, function name) that has to be changed
+
+        Raises
+        ------
+        ValueError
+            If any weight is negative or all the weights are zero, the weights are not
+            changed in that case
+        """
+        new_weights = self._weights.copy()
+        for key, weight in weights.items():
+            new_weights[self._keys.index(key)] = weight
+        self._probabilities, self._aliases = _build_alias_table(new_weights)
+        self._weights = new_weights
+
+    def sample_key(self):
+        """ Returns the (category, function name) of the function of the next arena """
+        return self._keys[self._sample_idx()]
+
+    def create_arena(self):
+        """ Creates an arena with a function sampled by its weight """
+        task = self._tasks[self._sample_idx()]
+        return _create_arena_from_task(task + (int(self._random_state.randint(2**31)),))
+
+    def sample(self, n_arenas=1):
+        """ Returns an ArenaConfig with n_arenas new arenas """
+        arena_config = ArenaConfig()
+        for idx in range(n_arenas):
+            arena_config.arenas[idx] = self.create_arena()
+        return arena_config
 
-def _add_arenas_using_functions_and_weights(arena_config, funcs_weights, t, n,
-                                            remove_color=False, add_blackouts=False):
+    def _sample_idx(self):
+        idx = self._random_state.randint(len(self._probabilities))
+        if self._random_state.uniform() < self._probabilities[idx]:
+            return idx
+        return self._aliases[idx]
+
+def _build_alias_table(weights):
+    """
+    Builds the tables of Vose's alias method
+
+    Returns
+    -------
+    probabilities : np.ndarray
+        Probability of keeping each index instead of taking its alias
+    aliases : np.ndarray
+        Index used when the index is not kept
+
+    Raises
+    ------
+    ValueError
+        If any weight is negative or all the weights are zero
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if np.any(weights < 0):
+        raise ValueError('Weights must not be negative: %s' % str(weights.tolist()))
+    if not np.sum(weights) > 0:
+        raise ValueError('At least one weight must be positive: %s' % str(weights.tolist()))
+    n = len(weights)
+    scaled_probabilities = weights*n/np.sum(weights)
+    probabilities = np.ones(n)
+    aliases = np.arange(n)
+    small = [idx for idx in range(n) if scaled_probabilities[idx] < 1]
+    large = [idx for idx in range(n) if scaled_probabilities[idx] >= 1]
+    while small and large:
+        small_idx, large_idx = small.pop(), large.pop()
+        probabilities[small_idx] = scaled_probabilities[small_idx]
+        aliases[small_idx] = large_idx
+        scaled_probabilities[large_idx] += scaled_probabilities[small_idx] - 1
+        if scaled_probabilities[large_idx] < 1:
+            small.append(large_idx)
+        else:
+            large.append(large_idx)
+    return probabilities, aliases
+
+def _get_tasks_using_functions_and_weights(funcs_weights, t, n, remove_color=False,
+                                           add_blackouts=False):
+    tasks = []
     for func, weight in funcs_weights:
-        for _ in range(weight*n):
-            idx = len(arena_config.arenas)
-            arena = func(t=t)
-            if remove_color:
-                remove_color_information(arena)
-            if add_blackouts:
-                _add_blackouts_to_arena(arena)
-            arena_config.arenas[idx] = arena
+        tasks.extend([(func, t, remove_color, add_blackouts)]*(weight*n))
+    return tasks
+
+def _create_arena_from_task(task):
+    """
+    Each arena has its own random state created from the seed of the task, so the global
+    random states are not used and arenas can be created on any thread
+    """
+    func, t, remove_color, add_blackouts, seed = task
+    return create_arena(func, t, remove_color, add_blackouts, np.random.RandomState(seed))
+
+def create_arena(func, t, remove_color=False, add_blackouts=False, random_state=np.random):
+    """
+    Creates an arena using the given function and applies the options of its category
+
+    Parameters
+    ----------
+    func : callable
+        Function that creates the arena given t and random_state
+    t : int
+        Max number of steps on the level
+    remove_color : bool
+        If True color information of the items is removed
+    add_blackouts : bool
+        If True blackouts are added to the arena
+    random_state : np.random.RandomState
+        Source of the random numbers, by default the global numpy random state
+    """
+    arena = func(t=t, random_state=random_state)
+    if remove_color:
+        remove_color_information(arena)
+    if add_blackouts:
+        _add_blackouts_to_arena(arena, random_state)
+    return arena
 
 def _summarize_funcs_weights():
     print('Food: %i' % sum([weight for func, weight in FOOD_FUNC_WEIGHTS]))
@@ -178,6 +358,6 @@ def _summarize_funcs_weights():
     print('Generalization: %i' % sum([weight for func, weight in GENERALIZATION_FUNC_WEIGHTS]))
     print('Internal models: %i' % sum([weight for func, weight in INTERNAL_MODELS_FUNC_WEIGHTS]))
 
-def _add_blackouts_to_arena(arena):
-    blackout = int(np.random.choice([-20, -20, -40]))
+def _add_blackouts_to_arena(arena, random_state=np.random):
+    blackout = int(random_state.choice([-20, -20, -40]))
     arena.blackouts = [blackout]
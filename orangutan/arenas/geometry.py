@@ -1,19 +1,25 @@
+import math
 import numpy as np
 from animalai.envs.arena_config import Vector3
 
 from orangutan.arenas.utils import _str_Vector3
 
+ARENA_SIZE = 40
+# Signs of the vertices of a rectangle relative to its center, in the order used by
+# _get_object_vertices
+VERTEX_SIGNS = np.array([[1, 1], [1, -1], [-1, -1], [-1, 1]], dtype=np.float64)
+
 def get_angle_looking_center(x, z):
     angle = np.arctan2(x-20, z-20)*180/np.pi + 180
     angle = float(angle)
     return normalize_angle(angle)
 
-def get_random_position():
-    x, z = np.random.randint(1, 40, size=2)
+def get_random_position(random_state=np.random):
+    x, z = random_state.randint(1, 40, size=2)
     return float(x), float(z)
 
-def get_random_position_close_to_center(max_distance=5):
-    x, z = 20 + np.random.uniform(-max_distance, max_distance, size=2)
+def get_random_position_close_to_center(max_distance=5, random_state=np.random):
+    x, z = 20 + random_state.uniform(-max_distance, max_distance, size=2)
     return float(x), float(z)
 
 def normalize_angle(angle):
@@ -35,95 +41,220 @@ def detect_collisions(new_item, existing_items):
     """
     Verifies if a new item collides with existing items in the arena
 
-    The idea is that each existing object can be modelled as a rectangle. If any
-    of the vertices of the new item is inside the rectangle then we have a collision.
-    So we can reduce the problem to detecting if a point is inside a rectangle.
+    The idea is that each object can be modelled as an oriented rectangle. Two rectangles
+    collide if there is no separating axis between them, and for rectangles it is enough
+    to check the axes of both of them. Objects just touching do not collide. If an object
+    has no rotation it is tried with 0, 45 and 90.
 
     This method will open the door to add death zones to the arena without the problem
     of having a goal on the top. Or I could use ghost objects that ensure that there
     is a path between the goal and the agent no matter how many obstacles I add.
 
-    If the rotation is 0 the problem is simply to compare values of x and y, let's try to do
-    it that way.
-    https://stackoverflow.com/questions/31321032/python-test-if-point-is-in-rectangle
+    https://en.wikipedia.org/wiki/Hyperplane_separation_theorem
 
     Raises
     ------
     CollisionDetected
     """
     detect_object_out_of_arena(new_item)
-    for item in existing_items:
-        detect_collision_between_two_items(new_item, item)
+    _detect_collisions_between_objects(_get_object_pairs(new_item, existing_items))
+
+def collides(new_item, existing_items, debug=False):
+    """
+    Returns True if the new item is out of the arena or collides with the existing items
+
+    It does the same checks as detect_collisions but without raising an exception or
+    formatting the description of the collision.
+
+    Parameters
+    ----------
+    new_item : Item
+    existing_items : list
+    debug : bool
+        If True detect_collisions is used instead, so CollisionDetected is raised with
+        the description of the collision
+    """
+    if debug:
+        detect_collisions(new_item, existing_items)
+        return False
+    if _get_vertices_out_of_arena(new_item).any():
+        return True
+    object_pairs = _get_object_pairs(new_item, existing_items)
+    return bool(object_pairs) and bool(_get_collisions_between_objects(object_pairs)[1].any())
+
+def _get_object_pairs(new_item, existing_items):
+    object_pairs = []
+    for new_item_idx in range(_get_number_objects_inside_item(new_item)):
+        new_object = _get_object_geometry(new_item, new_item_idx)
+        if new_object is None:
+            continue
+        objects = [_get_object_geometry(item, item_idx) for item in existing_items
+                   for item_idx in range(_get_number_objects_inside_item(item))]
+        object_pairs.extend((new_object, obj) for obj in objects if obj is not None)
+    return object_pairs
 
 def detect_collision_between_two_items(item1, item2):
+    object_pairs = []
     for item1_idx in range(_get_number_objects_inside_item(item1)):
         for item2_idx in range(_get_number_objects_inside_item(item2)):
-            _detect_collision_between_two_items(item1, item2, item1_idx, item2_idx)
-            _detect_collision_between_two_items(item2, item1, item2_idx, item1_idx)
+            object_pairs.append((_get_object_geometry(item1, item1_idx),
+                                 _get_object_geometry(item2, item2_idx)))
+    _detect_collisions_between_objects(
+        [object_pair for object_pair in object_pairs if None not in object_pair])
 
 def detect_object_out_of_arena(item):
-    EPSILON = 1e-6
-    vertices = _get_object_vertices(item, ref_angle=0)
-    for vertex in vertices:
-        if vertex.x < 0-EPSILON or vertex.x > 40+EPSILON or vertex.z < 0-EPSILON or vertex.z > 40+EPSILON:
-            msg = 'vertex: %s is out of arena' % (_str_Vector3(vertex))
-            raise CollisionDetected(msg)
+    is_out = _get_vertices_out_of_arena(item)
+    if is_out.any():
+        vertices = _get_object_vertices_array(item, ref_angles=[0]).reshape(-1, 2)
+        vertex = vertices[np.argmax(is_out)]
+        msg = 'vertex: %s is out of arena' % (_str_Vector3(Vector3(vertex[0], 0, vertex[1])))
+        raise CollisionDetected(msg)
 
-def _detect_collision_between_two_items(item_ref, item, item_ref_idx=0, item_idx=0):
+def _get_vertices_out_of_arena(item):
+    """ Returns a boolean array that is True for the vertices of the item out of the arena """
     EPSILON = 1e-6
-    try:
-        ref_rotations = [item_ref.rotations[item_ref_idx]]
-    except IndexError:
-        # If no rotation is given try with 0, 45 and 90
-        ref_rotations = [0, 45, 90]
-    for ref_rotation in ref_rotations:
-        vertices = _get_object_vertices(item, ref_rotation, item_idx)
-        try:
-            size = item_ref.sizes[item_ref_idx]
-            center = item_ref.positions[item_ref_idx]
-        except IndexError:
-            # This case happens when using random goals, that is why they are placed at the last position
-            # when sampling
-            return
-        x_limits = [center.x - size.x/2, center.x + size.x/2]
-        z_limits = [center.z - size.z/2, center.z + size.z/2]
-        for vertex in vertices:
-            if vertex.x > x_limits[0]+EPSILON and vertex.x < x_limits[1]-EPSILON:
-                if vertex.z > z_limits[0]+EPSILON and vertex.z < z_limits[1]-EPSILON:
-                    msg = 'vertex: %s, x_limits: %s, z_limits: %s' % (_str_Vector3(vertex), str(x_limits), str(z_limits))
-                    raise CollisionDetected(msg)
+    if _is_object_inside_arena_for_any_rotation(item):
+        return np.zeros(0, dtype=bool)
+    vertices = _get_object_vertices_array(item, ref_angles=[0]).reshape(-1, 2)
+    return ((vertices < 0 - EPSILON) | (vertices > ARENA_SIZE + EPSILON)).any(axis=1)
 
-def _get_object_vertices(item, ref_angle, item_idx=0):
+def _is_object_inside_arena_for_any_rotation(item, item_idx=0):
+    obj = _get_object_geometry(item, item_idx)
+    if obj is None:
+        return True
+    (x, z), (size_x, size_z), _ = obj
+    object_radius = math.sqrt(size_x**2 + size_z**2)/2
+    return min(x, z) - object_radius >= 0 and max(x, z) + object_radius <= ARENA_SIZE
+
+def _detect_collisions_between_objects(object_pairs):
+    """
+    Raises CollisionDetected if any pair of objects collides, all the pairs and all their
+    candidate rotations are checked at once. The objects are given as returned by
+    _get_object_geometry
+    """
+    if not object_pairs:
+        return
+    rows, collisions = _get_collisions_between_objects(object_pairs)
+    if collisions.any():
+        row = rows[np.argmax(collisions)]
+        msg = 'center: %s, size: %s, angle: %s collides with center: %s, size: %s, angle: %s' % row
+        raise CollisionDetected(msg)
+
+def _get_collisions_between_objects(object_pairs):
+    """
+    Returns the rows with the pair of objects and rotations checked and a boolean array
+    that is True for the rows that collide
+    """
+    rows = [(center1, size1, angle1, center2, size2, angle2)
+            for (center1, size1, angles1), (center2, size2, angles2) in object_pairs
+            for angle1 in angles1 for angle2 in angles2]
+    centers1, sizes1, angles1, centers2, sizes2, angles2 = zip(*rows)
+    collisions = get_rectangle_collisions(centers1, sizes1, angles1, centers2, sizes2, angles2)
+    return rows, collisions
+
+def _get_object_geometry(item, item_idx=0):
+    """
+    Returns the center, the size and the candidate rotations of an object inside the item
+    as tuples. If no rotation is given it is tried with 0, 45 and 90.
+    Returns None if the object does not have a position.
+    """
     try:
         size = item.sizes[item_idx]
         center = item.positions[item_idx]
     except IndexError:
         # This case happens when using random goals, that is why they are placed at the last position
         # when sampling
-        return []
+        return None
     try:
-        angles = [item.rotations[item_idx] - ref_angle]
+        angles = (item.rotations[item_idx],)
     except IndexError:
         # If no rotation is given try with 0, 45 and 90
-        angles = [-ref_angle, 45 - ref_angle, 90 - ref_angle]
-    object_radius = np.sqrt(size.x**2 + size.z**2)/2
-    vertices = []
-    for angle in angles:
-        for vertex_idx in range(4):
-            if vertex_idx == 0:
-                vertex_angle = np.arctan2(size.z, size.x)
-            elif vertex_idx == 1:
-                vertex_angle = -np.arctan2(size.z, size.x)
-            elif vertex_idx == 2:
-                vertex_angle = np.pi + np.arctan2(size.z, size.x)
-            elif vertex_idx == 3:
-                vertex_angle = np.pi - np.arctan2(size.z, size.x)
-            vertex_angle -= angle*np.pi/180
-            vertex = Vector3(
-                np.cos(vertex_angle)*object_radius + center.x,
-                0,
-                np.sin(vertex_angle)*object_radius + center.z)
-            vertices.append(vertex)
+        angles = (0, 45, 90)
+    return (center.x, center.z), (size.x, size.z), angles
+
+def _get_object_vertices(item, ref_angle, item_idx=0):
+    vertices = _get_object_vertices_array(item, [ref_angle], item_idx).reshape(-1, 2)
+    return [Vector3(float(x), 0, float(z)) for x, z in vertices]
+
+def _get_object_vertices_array(item, ref_angles, item_idx=0):
+    """
+    Returns the vertices of the object seen from each of the reference angles as an
+    array of shape (n_ref_angles*n_angles, 4, 2)
+    """
+    obj = _get_object_geometry(item, item_idx)
+    if obj is None:
+        return np.zeros((0, 4, 2))
+    center, size, angles = obj
+    angles = [angle - ref_angle for ref_angle in ref_angles for angle in angles]
+    return get_vertices([center]*len(angles), [size]*len(angles), angles)
+
+def get_rectangle_collisions(centers1, sizes1, angles1, centers2, sizes2, angles2):
+    """
+    Checks if pairs of rectangles collide using the separating axis theorem, rectangles
+    that are just touching do not collide
+
+    Parameters
+    ----------
+    centers1, centers2 : np.ndarray
+        (k, 2) x and z of the center of each rectangle
+    sizes1, sizes2 : np.ndarray
+        (k, 2) size along x and z of each rectangle
+    angles1, angles2 : np.ndarray
+        (k,) rotation of each rectangle in degrees
+
+    Returns
+    -------
+    np.ndarray
+        (k,) True if the rectangles of the pair collide
+    """
+    EPSILON = 1e-6
+    angles1 = np.asarray(angles1, dtype=np.float64)*np.pi/180
+    angles2 = np.asarray(angles2, dtype=np.float64)*np.pi/180
+    half_sizes1 = np.abs(np.asarray(sizes1, dtype=np.float64))/2
+    half_sizes2 = np.abs(np.asarray(sizes2, dtype=np.float64))/2
+    distances = np.asarray(centers2, dtype=np.float64) - np.asarray(centers1, dtype=np.float64)
+    cos1, sin1 = np.cos(angles1), np.sin(angles1)
+    cos2, sin2 = np.cos(angles2), np.sin(angles2)
+    # The x axis of a rectangle is (cos, -sin) and the z axis (sin, cos), so the projection
+    # of the axes of one rectangle on the axes of the other depends on the angle difference
+    cos_diff = np.abs(np.cos(angles2 - angles1))
+    sin_diff = np.abs(np.sin(angles2 - angles1))
+    hx1, hz1 = half_sizes1[:, 0], half_sizes1[:, 1]
+    hx2, hz2 = half_sizes2[:, 0], half_sizes2[:, 1]
+    dx, dz = distances[:, 0], distances[:, 1]
+    is_separated = np.abs(dx*cos1 - dz*sin1) >= hx1 + hx2*cos_diff + hz2*sin_diff - EPSILON
+    is_separated |= np.abs(dx*sin1 + dz*cos1) >= hz1 + hx2*sin_diff + hz2*cos_diff - EPSILON
+    is_separated |= np.abs(dx*cos2 - dz*sin2) >= hx2 + hx1*cos_diff + hz1*sin_diff - EPSILON
+    is_separated |= np.abs(dx*sin2 + dz*cos2) >= hz2 + hx1*sin_diff + hz1*cos_diff - EPSILON
+    return ~is_separated
+
+def get_vertices(centers, sizes, angles):
+    """
+    Computes the vertices of many rectangles at once
+
+    Parameters
+    ----------
+    centers : np.ndarray
+        (k, 2) x and z of the center of each rectangle
+    sizes : np.ndarray
+        (k, 2) size along x and z of each rectangle
+    angles : np.ndarray
+        (k,) rotation of each rectangle in degrees
+
+    Returns
+    -------
+    np.ndarray
+        (k, 4, 2) x and z of the vertices of each rectangle
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    half_sizes = np.asarray(sizes, dtype=np.float64)/2
+    angles = np.asarray(angles, dtype=np.float64)*np.pi/180
+    cos, sin = np.cos(angles)[:, np.newaxis], np.sin(angles)[:, np.newaxis]
+    x_offsets = VERTEX_SIGNS[:, 0]*half_sizes[:, 0:1]
+    z_offsets = VERTEX_SIGNS[:, 1]*half_sizes[:, 1:2]
+    vertices = np.empty((len(centers), 4, 2))
+    vertices[:, :, 0] = x_offsets*cos + z_offsets*sin + centers[:, 0:1]
+    vertices[:, :, 1] = z_offsets*cos - x_offsets*sin + centers[:, 1:2]
     return vertices
 
 def _get_number_objects_inside_item(item):
@@ -0,0 +1,184 @@
+"""
+Generation of perfect mazes stored as arrays
+
+The walls of each cell are stored as a bitmask, so a batch of mazes is a single uint8
+array and all the mazes of the batch are generated at the same time with a randomized
+depth first search. For a single maze the numpy overhead of each step is bigger than
+the work done, so generate_maze runs the same search over a list of bitmasks.
+"""
+import random
+import collections
+import numpy as np
+
+# Bit of the wall of the cell on each cardinal direction, north is the row above
+N, S, W, E = 1, 2, 4, 8
+ALL_WALLS = N | S | W | E
+DIRECTIONS = np.array([N, S, W, E], dtype=np.uint8)
+OPPOSITE_DIRECTIONS = np.array([S, N, E, W], dtype=np.uint8)
+DIRECTION_ROW_OFFSETS = np.array([-1, 1, 0, 0])
+DIRECTION_COL_OFFSETS = np.array([0, 0, -1, 1])
+# Sizes with more different layouts than this are considered too big to be enumerated
+MAX_ENUMERATED_LAYOUTS = 5000
+ENUMERATION_N_DRAWS = 100000
+ENUMERATION_BATCH_SIZE = 10000
+
+
+def generate_mazes(n_mazes, width, height, random_state=np.random):
+    """
+    Generates random perfect mazes, every cell can be reached from any other cell
+    following a single path
+
+    Parameters
+    ----------
+    n_mazes : int
+        Number of mazes to generate
+    width : int
+        Number of columns of the mazes
+    height : int
+        Number of rows of the mazes
+    random_state : np.random.RandomState
+        Source of the random numbers, by default the global numpy random state
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape (n_mazes, height, width) with the walls standing on each
+        cell as a combination of the N, S, W and E bits
+    """
+    n_cells = width*height
+    maze_idx = np.arange(n_mazes)
+    walls = np.full((n_mazes, n_cells), ALL_WALLS, dtype=np.uint8)
+    visited = np.zeros((n_mazes, n_cells), dtype=bool)
+    stack = np.zeros((n_mazes, n_cells), dtype=np.int64)
+    stack_size = np.zeros(n_mazes, dtype=np.int64)
+    current = random_state.randint(n_cells, size=n_mazes)
+    visited[maze_idx, current] = True
+    n_visited = np.ones(n_mazes, dtype=np.int64)
+
+    # Each iteration every maze either moves to a new cell or goes back one cell
+    for _ in range(2*(n_cells - 1)):
+        is_active = n_visited < n_cells
+        if not is_active.any():
+            break
+        rows, cols = current//width, current % width
+        neighbor_rows = rows[:, np.newaxis] + DIRECTION_ROW_OFFSETS
+        neighbor_cols = cols[:, np.newaxis] + DIRECTION_COL_OFFSETS
+        is_inside = (neighbor_rows >= 0) & (neighbor_rows < height) & \
+            (neighbor_cols >= 0) & (neighbor_cols < width)
+        neighbors = np.where(is_inside, neighbor_rows*width + neighbor_cols, 0)
+        is_candidate = is_inside & ~visited[maze_idx[:, np.newaxis], neighbors]
+        # The random direction is the candidate with the highest random score
+        direction = np.argmax(np.where(is_candidate, random_state.random_sample((n_mazes, 4)), -1), axis=1)
+        moves = is_active & is_candidate.any(axis=1)
+        backtracks = is_active & ~moves
+
+        moving_mazes, moving_directions = maze_idx[moves], direction[moves]
+        origins = current[moves]
+        destinations = neighbors[moves, moving_directions]
+        walls[moving_mazes, origins] &= ~DIRECTIONS[moving_directions]
+        walls[moving_mazes, destinations] &= ~OPPOSITE_DIRECTIONS[moving_directions]
+        visited[moving_mazes, destinations] = True
+        n_visited[moves] += 1
+        stack[moving_mazes, stack_size[moves]] = origins
+        stack_size[moves] += 1
+        current[moves] = destinations
+
+        stack_size[backtracks] -= 1
+        current[backtracks] = stack[backtracks, stack_size[backtracks]]
+    return walls.reshape(n_mazes, height, width)
+
+def generate_maze(width, height, random_generator=random):
+    """
+    Returns a single maze of shape (height, width), see generate_mazes. random_generator
+    is a random.Random, by default the global python random state
+    """
+    n_cells = width*height
+    walls = [ALL_WALLS]*n_cells
+    visited = [False]*n_cells
+    current = random_generator.randrange(n_cells)
+    visited[current] = True
+    stack, n_visited = [], 1
+    while n_visited < n_cells:
+        row, col = divmod(current, width)
+        candidates = []
+        if row > 0 and not visited[current - width]:
+            candidates.append((current - width, N, S))
+        if row < height - 1 and not visited[current + width]:
+            candidates.append((current + width, S, N))
+        if col > 0 and not visited[current - 1]:
+            candidates.append((current - 1, W, E))
+        if col < width - 1 and not visited[current + 1]:
+            candidates.append((current + 1, E, W))
+        if candidates:
+            neighbor, wall, opposite_wall = random_generator.choice(candidates)
+            walls[current] &= ~wall
+            walls[neighbor] &= ~opposite_wall
+            visited[neighbor] = True
+            n_visited += 1
+            stack.append(current)
+            current = neighbor
+        else:
+            current = stack.pop()
+    return np.array(walls, dtype=np.uint8).reshape(height, width)
+
+def enumerate_maze_layouts(width, height, max_layouts=MAX_ENUMERATED_LAYOUTS,
+                           n_draws=ENUMERATION_N_DRAWS, batch_size=ENUMERATION_BATCH_SIZE):
+    """
+    Draws n_draws mazes and returns their different layouts with the number of times each
+    one was drawn, so drawing the layouts by their counts follows the distribution of
+    generate_mazes. The random state only depends on the size of the mazes, so every
+    process gets the same layouts.
+
+    Layouts with a probability much lower than 1/n_draws may be missing. On small mazes,
+    like 3x3 and 4x4, every layout is drawn many times.
+
+    Returns
+    -------
+    layouts : np.ndarray
+        (n_layouts, height, width) walls of the different layouts, None if there are
+        more than max_layouts different layouts
+    counts : np.ndarray
+        Number of times each layout was drawn, None if there are too many layouts
+    """
+    random_state = np.random.RandomState([width, height])
+    counts = collections.Counter()
+    for _ in range(n_draws//batch_size):
+        mazes = generate_mazes(batch_size, width, height, random_state).reshape(batch_size, -1)
+        layouts, layout_counts = np.unique(mazes, axis=0, return_counts=True)
+        counts.update(dict(zip([layout.tobytes() for layout in layouts], layout_counts.tolist())))
+        if len(counts) > max_layouts:
+            return None, None
+    layouts = np.array([np.frombuffer(layout, dtype=np.uint8) for layout in counts])
+    return layouts.reshape(-1, height, width), np.array(list(counts.values()))
+
+def get_dead_end_counts(mazes):
+    """ Returns the number of cells of each maze that have only one open side """
+    mazes = np.asarray(mazes)
+    n_walls = sum((mazes & direction) > 0 for direction in [N, S, W, E])
+    return np.count_nonzero((n_walls == 3).reshape(len(mazes), -1), axis=1)
+
+def get_longest_path_lengths(mazes):
+    """
+    Returns the number of steps between the two cells of each maze that are farthest
+    apart, the length of the solution of the hardest pair of start and goal
+    """
+    return np.array([_get_longest_path_length(maze) for maze in mazes])
+
+def _get_longest_path_length(maze):
+    # On a tree the farthest cell from any cell is one end of the longest path
+    farthest_cell, _ = _get_farthest_cell(maze, (0, 0))
+    _, distance = _get_farthest_cell(maze, farthest_cell)
+    return distance
+
+def _get_farthest_cell(maze, start):
+    height, width = maze.shape
+    distances = {start: 0}
+    pending = [start]
+    for row, col in pending:
+        for wall, neighbor in [(N, (row - 1, col)), (S, (row + 1, col)),
+                               (W, (row, col - 1)), (E, (row, col + 1))]:
+            if not maze[row, col] & wall and neighbor not in distances:
+                distances[neighbor] = distances[(row, col)] + 1
+                pending.append(neighbor)
+    farthest_cell = pending[-1]
+    return farthest_cell, distances[farthest_cell]
@@ -5,7 +5,8 @@ import numpy as np
 from animalai.envs.arena_config import Vector3, RGB, Item, Arena, ArenaConfig
 
 from orangutan.arenas.utils import GRAY, PINK, BLUE
-from orangutan.arenas.geometry import detect_collisions, CollisionDetected
+from orangutan.arenas.placement import place_items, get_items_sampler
+from orangutan.arenas.occupancy import OccupancyGrid
 
 DEFAULT_TIME_LIMIT = 500
 DEFAULT_REWARD = 2
@@ -14,119 +15,111 @@ DEFAULT_REWARD = 2
 # TODO: add boxes surrounding goal
 
 
-def create_arena_with_obstacles(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_obstacles(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_rewards_to_arena(arena)
-    _add_obstacles_to_arena(arena, np.random.randint(5, 10))
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
+    _add_rewards_to_arena(arena, random_state=random_state)
+    _add_obstacles_to_arena(arena, random_state.randint(5, 10), random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
     return arena
 
-def _add_rewards_to_arena(arena):
+def _add_rewards_to_arena(arena, random_state=np.random):
     funcs = {
         0: _add_goal_on_top_of_platform,
         1: _add_goal_on_top_of_box,
         2: _add_goal_inside_cillinder,
         3: _add_simple_goal,
     }
-    func_keys = np.short(np.random.randint(0, np.max(list(funcs.keys()))+1, 2))
+    occupancy_grid = OccupancyGrid(arena.items)
+    func_keys = np.short(random_state.randint(0, np.max(list(funcs.keys()))+1, 2))
     for key in func_keys:
-        funcs[key](arena)
-    if np.random.uniform() < 0.2:
-        _add_goal_on_top_of_platform(arena, empty_platform=True)
+        funcs[key](arena, occupancy_grid=occupancy_grid, random_state=random_state)
+    if random_state.uniform() < 0.2:
+        _add_goal_on_top_of_platform(arena, empty_platform=True, occupancy_grid=occupancy_grid,
+                                     random_state=random_state)
 
-def _add_simple_goal(arena):
+def _add_simple_goal(arena, occupancy_grid=None, random_state=np.random):
     item = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)])
     arena.items.append(item)
 
-def _add_goal_on_top_of_box(arena):
-    while 1:
-        try:
-            box = _create_random_box()
-            border_distance = np.max([box.sizes[0].x, box.sizes[0].z])*1.2
-            x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-            box.positions = [Vector3(x, 0, z)]
-            detect_collisions(box, arena.items)
-            arena.items.append(box)
-            break
-        except CollisionDetected:
-            pass
+def _add_goal_on_top_of_box(arena, occupancy_grid=None, random_state=np.random):
+    box, = place_items(get_items_sampler(lambda: [_create_random_box(random_state)],
+                                         occupancy_grid=occupancy_grid,
+                                         random_state=random_state), arena.items)
+    x, z = box.positions[0].x, box.positions[0].z
     goal = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], positions=[Vector3(x, box.sizes[0].y, z)])
-    arena.items.append(goal)
-
-def _add_goal_on_top_of_platform(arena, empty_platform=False):
-    while 1:
-        try:
-            platform = _create_random_platform()
-            border_distance = np.max([platform.sizes[0].x, platform.sizes[0].z])*1.2
-            x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-            platform.positions = [Vector3(x, 0, z)]
-            ramp = _create_ramp_for_platform(platform)
-            detect_collisions(ramp, arena.items)
-            detect_collisions(platform, arena.items)
-            arena.items.append(platform)
-            arena.items.append(ramp)
-            break
-        except CollisionDetected:
-            pass
+    _add_items(arena, [box, goal], occupancy_grid)
+
+def _add_goal_on_top_of_platform(arena, empty_platform=False, occupancy_grid=None, random_state=np.random):
+    platform, ramp = place_items(get_items_sampler(lambda: _create_random_platform_with_ramp(random_state),
+                                                   occupancy_grid=occupancy_grid,
+                                                   random_state=random_state), arena.items)
+    items = [platform, ramp]
     if not empty_platform:
-        goal = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], positions=[Vector3(x, platform.sizes[0].y, z)])
-        arena.items.append(goal)
-
-def _add_goal_inside_cillinder(arena):
-    while 1:
-        try:
-            cillinder = _create_random_cillinder()
-            border_distance = np.max([cillinder.sizes[0].x, cillinder.sizes[0].z])*1.2
-            x, z = np.random.uniform(border_distance, 40 -border_distance, 2).tolist()
-            cillinder.positions = [Vector3(x, 0, z)]
-            detect_collisions(cillinder, arena.items)
-            arena.items.append(cillinder)
-            break
-        except CollisionDetected:
-            pass
+        x, z = platform.positions[0].x, platform.positions[0].z
+        items.append(Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)],
+                          positions=[Vector3(x, platform.sizes[0].y, z)]))
+    _add_items(arena, items, occupancy_grid)
+
+def _create_random_platform_with_ramp(random_state=np.random):
+    platform = _create_random_platform(random_state=random_state)
+    platform.positions = [Vector3(0, 0, 0)]
+    return [platform, _create_ramp_for_platform(platform, random_state=random_state)]
+
+def _add_goal_inside_cillinder(arena, occupancy_grid=None, random_state=np.random):
+    cillinder, = place_items(get_items_sampler(lambda: [_create_random_cillinder(random_state)],
+                                               occupancy_grid=occupancy_grid,
+                                               random_state=random_state), arena.items)
+    x, z = cillinder.positions[0].x, cillinder.positions[0].z
     goal = Item(name='GoodGoalMulti', sizes=[Vector3(*[1]*3)], positions=[Vector3(x, 0, z)])
-    arena.items.append(goal)
+    _add_items(arena, [cillinder, goal], occupancy_grid)
+
+def _add_items(arena, items, occupancy_grid=None):
+    """ Appends the items to the arena and marks them on the occupancy grid if given """
+    for item in items:
+        arena.items.append(item)
+        if occupancy_grid is not None:
+            occupancy_grid.add(item)
 
-def _add_obstacles_to_arena(arena, n_obstacles=5):
+def _add_obstacles_to_arena(arena, n_obstacles=5, random_state=np.random):
     for _ in range(n_obstacles):
-        if np.random.randint(0, 2):
-            _add_random_inmovable_object(arena)
+        if random_state.randint(0, 2):
+            _add_random_inmovable_object(arena, random_state=random_state)
         else:
-            _add_random_movable_object(arena)
+            _add_random_movable_object(arena, random_state=random_state)
 
 def _add_badgoals_to_arena(arena, n_badgoals=5):
     for _ in range(n_badgoals):
         item = Item(name='BadGoal', sizes=[Vector3(*[1]*3)])
         arena.items.append(item)
 
-def _add_random_movable_object(arena):
-    if np.random.randint(0, 2):
-        _add_random_box(arena)
+def _add_random_movable_object(arena, random_state=np.random):
+    if random_state.randint(0, 2):
+        _add_random_box(arena, random_state=random_state)
     else:
-        _add_random_wooden_object(arena)
+        _add_random_wooden_object(arena, random_state=random_state)
 
-def _add_random_box(arena):
-    arena.items.append(_create_random_box())
+def _add_random_box(arena, random_state=np.random):
+    arena.items.append(_create_random_box(random_state=random_state))
 
-def _create_random_box():
+def _create_random_box(random_state=np.random):
     movable_objects = ['Cardbox1', 'Cardbox2']
-    name = str(np.random.choice(movable_objects))
-    x, z = np.random.randint(1, 6, 2).tolist()
-    y = float(np.random.randint(1, 3))
+    name = str(random_state.choice(movable_objects))
+    x, z = random_state.randint(1, 6, 2).tolist()
+    y = float(random_state.randint(1, 3))
     sizes = [Vector3(x, y, z)]
     item = Item(name=name, sizes=sizes)
     return item
 
-def _add_random_wooden_object(arena):
+def _add_random_wooden_object(arena, random_state=np.random):
     movable_objects = ['UObject', 'LObject', 'LObject2']
-    name = str(np.random.choice(movable_objects))
-    sizes = [Vector3(-1, -1, float(np.random.randint(3, 10)))]
+    name = str(random_state.choice(movable_objects))
+    sizes = [Vector3(-1, -1, float(random_state.randint(3, 10)))]
     item = Item(name=name, sizes=sizes)
     arena.items.append(item)
 
-def _add_random_inmovable_object(arena):
+def _add_random_inmovable_object(arena, random_state=np.random):
     inmovable_objects = ['Wall', 'WallTransparent', 'Ramp', 'CylinderTunnelTransparent', 'CylinderTunnel']
-    name = str(np.random.choice(inmovable_objects))
+    name = str(random_state.choice(inmovable_objects))
     if name in ['Wall', 'CylinderTunnel']:
         colors = [GRAY]
     elif name == 'Ramp':
@@ -134,33 +127,33 @@ def _add_random_inmovable_object(arena):
     else:
         colors = []
     if 'Wall' in name or name == 'Ramp':
-        sizes = [Vector3(*np.random.randint(1, 10, 3).tolist())]
+        sizes = [Vector3(*random_state.randint(1, 10, 3).tolist())]
     else:
-        sizes = [Vector3(*np.random.randint(3, 10, 3).tolist())]
+        sizes = [Vector3(*random_state.randint(3, 10, 3).tolist())]
     item = Item(name=name, sizes=sizes, colors=colors)
     arena.items.append(item)
 
-def _create_random_platform():
+def _create_random_platform(random_state=np.random):
     name = 'Wall'
     colors = [BLUE]
-    x, z = np.random.randint(4, 8, 2).tolist()
-    y = float(np.random.randint(1, 3))
+    x, z = random_state.randint(4, 8, 2).tolist()
+    y = float(random_state.randint(1, 3))
     sizes = [Vector3(x, y, z)]
     item = Item(name=name, sizes=sizes, colors=colors, rotations=[0])
     return item
 
-def _create_random_cillinder():
+def _create_random_cillinder(random_state=np.random):
     inmovable_objects = ['CylinderTunnelTransparent', 'CylinderTunnel']
-    name = str(np.random.choice(inmovable_objects))
+    name = str(random_state.choice(inmovable_objects))
     if name == 'CylinderTunnel':
         colors = [GRAY]
     else:
         colors = []
-    sizes = [Vector3(*np.random.randint(3, 10, 3).tolist())]
+    sizes = [Vector3(*random_state.randint(3, 10, 3).tolist())]
     item = Item(name=name, sizes=sizes, colors=colors)
     return item
 
-def _create_ramp_for_platform(platform, rotation=None):
+def _create_ramp_for_platform(platform, rotation=None, random_state=np.random):
     """
     Creates a ramp that allows to climb the platform
 
@@ -174,11 +167,11 @@ def _create_ramp_for_platform(platform, rotation=None):
     position = platform.positions[0]
     size = platform.sizes[0]
     if rotation is None:
-        rotation = float(np.random.choice([0, 90, 180, 270]))
+        rotation = float(random_state.choice([0, 90, 180, 270]))
     else:
         assert rotation in [0, 90, 180, 270]
     sizes = platform.sizes
-    ramp_length = size.y*np.random.uniform(1, 3)
+    ramp_length = size.y*random_state.uniform(1, 3)
     if rotation == 0:
         sizes = [Vector3(size.x, size.y, ramp_length)]
         displacement = (size.z + ramp_length)/2
@@ -202,118 +195,118 @@ def _create_ramp_for_platform(platform, rotation=None):
 More levels
 """
 
-def create_center_blocked_arena(t):
+def create_center_blocked_arena(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_center_blocking_wall(arena)
+    _add_center_blocking_wall(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 6)):
-        _add_random_box(arena)
-    if np.random.randint(0, 2):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 6)):
+        _add_random_box(arena, random_state=random_state)
+    if random_state.randint(0, 2):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def _add_center_blocking_wall(arena):
+def _add_center_blocking_wall(arena, random_state=np.random):
     inmovable_objects = ['Wall', 'WallTransparent']
-    name = str(np.random.choice(inmovable_objects))
+    name = str(random_state.choice(inmovable_objects))
     colors = [GRAY]
-    sizes = [Vector3(float(np.random.randint(15, 25)),
-                     float(np.random.randint(2, 10)),
-                     float(np.random.randint(15, 25)))]
+    sizes = [Vector3(float(random_state.randint(15, 25)),
+                     float(random_state.randint(2, 10)),
+                     float(random_state.randint(15, 25)))]
     positions = [Vector3(20, 0, 20)]
     item = Item(name=name, sizes=sizes, colors=colors, positions=positions)
     arena.items.append(item)
 
-def create_arena_splitted_in_two(t):
+def create_arena_splitted_in_two(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_two(arena)
+    _split_arena_in_two(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def _split_arena_in_two(arena, block_path=False):
+def _split_arena_in_two(arena, block_path=False, random_state=np.random):
     inmovable_objects = ['Wall', 'WallTransparent']
-    name = str(np.random.choice(inmovable_objects))
+    name = str(random_state.choice(inmovable_objects))
     colors = [GRAY]
-    wall_position = np.random.randint(10, 31)
-    hole_position = np.random.randint(10, 31)
-    hole_width = np.random.randint(2, 6)
+    wall_position = random_state.randint(10, 31)
+    hole_position = random_state.randint(10, 31)
+    hole_width = random_state.randint(2, 6)
 
     wall_1_width = hole_position - hole_width/2
     wall_2_width = 40 - hole_position - hole_width/2
 
-    if np.random.randint(0, 2):
+    if random_state.randint(0, 2):
         sizes = [Vector3(float(wall_1_width),
-                        float(np.random.randint(2, 10)),
-                        float(np.random.randint(1, 5)))]
+                        float(random_state.randint(2, 10)),
+                        float(random_state.randint(1, 5)))]
         positions = [Vector3( wall_1_width/2, 0, wall_position)]
         item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
         arena.items.append(item)
 
         sizes = [Vector3(float(wall_2_width),
-                        float(np.random.randint(2, 10)),
-                        float(np.random.randint(1, 5)))]
+                        float(random_state.randint(2, 10)),
+                        float(random_state.randint(1, 5)))]
         positions = [Vector3(40 - wall_2_width/2, 0, wall_position) ]
         item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
         arena.items.append(item)
         if block_path:
-            box = _create_random_box()
+            box = _create_random_box(random_state=random_state)
             box.sizes = [Vector3(hole_width-0.5, box.sizes[0].y, box.sizes[0].z)]
             box.positions = [Vector3( wall_1_width + hole_width/2, 0, wall_position)]
             box.rotations = [0]
             arena.items.append(box)
 
     else:
-        sizes = [Vector3(float(np.random.randint(1, 5)),
-                        float(np.random.randint(2, 10)),
+        sizes = [Vector3(float(random_state.randint(1, 5)),
+                        float(random_state.randint(2, 10)),
                         float(wall_1_width))]
         positions = [Vector3(wall_position, 0, wall_1_width/2)]
         item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
         arena.items.append(item)
 
-        sizes = [Vector3(float(np.random.randint(1, 5)),
-                        float(np.random.randint(2, 10)),
+        sizes = [Vector3(float(random_state.randint(1, 5)),
+                        float(random_state.randint(2, 10)),
                         float(wall_2_width))]
         positions = [Vector3(wall_position, 0, 40 - wall_2_width/2)]
         item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
         arena.items.append(item)
         if block_path:
-            box = _create_random_box()
+            box = _create_random_box(random_state=random_state)
             box.sizes = [Vector3(box.sizes[0].x, box.sizes[0].y, hole_width-0.5)]
             box.positions = [Vector3( wall_position, 0, wall_1_width + hole_width/2)]
             box.rotations = [0]
             arena.items.append(box)
 
-def create_arena_splitted_in_four(t):
+def create_arena_splitted_in_four(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_four(arena)
+    _split_arena_in_four(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
-def _split_arena_in_four(arena):
+def _split_arena_in_four(arena, random_state=np.random):
     inmovable_objects = ['Wall', 'WallTransparent']
-    name = str(np.random.choice(inmovable_objects))
+    name = str(random_state.choice(inmovable_objects))
     colors = [GRAY]
 
-    wall_position = float(np.random.randint(13, 16))
-    wall_width = float(np.random.randint(19, 22))
+    wall_position = float(random_state.randint(13, 16))
+    wall_width = float(random_state.randint(19, 22))
     wall_thickness = 1
 
     sizes = [Vector3(
         float(wall_width),
-        float(np.random.randint(2, 10)),
+        float(random_state.randint(2, 10)),
         float(wall_thickness))]
     positions = [Vector3(wall_width/2, 0, wall_position)]
     item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
@@ -324,7 +317,7 @@ def _split_arena_in_four(arena):
 
     sizes = [Vector3(
         float(wall_thickness),
-        float(np.random.randint(2, 10)),
+        float(random_state.randint(2, 10)),
         float(wall_width))]
     positions = [Vector3(wall_position, 0, 40-wall_width/2)]
     item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
@@ -333,39 +326,39 @@ def _split_arena_in_four(arena):
     item = Item(name=name, sizes=sizes, colors=colors, positions=positions, rotations=[0])
     arena.items.append(item)
 
-def create_arena_splitted_in_two_with_path_blocked(t):
+def create_arena_splitted_in_two_with_path_blocked(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _split_arena_in_two(arena, block_path=True)
+    _split_arena_in_two(arena, block_path=True, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
-    _add_badgoals_to_arena(arena, np.random.randint(2, 7))
-    for _ in range(np.random.randint(2, 4)):
-        _add_random_box(arena)
-    for _ in range(np.random.randint(1, 3)):
-        _add_random_wooden_object(arena)
+        _add_simple_goal(arena, random_state=random_state)
+    _add_badgoals_to_arena(arena, random_state.randint(2, 7))
+    for _ in range(random_state.randint(2, 4)):
+        _add_random_box(arena, random_state=random_state)
+    for _ in range(random_state.randint(1, 3)):
+        _add_random_wooden_object(arena, random_state=random_state)
     return arena
 
 """
 Simpler levels
 """
 
-def create_arena_with_goal_on_platform(t):
+def create_arena_with_goal_on_platform(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_goal_on_top_of_platform(arena)
-    if np.random.randint(0, 2):
+    _add_goal_on_top_of_platform(arena, random_state=random_state)
+    if random_state.randint(0, 2):
         arena.items[-1].name = 'GoodGoal'
     return arena
 
-def create_arena_with_goal_on_top_of_box(t):
+def create_arena_with_goal_on_top_of_box(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_goal_on_top_of_box(arena)
-    if np.random.randint(0, 2):
+    _add_goal_on_top_of_box(arena, random_state=random_state)
+    if random_state.randint(0, 2):
         arena.items[-1].name = 'GoodGoal'
     return arena
 
-def create_arena_with_goal_inside_cillinder(t):
+def create_arena_with_goal_inside_cillinder(t, random_state=np.random):
     arena = Arena(t=t, items=[])
-    _add_goal_inside_cillinder(arena)
-    if np.random.randint(0, 2):
+    _add_goal_inside_cillinder(arena, random_state=random_state)
+    if random_state.randint(0, 2):
         arena.items[-1].name = 'GoodGoal'
     return arena
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Occupancy grid of the arena
+
+Keeps a bitmap of the cells of the arena covered by the items, so checking if a point is
+free is a lookup and free positions for an object can be sampled directly from the
+distance of each cell to the closest object.
+"""
+import math
+import numpy as np
+
+from orangutan.arenas.geometry import (
+    ARENA_SIZE, _get_object_geometry, _get_number_objects_inside_item)
+
+DEFAULT_RESOLUTION = 0.5
+
+
+class OccupancyGrid(object):
+    '''
+    Bitmap of the cells of the arena covered by the items
+
+    A cell is marked as occupied if any object may cover any part of it, objects without
+    rotation are marked with all their candidate rotations. Along with the bitmap it keeps
+    the distance from the center of each cell to the closest object or wall, which only
+    can decrease when an item is added so it is updated incrementally.
+    '''
+    def __init__(self, items=None, resolution=DEFAULT_RESOLUTION):
+        """
+        Parameters
+        ----------
+        items : list
+            Items already in the arena
+        resolution : float
+            Size of the cells of the grid
+        """
+        self._resolution = resolution
+        self._n_cells = int(math.ceil(ARENA_SIZE/resolution))
+        self._cell_centers = (np.arange(self._n_cells) + 0.5)*resolution
+        self._occupied = np.zeros((self._n_cells, self._n_cells), dtype=bool)
+        wall_distances = np.minimum(self._cell_centers, ARENA_SIZE - self._cell_centers)
+        self._distances = np.minimum(wall_distances[:, np.newaxis], wall_distances[np.newaxis])
+        for item in items or []:
+            self.add(item)
+
+    @property
+    def occupied(self):
+        """ Boolean array of shape (n_cells, n_cells) indexed by x and z """
+        return self._occupied
+
+    @property
+    def distances(self):
+        """
+        Array of shape (n_cells, n_cells) with the distance from the center of each cell
+        to the closest object or wall of the arena
+        """
+        return self._distances
+
+    def add(self, item):
+        """ Marks the cells covered by the objects of the item as occupied """
+        margin = self._resolution*math.sqrt(2)/2
+        dx = self._cell_centers[:, np.newaxis]
+        dz = self._cell_centers[np.newaxis]
+        for item_idx in range(_get_number_objects_inside_item(item)):
+            obj = _get_object_geometry(item, item_idx)
+            if obj is None:
+                continue
+            (x, z), (size_x, size_z), angles = obj
+            for angle in angles:
+                cos, sin = math.cos(angle*math.pi/180), math.sin(angle*math.pi/180)
+                # Distance to the rectangle on the frame of the object
+                u = np.maximum(np.abs((dx - x)*cos - (dz - z)*sin) - abs(size_x)/2, 0)
+                v = np.maximum(np.abs((dx - x)*sin + (dz - z)*cos) - abs(size_z)/2, 0)
+                distances = np.sqrt(u**2 + v**2)
+                self._occupied |= distances <= margin
+                np.minimum(self._distances, distances, out=self._distances)
+
+    def is_free(self, x, z):
+        """ Returns True if the point is inside the arena and its cell is not occupied """
+        x_idx = int(math.floor(x/self._resolution))
+        z_idx = int(math.floor(z/self._resolution))
+        if x_idx < 0 or z_idx < 0 or x_idx >= self._n_cells or z_idx >= self._n_cells:
+            return False
+        return not self._occupied[x_idx, z_idx]
+
+    def sample_free_positions(self, radius, n, border_distance=0, random_state=np.random):
+        """
+        Samples positions where a circle of the given radius does not touch any object
+        or wall of the arena
+
+        Parameters
+        ----------
+        radius : float
+            Radius of the footprint of the object
+        n : int
+            Number of positions to sample
+        border_distance : float
+            Minimum distance between the positions and the walls of the arena
+        random_state : np.random.RandomState
+            Source of the random numbers, by default the global numpy random state
+
+        Returns
+        -------
+        np.ndarray
+            (n, 2) x and z of the positions, empty if there is no free position
+        """
+        # The sampled position can be anywhere inside its cell
+        margin = self._resolution*math.sqrt(2)/2
+        is_valid = self._distances >= radius + margin
+        if border_distance:
+            is_far_from_border = (self._cell_centers >= border_distance + self._resolution/2) & \
+                (self._cell_centers <= ARENA_SIZE - border_distance - self._resolution/2)
+            is_valid &= is_far_from_border[:, np.newaxis] & is_far_from_border[np.newaxis]
+        valid_cells = np.flatnonzero(is_valid)
+        if not len(valid_cells):
+            return np.zeros((0, 2))
+        cells = valid_cells[random_state.randint(len(valid_cells), size=n)]
+        positions = np.stack(np.unravel_index(cells, is_valid.shape), axis=1) + 0.5
+        positions += random_state.uniform(-0.5, 0.5, (n, 2))
+        return positions*self._resolution
@@ -0,0 +1,273 @@
+"""
+Placement of items on the arena
+
+Instead of sampling one position and checking if it collides, a batch of candidate
+positions is sampled and all of them are checked at once against the items already
+on the arena. The objects already on the arena are stored on a uniform grid so each
+candidate is only checked against the objects close to it.
+"""
+import math
+import numpy as np
+from animalai.envs.arena_config import Vector3
+
+from orangutan.arenas.geometry import (
+    ARENA_SIZE, get_vertices, get_rectangle_collisions,
+    _get_object_geometry, _get_number_objects_inside_item)
+
+DEFAULT_MIN_CANDIDATES = 4
+DEFAULT_MAX_CANDIDATES = 64
+DEFAULT_MAX_BATCHES = 100
+# Size of the cells of the grid used to find the existing objects close to a candidate
+GRID_CELL_SIZE = 2.
+
+
+class PlacementError(Exception):
+    pass
+
+def place_items(sample_items, existing_items, min_candidates=DEFAULT_MIN_CANDIDATES,
+                max_candidates=DEFAULT_MAX_CANDIDATES, max_batches=DEFAULT_MAX_BATCHES):
+    """
+    Places a group of items on the first free position of a batch of candidates
+
+    The first batch is small because on most arenas it is easy to find a free position,
+    the size of the batch is doubled each time no free position is found.
+
+    Parameters
+    ----------
+    sample_items : callable
+        Given the number of candidates returns a list of items with positions relative
+        to the origin and an array of shape (n_candidates, 2) with the candidate x and z
+        positions for the origin. It is called once for each batch so the items can be
+        different on each batch.
+    existing_items : list
+        Items already on the arena
+    min_candidates : int
+        Number of candidate positions on the first batch
+    max_candidates : int
+        Max number of candidate positions on a batch
+    max_batches : int
+        Number of batches tried before giving up
+
+    Returns
+    -------
+    list
+        The items moved to the first free position
+
+    Raises
+    ------
+    PlacementError
+        If no free position was found on any batch
+    """
+    existing_objects = _get_existing_objects(existing_items)
+    n_candidates, n_tried_candidates = min_candidates, 0
+    for _ in range(max_batches):
+        items, positions = sample_items(n_candidates)
+        if not len(positions):
+            continue
+        is_free = _get_free_positions(items, existing_objects, positions)
+        if is_free.any():
+            x, z = positions[np.argmax(is_free)]
+            return [_move_item(item, float(x), float(z)) for item in items]
+        n_tried_candidates += len(positions)
+        n_candidates = min(2*n_candidates, max_candidates)
+    msg = 'Could not place %s after %i candidate positions' % (
+        str([item.name for item in items]), n_tried_candidates)
+    raise PlacementError(msg)
+
+def get_items_sampler(create_items, border_distance=None, occupancy_grid=None, random_state=np.random):
+    """
+    Returns a function that can be used as sample_items on place_items
+
+    If an occupancy grid is given the candidate positions are sampled from the positions
+    where the circle inscribed on the first item is free, so most of them are valid even
+    on dense arenas. If there is no such position no candidates are returned, so the
+    items are sampled again on the next batch.
+
+    Parameters
+    ----------
+    create_items : callable
+        Returns a list of items, items without position are placed at the origin
+    border_distance : float
+        Minimum distance between the candidate positions and the walls of the arena.
+        If None it is 1.2 times the biggest side of the first item
+    occupancy_grid : OccupancyGrid
+        Occupancy of the arena, it should contain the same items as the existing items
+        given to place_items
+    random_state : np.random.RandomState
+        Source of the random candidate positions, by default the global numpy random state
+    """
+    def sample_items(n_candidates):
+        items = create_items()
+        for item in items:
+            if not item.positions:
+                item.positions = [Vector3(0, 0, 0)]
+        distance = border_distance
+        if distance is None:
+            distance = np.max([items[0].sizes[0].x, items[0].sizes[0].z])*1.2
+        if occupancy_grid is not None:
+            radius = min(abs(items[0].sizes[0].x), abs(items[0].sizes[0].z))/2
+            positions = occupancy_grid.sample_free_positions(
+                radius, n_candidates, border_distance=distance, random_state=random_state)
+            return items, positions
+        positions = random_state.uniform(distance, ARENA_SIZE - distance, (n_candidates, 2))
+        return items, positions
+    return sample_items
+
+def get_free_positions(items, existing_items, positions):
+    """
+    Returns a boolean array that is True for the positions where the items can be placed
+    inside the arena without colliding with the existing items. The positions of the
+    items are relative to the origin.
+
+    Parameters
+    ----------
+    items : list
+        Items with positions relative to the origin
+    existing_items : list
+        Items already on the arena
+    positions : np.ndarray
+        (n, 2) x and z candidate positions for the origin
+    """
+    return _get_free_positions(items, _get_existing_objects(existing_items), positions)
+
+def _get_existing_objects(existing_items):
+    """
+    Returns the arrays of _get_objects_with_each_angle followed by an ObjectsGrid with
+    the objects, or None if there are no objects
+    """
+    existing_objects = [_get_object_geometry(item, item_idx) for item in existing_items
+                        for item_idx in range(_get_number_objects_inside_item(item))]
+    existing_objects = _get_objects_with_each_angle(existing_objects)
+    if existing_objects is None:
+        return None
+    return existing_objects + [ObjectsGrid(existing_objects[0], existing_objects[3])]
+
+def _get_free_positions(items, existing_objects, positions):
+    positions = np.asarray(positions, dtype=np.float64)
+    is_free = np.ones(len(positions), dtype=bool)
+    for item in items:
+        is_free &= ~_get_positions_out_of_arena(item, positions)
+    new_objects = _get_objects_with_each_angle(
+        [_get_object_geometry(item, item_idx) for item in items
+         for item_idx in range(_get_number_objects_inside_item(item))])
+    if new_objects is None or existing_objects is None:
+        return is_free
+    # position and new object of each query
+    n_new = len(new_objects[0])
+    query_idx = np.arange(np.count_nonzero(is_free)*n_new)
+    query_position_idx = np.nonzero(is_free)[0][query_idx//n_new]
+    query_new_idx = query_idx % n_new
+    query_centers = new_objects[0][query_new_idx] + positions[query_position_idx]
+    # Only the existing objects on the cells of each query are checked
+    query_idx, existing_idx = existing_objects[4].get_close_pairs(
+        query_centers, new_objects[3][query_new_idx])
+    position_idx, new_idx = query_position_idx[query_idx], query_new_idx[query_idx]
+    new_centers = query_centers[query_idx]
+    existing_centers = existing_objects[0][existing_idx]
+    # Only objects whose bounding circles overlap might collide
+    is_close = np.sum((new_centers - existing_centers)**2, axis=1) < \
+        (new_objects[3][new_idx] + existing_objects[3][existing_idx])**2
+    collisions = get_rectangle_collisions(
+        new_centers[is_close], new_objects[1][new_idx[is_close]], new_objects[2][new_idx[is_close]],
+        existing_centers[is_close], existing_objects[1][existing_idx[is_close]],
+        existing_objects[2][existing_idx[is_close]])
+    is_free[position_idx[is_close][collisions]] = False
+    return is_free
+
+class ObjectsGrid():
+    """
+    Uniform grid over the arena that stores on each cell the objects whose bounding box
+    touches the cell, the objects out of the arena are stored on the border cells
+
+    The grid is stored as a sorted array of objects and the index of the first object of
+    each cell, so the objects close to many queries can be found at once.
+
+    Parameters
+    ----------
+    centers : np.ndarray
+        (n, 2) x and z centers of the objects
+    radius : np.ndarray
+        (n,) radius of the bounding circles of the objects
+    cell_size : float
+        Size of the cells of the grid
+    """
+    def __init__(self, centers, radius, cell_size=GRID_CELL_SIZE):
+        self._cell_size = cell_size
+        self._n_cells = int(math.ceil(ARENA_SIZE/cell_size))
+        self._n_objects = len(centers)
+        object_idx, cells = self._get_covered_cells(centers, radius)
+        order = np.argsort(cells, kind='stable')
+        self._objects = object_idx[order]
+        self._cell_starts = np.searchsorted(cells[order], np.arange(self._n_cells**2 + 1))
+
+    def get_close_pairs(self, centers, radius):
+        """
+        Returns the indices of the queries and of the objects of each pair of query and
+        object that share some cell of the grid, each pair is returned only once
+
+        Parameters
+        ----------
+        centers : np.ndarray
+            (k, 2) x and z centers of the queries
+        radius : np.ndarray
+            (k,) radius of the bounding circles of the queries
+        """
+        query_idx, cells = self._get_covered_cells(centers, radius)
+        starts, counts = self._cell_starts[cells], np.diff(self._cell_starts)[cells]
+        query_idx = np.repeat(query_idx, counts)
+        offsets = np.arange(len(query_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+        object_idx = self._objects[np.repeat(starts, counts) + offsets]
+        pairs = np.unique(query_idx*self._n_objects + object_idx)
+        return pairs//self._n_objects, pairs % self._n_objects
+
+    def _get_covered_cells(self, centers, radius):
+        """
+        Returns the index of the circle and the flat index of the cell for each cell
+        covered by the bounding box of each circle
+        """
+        radius = np.asarray(radius)[:, np.newaxis]
+        first = self._get_cell_indices(centers - radius)
+        last = self._get_cell_indices(centers + radius)
+        shape = last - first + 1
+        n_cells = shape[:, 0]*shape[:, 1]
+        circle_idx = np.repeat(np.arange(len(centers)), n_cells)
+        offsets = np.arange(len(circle_idx)) - np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+        x = first[circle_idx, 0] + offsets//shape[circle_idx, 1]
+        z = first[circle_idx, 1] + offsets % shape[circle_idx, 1]
+        return circle_idx, x*self._n_cells + z
+
+    def _get_cell_indices(self, points):
+        indices = np.floor(np.asarray(points)/self._cell_size).astype(np.int64)
+        return np.clip(indices, 0, self._n_cells - 1)
+
+def _get_objects_with_each_angle(objects):
+    """
+    Returns arrays with the centers, sizes, angles and radius of the objects with one row
+    for each candidate angle of each object, or None if there are no objects
+    """
+    rows = [(center, size, angle, math.sqrt(size[0]**2 + size[1]**2)/2)
+            for center, size, angles in [obj for obj in objects if obj is not None]
+            for angle in angles]
+    if not rows:
+        return None
+    return [np.array(values, dtype=np.float64) for values in zip(*rows)]
+
+def _get_positions_out_of_arena(item, positions):
+    """ As detect_object_out_of_arena only the first object of the item is checked """
+    EPSILON = 1e-6
+    obj = _get_object_geometry(item)
+    if obj is None:
+        return np.zeros(len(positions), dtype=bool)
+    center, size, angles = obj
+    object_radius = math.sqrt(size[0]**2 + size[1]**2)/2
+    centers = positions + center
+    if centers.min() - object_radius >= 0 and centers.max() + object_radius <= ARENA_SIZE:
+        return np.zeros(len(positions), dtype=bool)
+    vertices = get_vertices([center]*len(angles), [size]*len(angles), angles).reshape(1, -1, 2)
+    vertices = vertices + positions[:, np.newaxis]
+    return ((vertices < 0 - EPSILON) | (vertices > ARENA_SIZE + EPSILON)).any(axis=(1, 2))
+
+def _move_item(item, x, z):
+    item.positions = [Vector3(position.x + x, position.y, position.z + z)
+                      for position in item.positions]
+    return item
@@ -0,0 +1,152 @@
+"""
+Pool of arenas generated in background
+
+Each category of arenas has a producer thread that keeps a bounded queue of arenas
+ready to be sent to the environment, so resetting the environment only needs to
+dequeue them instead of generating arenas on the training loop.
+
+The producers are threads, and generating an arena is python code that holds the GIL,
+so the pool only saves time when the training loop releases the GIL: while waiting
+for Unity to step or while running the neural network. If the training loop is
+python bound the producers slow it down instead.
+"""
+import time
+import logging
+import queue
+import threading
+import numpy as np
+from animalai.envs.arena_config import ArenaConfig
+
+from orangutan.arenas.generation import CATEGORIES, create_arena
+
+LOGGER = logging.getLogger(__name__)
+MAX_CONSECUTIVE_FAILURES = 10
+
+
+class ArenaPool(object):
+    '''
+    Keeps a bounded queue of generated arenas for each category
+
+    The category of each sampled arena is chosen with probability proportional to the
+    sum of the weights of its functions, as in generate_arena_config. It can be given
+    to EnvWrapper.reset instead of an ArenaConfig.
+
+    If creating an arena raises an exception it is logged and the producer tries again
+    with another arena. If max_consecutive_failures arenas of a category fail in a row
+    its producer stops and the last exception is raised by sample each time that category
+    is chosen.
+    '''
+    def __init__(self, t, categories=CATEGORIES, maxsize=16, seed=None,
+                 max_consecutive_failures=MAX_CONSECUTIVE_FAILURES):
+        """
+        Parameters
+        ----------
+        t : int
+            Max number of steps on the level
+        categories : list
+            List of (name, funcs_weights, options) as generation.CATEGORIES
+        maxsize : int
+            Max number of arenas on the queue of each category
+        seed : int
+            Seed used for sampling the categories and the seed of each producer, each
+            producer has its own random state so the global one is not used
+        max_consecutive_failures : int
+            Number of consecutive exceptions after which the producer of a category stops
+        """
+        self._t = t
+        self._names = [name for name, _, _ in categories]
+        self._queues = {name: queue.Queue(maxsize) for name in self._names}
+        self._n_produced = {name: 0 for name in self._names}
+        self._n_failures = {name: 0 for name in self._names}
+        self._production_time = {name: 0. for name in self._names}
+        self._max_consecutive_failures = max_consecutive_failures
+        category_weights = np.array([sum(weight for _, weight in funcs_weights)
+                                     for _, funcs_weights, _ in categories], dtype=np.float64)
+        self._category_probabilities = category_weights/np.sum(category_weights)
+        self._random_state = np.random.RandomState(seed)
+        producer_seeds = self._random_state.randint(2**31, size=len(categories))
+        self._n_sampled = 0
+        self._consumer_wait = 0.
+        self._stop_event = threading.Event()
+        self._producers = [
+            threading.Thread(target=self._produce, args=(name, funcs_weights, options, producer_seed),
+                             daemon=True)
+            for (name, funcs_weights, options), producer_seed in zip(categories, producer_seeds)]
+        for producer in self._producers:
+            producer.start()
+
+    def sample(self, n_arenas=1):
+        """ Returns an ArenaConfig with n_arenas arenas taken from the queues """
+        arena_config = ArenaConfig()
+        names = self._random_state.choice(self._names, n_arenas, p=self._category_probabilities)
+        t0 = time.time()
+        for idx, name in enumerate(names):
+            arena = self._queues[name].get()
+            if isinstance(arena, Exception):
+                # The producer has stopped, so the exception is kept for the next samples
+                self._queues[name].put(arena)
+                self._consumer_wait += time.time() - t0
+                raise arena
+            arena_config.arenas[idx] = arena
+        self._consumer_wait += time.time() - t0
+        self._n_sampled += n_arenas
+        return arena_config
+
+    def get_metrics(self):
+        """
+        Returns a dict with the depth of the queues, the number of arenas produced, the number
+        of failed arenas and the throughput of each category in arenas per second, the number
+        of sampled arenas and the total time the consumer has waited for arenas
+
+        The throughput only counts the time spent creating arenas, not the time the producer
+        is blocked because the queue is full.
+        """
+        return dict(
+            queue_depth={name: self._queues[name].qsize() for name in self._names},
+            n_produced=self._n_produced.copy(),
+            n_failures=self._n_failures.copy(),
+            throughput={name: n_produced/max(self._production_time[name], 1e-9)
+                        for name, n_produced in self._n_produced.items()},
+            n_sampled=self._n_sampled,
+            consumer_wait=self._consumer_wait,
+        )
+
+    def stop(self):
+        """ Stops the producers """
+        self._stop_event.set()
+        for producer in self._producers:
+            producer.join()
+
+    def _produce(self, name, funcs_weights, options, seed):
+        random_state = np.random.RandomState(seed)
+        funcs = [func for func, _ in funcs_weights]
+        weights = np.array([weight for _, weight in funcs_weights], dtype=np.float64)
+        probabilities = weights/np.sum(weights)
+        n_consecutive_failures = 0
+        while not self._stop_event.is_set():
+            func = funcs[random_state.choice(len(funcs), p=probabilities)]
+            t0 = time.time()
+            try:
+                arena = create_arena(func, self._t, random_state=random_state, **options)
+            except Exception as exception:
+                self._production_time[name] += time.time() - t0
+                self._n_failures[name] += 1
+                n_consecutive_failures += 1
+                LOGGER.exception('Could not create arena with %s', func.__name__)
+                if n_consecutive_failures >= self._max_consecutive_failures:
+                    self._put(name, exception)
+                    return
+                continue
+            self._production_time[name] += time.time() - t0
+            n_consecutive_failures = 0
+            self._n_produced[name] += 1
+            self._put(name, arena)
+
+    def _put(self, name, arena):
+        """ Puts the arena on the queue of the category, waiting while it is full """
+        while not self._stop_event.is_set():
+            try:
+                self._queues[name].put(arena, timeout=0.1)
+                break
+            except queue.Full:
+                continue
@@ -10,130 +10,131 @@ from orangutan.arenas.food import _create_agent_looking_center_at_random_positio
 DEFAULT_TIME_LIMIT = 500
 DEFAULT_REWARD = 2
 
-def create_arena_with_different_sizes_green_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_different_sizes_green_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
     size_small = DEFAULT_REWARD
     size_big = DEFAULT_REWARD*2
-    angle_big = angle + np.random.randint(-20, 21)
-    angle_small = angle + np.random.randint(-20, 21)
+    angle_big = angle + random_state.randint(-20, 21)
+    angle_small = angle + random_state.randint(-20, 21)
     while abs(angle_big - angle_small) < 15:
-        angle_small = angle + np.random.randint(-20, 21)
+        angle_small = angle + random_state.randint(-20, 21)
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_big, goal_type='GoodGoal',
-        min_distance=5, max_distance=20, size=size_big))
+        min_distance=5, max_distance=20, size=size_big, random_state=random_state))
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_small, goal_type='GoodGoal',
-        min_distance=5, max_distance=20, size=size_small))
+        min_distance=5, max_distance=20, size=size_small, random_state=random_state))
     return arena
 
-def create_arena_with_same_size_one_close_and_one_farther_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_same_size_one_close_and_one_farther_goal_in_front_of_agent(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
     size = DEFAULT_REWARD
-    angle_close = angle + np.random.randint(-20, 21)
-    angle_far = angle + np.random.randint(-20, 21)
+    angle_close = angle + random_state.randint(-20, 21)
+    angle_far = angle + random_state.randint(-20, 21)
     while abs(angle_close - angle_far) < 15:
-        angle_far = angle + np.random.randint(-20, 21)
+        angle_far = angle + random_state.randint(-20, 21)
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_close, goal_type='GoodGoal',
-        min_distance=5, max_distance=10, size=size))
+        min_distance=5, max_distance=10, size=size, random_state=random_state))
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_far, goal_type='GoodGoal',
-        min_distance=19, max_distance=40, size=size))
+        min_distance=19, max_distance=40, size=size, random_state=random_state))
     return arena
 
-def create_arena_with_different_sizes_green_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_different_sizes_green_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
     size_small = DEFAULT_REWARD
     size_big = DEFAULT_REWARD*2
-    angle_big = angle + np.random.randint(-20, 21)
-    angle_small = angle + np.random.randint(-20, 21)
+    angle_big = angle + random_state.randint(-20, 21)
+    angle_small = angle + random_state.randint(-20, 21)
     while abs(angle_big - angle_small) < 15:
-        angle_small = angle + np.random.randint(-20, 21)
+        angle_small = angle + random_state.randint(-20, 21)
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_big, goal_type='GoodGoal',
-        min_distance=15, max_distance=20, size=size_big))
+        min_distance=15, max_distance=20, size=size_big, random_state=random_state))
 
 
     arena.items.append(_create_wall_in_front_of_agent(
-        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14))
+        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14, random_state=random_state))
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_small, goal_type='GoodGoal',
-        min_distance=5, max_distance=10, size=size_small))
+        min_distance=5, max_distance=10, size=size_small, random_state=random_state))
     return arena
 
-def create_arena_with_same_size_green_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_same_size_green_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
     size_small = DEFAULT_REWARD
     size_big = DEFAULT_REWARD
-    angle_big = angle + np.random.randint(-20, 21)
-    angle_small = angle + np.random.randint(-20, 21)
+    angle_big = angle + random_state.randint(-20, 21)
+    angle_small = angle + random_state.randint(-20, 21)
     while abs(angle_big - angle_small) < 15:
-        angle_small = angle + np.random.randint(-20, 21)
+        angle_small = angle + random_state.randint(-20, 21)
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_big, goal_type='GoodGoal',
-        min_distance=15, max_distance=20, size=size_big))
+        min_distance=15, max_distance=20, size=size_big, random_state=random_state))
 
 
     arena.items.append(_create_wall_in_front_of_agent(
-        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14))
+        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14, random_state=random_state))
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_small, goal_type='GoodGoal',
-        min_distance=5, max_distance=10, size=size_small))
+        min_distance=5, max_distance=10, size=size_small, random_state=random_state))
     return arena
 
-def create_arena_with_yellow_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT):
+def create_arena_with_yellow_goal_separated_by_wall(t=DEFAULT_TIME_LIMIT, random_state=np.random):
     arena = Arena(t=t, items=[])
-    agent, x, z, angle = _create_agent_looking_center_at_random_position()
+    agent, x, z, angle = _create_agent_looking_center_at_random_position(random_state=random_state)
 
     arena.items.append(agent)
     size_small = DEFAULT_REWARD
     size_big = DEFAULT_REWARD
-    angle_big = angle + np.random.randint(-20, 21)
-    angle_small = angle + np.random.randint(-20, 21)
+    angle_big = angle + random_state.randint(-20, 21)
+    angle_small = angle + random_state.randint(-20, 21)
     while abs(angle_big - angle_small) < 15:
-        angle_small = angle + np.random.randint(-20, 21)
+        angle_small = angle + random_state.randint(-20, 21)
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_big, goal_type='GoodGoalMulti',
-        min_distance=15, max_distance=20, size=size_big))
+        min_distance=15, max_distance=20, size=size_big, random_state=random_state))
 
 
     arena.items.append(_create_wall_in_front_of_agent(
-        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14))
+        x, z, angle, wall_type='WallTransparent', min_distance=11, max_distance=14, random_state=random_state))
 
     arena.items.append(_create_goal_in_front_of_agent(
         x, z, angle_small, goal_type='GoodGoal',
-        min_distance=5, max_distance=10, size=size_small))
+        min_distance=5, max_distance=10, size=size_small, random_state=random_state))
     return arena
 
-def _create_wall_in_front_of_agent(x, z, angle, wall_type='WallTransparent', min_distance=15, max_distance=20):
+def _create_wall_in_front_of_agent(x, z, angle, wall_type='WallTransparent', min_distance=15, max_distance=20,
+                                   random_state=np.random):
     size = 1
     while 1:
-        distance = np.random.randint(min_distance, max_distance)
+        distance = random_state.randint(min_distance, max_distance)
         x_new, z_new = get_position_in_front_of_agent(x, z, angle, distance)
         if x_new > 0 + size/2 and x_new < 40 - size/2 and z_new > 0 + size/2 and z_new < 40 - size/2:
             break
-    height = np.random.uniform(5, 10)
-    width = np.random.uniform(10, 20)
-    thickness = np.random.uniform(1, 2)
+    height = random_state.uniform(5, 10)
+    width = random_state.uniform(10, 20)
+    thickness = random_state.uniform(1, 2)
     wall = Item(name=wall_type, positions=[Vector3(x_new, 0, z_new)], sizes=[Vector3(width, height, thickness)],
                 rotations=[normalize_angle(angle)])
     return wall
@@ -0,0 +1,144 @@
+"""
+Simplification of the geometry of the arenas
+
+Every object sent to Unity adds physics and rendering cost on each step, so objects that
+are not rotated and have the same appearance are merged when they touch along a whole
+side, for example the walls and pillars of a maze.
+"""
+from animalai.envs.arena_config import Vector3, RGB, Item
+
+from orangutan.arenas.geometry import _get_number_objects_inside_item
+
+MERGEABLE_NAMES = ['Wall', 'WallTransparent', 'DeathZone']
+EPSILON = 1e-6
+
+
+def merge_adjacent_objects(arena, names=MERGEABLE_NAMES):
+    """
+    Replaces the objects of the arena with the given names by the rectangles that result
+    of merging the objects that touch along a whole side
+
+    Only objects with rotation 0 are merged, and only with objects with the same name,
+    color, height and vertical position. The merged objects are added at the end of
+    the items of the arena with one item for each name and color.
+
+    Parameters
+    ----------
+    arena : Arena
+    names : list
+        Names of the items whose objects can be merged
+
+    Returns
+    -------
+    tuple
+        Number of objects of the arena before and after merging
+    """
+    n_objects_before = _count_objects(arena.items)
+    groups, items = {}, []
+    for item in arena.items:
+        if item.name not in names:
+            items.append(item)
+            continue
+        for item_idx in range(_get_number_objects_inside_item(item)):
+            key, rectangle = _get_key_and_rectangle(item, item_idx)
+            if key is None:
+                items.append(_get_single_object_item(item, item_idx))
+            else:
+                groups.setdefault(key, []).append(rectangle)
+    for key, rectangles in groups.items():
+        items.append(_create_item_from_rectangles(key, _merge_rectangles(rectangles)))
+    arena.items = items
+    return n_objects_before, _count_objects(arena.items)
+
+def merge_boxes(positions, sizes):
+    """
+    Merges boxes with rotation 0 that touch along a whole side, only boxes with the same
+    height and vertical position are merged
+
+    Returns
+    -------
+    tuple
+        Lists with the positions and sizes of the merged boxes
+    """
+    groups = {}
+    for position, size in zip(positions, sizes):
+        key = (round(position.y, 6), round(size.y, 6))
+        rectangle = (position.x - size.x/2, position.x + size.x/2,
+                     position.z - size.z/2, position.z + size.z/2)
+        groups.setdefault(key, []).append(rectangle)
+    merged_positions, merged_sizes = [], []
+    for (y, size_y), rectangles in groups.items():
+        group_positions, group_sizes = _get_positions_and_sizes(_merge_rectangles(rectangles), y, size_y)
+        merged_positions.extend(group_positions)
+        merged_sizes.extend(group_sizes)
+    return merged_positions, merged_sizes
+
+def _count_objects(items):
+    return sum(_get_number_objects_inside_item(item) for item in items)
+
+def _get_key_and_rectangle(item, item_idx):
+    """
+    Returns the properties that must be equal to merge two objects and the rectangle
+    (x_min, x_max, z_min, z_max) of the object, or None if the object cannot be merged
+    """
+    if item_idx >= len(item.positions) or item_idx >= len(item.sizes) or \
+            item_idx >= len(item.rotations) or item.rotations[item_idx] != 0:
+        return None, None
+    position, size = item.positions[item_idx], item.sizes[item_idx]
+    color = item.colors[item_idx] if item_idx < len(item.colors) else None
+    color_key = None if color is None else (color.r, color.g, color.b)
+    key = (item.name, color_key, round(position.y, 6), round(size.y, 6))
+    rectangle = (position.x - size.x/2, position.x + size.x/2,
+                 position.z - size.z/2, position.z + size.z/2)
+    return key, rectangle
+
+def _get_single_object_item(item, item_idx):
+    def get_value(values):
+        return values[item_idx:item_idx + 1]
+    return Item(name=item.name, positions=get_value(item.positions), rotations=get_value(item.rotations),
+                sizes=get_value(item.sizes), colors=get_value(item.colors))
+
+def _merge_rectangles(rectangles):
+    """
+    Merges the rectangles that share a whole side, first along x and then along z,
+    until no more rectangles can be merged
+    """
+    n_rectangles = None
+    while n_rectangles != len(rectangles):
+        n_rectangles = len(rectangles)
+        rectangles = _merge_rectangles_along_axis(rectangles, axis=0)
+        rectangles = _merge_rectangles_along_axis(rectangles, axis=1)
+    return rectangles
+
+def _merge_rectangles_along_axis(rectangles, axis):
+    """ axis 0 merges rectangles with the same z side that are consecutive along x """
+    start, end = 2*axis, 2*axis + 1
+    other_start, other_end = 2 - 2*axis, 3 - 2*axis
+    rectangles = sorted(rectangles, key=lambda r: (round(r[other_start], 6), round(r[other_end], 6), r[start]))
+    merged = [rectangles[0]]
+    for rectangle in rectangles[1:]:
+        last = merged[-1]
+        if abs(last[other_start] - rectangle[other_start]) < EPSILON and \
+                abs(last[other_end] - rectangle[other_end]) < EPSILON and \
+                abs(last[end] - rectangle[start]) < EPSILON:
+            last = list(last)
+            last[end] = rectangle[end]
+            merged[-1] = tuple(last)
+        else:
+            merged.append(rectangle)
+    return merged
+
+def _create_item_from_rectangles(key, rectangles):
+    name, color_key, y, size_y = key
+    positions, sizes = _get_positions_and_sizes(rectangles, y, size_y)
+    item = Item(name=name, positions=positions, rotations=[0]*len(rectangles), sizes=sizes, colors=[])
+    if color_key is not None:
+        item.colors = [RGB(*color_key)]*len(rectangles)
+    return item
+
+def _get_positions_and_sizes(rectangles, y, size_y):
+    positions, sizes = [], []
+    for x_min, x_max, z_min, z_max in rectangles:
+        positions.append(Vector3((x_min + x_max)/2, y, (z_min + z_max)/2))
+        sizes.append(Vector3(x_max - x_min, size_y, z_max - z_min))
+    return positions, sizes
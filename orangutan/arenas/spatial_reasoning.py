@@ -1,12 +1,19 @@
 """
 Spatial reasoning
 """
+import os
+import json
+import random
+import logging
 import numpy as np
 from animalai.envs.arena_config import Vector3, RGB, Item, Arena, ArenaConfig
 
-from orangutan.arenas.utils import GRAY, PINK, BLUE
-from orangutan.arenas.geometry import detect_collisions, CollisionDetected
-from orangutan.arenas.maze import Maze
+from orangutan.arenas import mazes as mazes_module
+from orangutan.arenas.utils import GRAY, PINK, BLUE, get_cache_dir
+from orangutan.arenas.simplification import merge_boxes
+from orangutan.arenas.mazes import (
+    generate_mazes, generate_maze, enumerate_maze_layouts, get_longest_path_lengths,
+    get_dead_end_counts, S, E)
 from orangutan.arenas.avoidance import _add_simple_goal as _add_goal_on_fixed_position
 from orangutan.arenas.obstacles import _add_simple_goal
 from orangutan.arenas.avoidance import _add_agent_to_arena
@@ -15,16 +22,22 @@ DEFAULT_REWARD = 2
 WALL_HEIGHT = 5
 PLATFORM_HEIGHT = 2
 DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
+# Mazes used to find the difficulty thresholds of the sizes that are not enumerated
+MAZE_REFERENCE_SAMPLE_SIZE = 2000
+MAX_MAZE_GENERATION_TRIES = 100
+# Increase it when the content of the cache of the maze layouts changes
+MAZE_CACHE_FORMAT_VERSION = 1
+LOGGER = logging.getLogger(__name__)
 
 
 """
 Walls maze
 """
 
-def create_arena_with_walls_maze(t, difficulty=None):
+def create_arena_with_walls_maze(t, difficulty=None, maze_difficulty=None, random_state=np.random):
     arena = Arena(t=t, items=[])
     if difficulty is None:
-        difficulty = np.random.choice(DIFFICULTY_LEVELS)
+        difficulty = random_state.choice(DIFFICULTY_LEVELS)
     else:
         assert difficulty in DIFFICULTY_LEVELS
     if difficulty == 'easy':
@@ -36,21 +49,30 @@ def create_arena_with_walls_maze(t, difficulty=None):
     else:
         raise Exception('Unknown difficulty: %s' % difficulty)
 
-    _add_walls_maze(arena, n_cells=n_cells, wall_thickness=1)
-    _apply_color_to_wall_maze(arena)
+    _add_walls_maze(arena, n_cells=n_cells, wall_thickness=1, maze_difficulty=maze_difficulty,
+                    random_state=random_state)
+    _apply_color_to_wall_maze(arena, random_state=random_state)
     for _ in range(DEFAULT_REWARD):
-        _add_simple_goal(arena)
+        _add_simple_goal(arena, random_state=random_state)
     return arena
 
-def _add_walls_maze(arena, n_cells, wall_thickness):
-    _add_wall_pillars_to_maze(arena, n_cells, wall_thickness)
-    _add_walls(arena, n_cells, wall_thickness)
+def _add_walls_maze(arena, n_cells, wall_thickness, maze=None, maze_difficulty=None, random_state=np.random):
+    """
+    Adds the pillars and walls of the maze as a single item, maze is an array of walls as
+    returned by generate_mazes, if None a maze is sampled from the library with the
+    given difficulty
+    """
+    if maze is None:
+        positions, sizes = WALLS_MAZE_LIBRARY.sample(n_cells, wall_thickness, maze_difficulty, random_state)
+    else:
+        positions, sizes = WALLS_MAZE_LIBRARY.get_walls(maze, wall_thickness)
+    walls = Item(name='Wall', positions=list(positions), rotations=[0]*len(positions), sizes=list(sizes))
+    arena.items.append(walls)
 
-def _add_wall_pillars_to_maze(arena, n_cells, wall_thickness):
+def _get_pillars_positions_and_sizes(wall_thickness, n_cells, height):
     positions = _get_pillars_positions(n_cells)
-    sizes = [Vector3(wall_thickness, WALL_HEIGHT, wall_thickness)]*len(positions)
-    pillars = Item(name='Wall', positions=positions, rotations=[0]*len(positions), sizes=sizes)
-    arena.items.append(pillars)
+    sizes = [Vector3(wall_thickness, height, wall_thickness)]*len(positions)
+    return positions, sizes
 
 def _get_pillars_positions(n_cells):
     centers = np.linspace(0, 40, n_cells, endpoint=False)[1:].tolist()
@@ -60,24 +82,12 @@ def _get_pillars_positions(n_cells):
             positions.append(Vector3(x, 0, z))
     return positions
 
-def _add_walls(arena, n_cells, wall_thickness):
-    maze = Maze()
-    maze = maze.generate(n_cells, n_cells)
-    for cell in maze.cells:
-        positions, sizes = _get_cell_walls_positions_and_sizes(
-            cell, wall_thickness, n_cells, WALL_HEIGHT)
-        if positions:
-            wall = Item(name='Wall', positions=positions, rotations=[0]*len(positions), sizes=sizes)
-            arena.items.append(wall)
-
-def _get_cell_walls_positions_and_sizes(cell, wall_thickness, n_cells, height):
+def _get_cell_walls_positions_and_sizes(cell_x_idx, cell_z_idx, cell_walls, wall_thickness, n_cells, height):
     centers = np.linspace(0, 40, n_cells, endpoint=False)[1:].tolist()
     positions, sizes = [], []
-    cell_x_idx = cell.x
-    cell_z_idx = cell.y
 
     # horizontal walls
-    if cell_z_idx < n_cells - 1 and 's' in cell.walls:
+    if cell_z_idx < n_cells - 1 and cell_walls & S:
         wall_length = (40 - n_cells*wall_thickness)/n_cells
         if not cell_x_idx or cell_x_idx == n_cells -1:
             wall_length += wall_thickness/2
@@ -89,7 +99,7 @@ def _get_cell_walls_positions_and_sizes(cell, wall_thickness, n_cells, height):
         positions.append(Vector3(x, 0, centers[cell_z_idx]))
 
     # vertical walls
-    if cell_x_idx < n_cells - 1 and 'e' in cell.walls:
+    if cell_x_idx < n_cells - 1 and cell_walls & E:
         wall_length = (40 - n_cells*wall_thickness)/n_cells
         if not cell_z_idx or cell_z_idx == n_cells -1:
             wall_length += wall_thickness/2
@@ -101,8 +111,8 @@ def _get_cell_walls_positions_and_sizes(cell, wall_thickness, n_cells, height):
         positions.append(Vector3(centers[cell_x_idx], 0, z))
     return positions, sizes
 
-def _apply_color_to_wall_maze(arena):
-    option = np.random.choice(['random', 'transparent', 'gray'])
+def _apply_color_to_wall_maze(arena, random_state=np.random):
+    option = random_state.choice(['random', 'transparent', 'gray'])
     for item in arena.items:
         if option == 'transparent':
             item.name = 'WallTransparent'
@@ -113,27 +123,28 @@ def _apply_color_to_wall_maze(arena):
 Death maze
 """
 
-def create_arena_with_death_maze(t, difficulty=None):
+def create_arena_with_death_maze(t, difficulty=None, maze_difficulty=None, random_state=np.random):
     arena = Arena(t=t, items=[])
     if difficulty is None:
-        difficulty = np.random.choice(DIFFICULTY_LEVELS)
+        difficulty = random_state.choice(DIFFICULTY_LEVELS)
     else:
         assert difficulty in DIFFICULTY_LEVELS
     if difficulty == 'easy':
         n_cells = 3
     elif difficulty == 'medium':
-        n_cells = np.random.randint(3, 5)
+        n_cells = random_state.randint(3, 5)
     elif difficulty == 'hard':
         n_cells = 4 # 5 seems to be very difficult
     else:
         raise Exception('Unknown difficulty: %s' % difficulty)
     wall_thickness = 4
 
-    _add_walls_maze(arena, n_cells=n_cells, wall_thickness=wall_thickness)
+    _add_walls_maze(arena, n_cells=n_cells, wall_thickness=wall_thickness,
+                    maze_difficulty=maze_difficulty, random_state=random_state)
     _replace_walls_by_death_zones(arena)
     for _ in range(DEFAULT_REWARD):
-        _add_goal_on_fixed_position(arena)
-    _add_agent_to_arena(arena)
+        _add_goal_on_fixed_position(arena, random_state=random_state)
+    _add_agent_to_arena(arena, random_state=random_state)
     return arena
 
 def _replace_walls_by_death_zones(arena):
@@ -143,49 +154,44 @@ def _replace_walls_by_death_zones(arena):
 """
 Platform maze
 """
-def create_arena_with_platform_maze(t, difficulty=None):
+def create_arena_with_platform_maze(t, difficulty=None, maze_difficulty=None, random_state=np.random):
     arena = Arena(t=t, items=[])
 
     if difficulty is None:
-        difficulty = np.random.choice(DIFFICULTY_LEVELS)
+        difficulty = random_state.choice(DIFFICULTY_LEVELS)
     else:
         assert difficulty in DIFFICULTY_LEVELS
     if difficulty == 'easy':
         n_cells = 3
     elif difficulty == 'medium':
-        n_cells = np.random.randint(3, 5)
+        n_cells = random_state.randint(3, 5)
     elif difficulty == 'hard':
         n_cells = 4
     else:
         raise Exception('Unknown difficulty: %s' % difficulty)
     wall_thickness = 6
 
-    _add_platform_maze(arena, n_cells=n_cells, wall_thickness=wall_thickness)
-    _apply_color_to_platform_maze(arena)
-    _add_goals_and_agent_to_platform_maze(arena, n_cells, wall_thickness)
+    _add_platform_maze(arena, n_cells=n_cells, wall_thickness=wall_thickness,
+                       maze_difficulty=maze_difficulty, random_state=random_state)
+    _apply_color_to_platform_maze(arena, random_state=random_state)
+    _add_goals_and_agent_to_platform_maze(arena, n_cells, wall_thickness, random_state=random_state)
     item = Item(name='DeathZone', sizes=[Vector3(40, 0, 40)],
                     positions=[Vector3(20, 0, 20)], rotations=[0])
     arena.items.append(item)
     return arena
 
-def _add_platform_maze(arena, n_cells, wall_thickness):
-    _add_platforms_to_maze(arena, n_cells, wall_thickness)
-
-def _add_platforms_to_maze(arena, n_cells, wall_thickness):
-    maze = Maze()
-    maze = maze.generate(n_cells, n_cells)
-    for cell in maze.cells:
-        positions, sizes = _get_cell_walls_positions_and_sizes_for_platforms(
-            cell, wall_thickness, n_cells, PLATFORM_HEIGHT)
-        if positions:
-            wall = Item(name='Wall', positions=positions, rotations=[0]*len(positions), sizes=sizes)
-            arena.items.append(wall)
+def _add_platform_maze(arena, n_cells, wall_thickness, maze=None, maze_difficulty=None, random_state=np.random):
+    """ Adds the platforms of the maze as a single item, see _add_walls_maze """
+    if maze is None:
+        positions, sizes = PLATFORM_MAZE_LIBRARY.sample(n_cells, wall_thickness, maze_difficulty, random_state)
+    else:
+        positions, sizes = PLATFORM_MAZE_LIBRARY.get_walls(maze, wall_thickness)
+    platforms = Item(name='Wall', positions=list(positions), rotations=[0]*len(positions), sizes=list(sizes))
+    arena.items.append(platforms)
 
-def _get_cell_walls_positions_and_sizes_for_platforms(cell, wall_thickness, n_cells, height):
+def _get_cell_walls_positions_and_sizes_for_platforms(cell_x_idx, cell_z_idx, cell_walls, wall_thickness, n_cells, height):
     centers = np.linspace(0, 40, n_cells, endpoint=False)[1:].tolist()
     positions, sizes = [], []
-    cell_x_idx = cell.x
-    cell_z_idx = cell.y
     # platform
     wall_length_x = (40 - n_cells*wall_thickness)/n_cells
     if not cell_x_idx or cell_x_idx == n_cells -1:
@@ -205,7 +211,7 @@ def _get_cell_walls_positions_and_sizes_for_platforms(cell, wall_thickness, n_ce
     sizes.append(Vector3(wall_length_x, height, wall_length_z))
 
     # horizontal walls
-    if cell_z_idx < n_cells - 1 and 's' not in cell.walls:
+    if cell_z_idx < n_cells - 1 and not cell_walls & S:
         wall_length = (40 - n_cells*wall_thickness)/n_cells
         if not cell_x_idx or cell_x_idx == n_cells -1:
             wall_length += wall_thickness/2
@@ -217,7 +223,7 @@ def _get_cell_walls_positions_and_sizes_for_platforms(cell, wall_thickness, n_ce
         positions.append(Vector3(x, 0, centers[cell_z_idx]))
 
     # vertical walls
-    if cell_x_idx < n_cells - 1 and 'e' not in cell.walls:
+    if cell_x_idx < n_cells - 1 and not cell_walls & E:
         wall_length = (40 - n_cells*wall_thickness)/n_cells
         if not cell_z_idx or cell_z_idx == n_cells -1:
             wall_length += wall_thickness/2
@@ -229,22 +235,22 @@ def _get_cell_walls_positions_and_sizes_for_platforms(cell, wall_thickness, n_ce
         positions.append(Vector3(centers[cell_x_idx], 0, z))
     return positions, sizes
 
-def _apply_color_to_platform_maze(arena):
-    option = np.random.choice(['random', 'blue'])
+def _apply_color_to_platform_maze(arena, random_state=np.random):
+    option = random_state.choice(['random', 'blue'])
     for item in arena.items:
         if option == 'blue':
             item.colors = [BLUE]*len(item.rotations)
 
-def _add_goals_and_agent_to_platform_maze(arena, n_cells, wall_thickness):
+def _add_goals_and_agent_to_platform_maze(arena, n_cells, wall_thickness, random_state=np.random):
     centers = np.linspace(0, 40, n_cells, endpoint=False).tolist()
     wall_length = (40 - n_cells*wall_thickness)/n_cells
     if n_cells % 2 == 1:
         x_indexes = [0, n_cells//2, n_cells -1]
     else:
-        x_indexes = [0, np.random.choice([n_cells//2, n_cells//2-1]), n_cells -1]
+        x_indexes = [0, random_state.choice([n_cells//2, n_cells//2-1]), n_cells -1]
     z_indexes = x_indexes.copy()
-    np.random.shuffle(x_indexes)
-    np.random.shuffle(z_indexes)
+    random_state.shuffle(x_indexes)
+    random_state.shuffle(z_indexes)
     for idx in range(3):
         x = float(centers[x_indexes[idx]] + wall_length/2 + wall_thickness/2)
         z = float(centers[z_indexes[idx]] + wall_length/2 + wall_thickness/2)
@@ -252,4 +258,202 @@ def _add_goals_and_agent_to_platform_maze(arena, n_cells, wall_thickness):
                     positions=[Vector3(x, PLATFORM_HEIGHT, z)])
         if not idx:
             item.name = 'Agent'
-        arena.items.append(item)
\ No newline at end of file
+        arena.items.append(item)
+
+"""
+Maze library
+"""
+
+class MazeLibrary(object):
+    '''
+    Mazes with the positions and sizes of their walls
+
+    The walls of each maze are merged with merge_boxes, so the arenas have few objects
+    without merging them each time a maze is added to an arena.
+
+    Sizes with few different layouts, like 3x3 and 4x4, are enumerated the first time
+    they are needed, see enumerate_maze_layouts, and the walls of each layout are
+    computed once. Enumerating them takes most of a second, so the layouts and their
+    metrics are cached on npz files, see _get_maze_layouts_entry. The layouts are sorted by the length of their longest path and the
+    number of dead ends, and each difficulty level is a third of the probability of the
+    layouts, so sampling is O(1) and follows the distribution of the maze generator.
+
+    Bigger sizes have too many layouts to be stored, so a new maze is generated for
+    each sample with the random state given to sample. The difficulty levels are
+    given by the thresholds of a reference sample of mazes and the maze is generated
+    again until it has the requested difficulty, a warning is logged if no maze of the
+    requested difficulty is found after MAX_MAZE_GENERATION_TRIES.
+    '''
+    def __init__(self, get_cell_walls_positions_and_sizes, height, get_fixed_walls_positions_and_sizes=None):
+        """
+        Parameters
+        ----------
+        get_cell_walls_positions_and_sizes : callable
+            Function that returns the positions and sizes of the walls of a cell as
+            _get_cell_walls_positions_and_sizes
+        height : float
+            Height of the walls
+        get_fixed_walls_positions_and_sizes : callable
+            Function that returns the positions and sizes of the walls that are on every
+            maze, called with wall_thickness, n_cells and height
+        """
+        self._get_cell_walls_positions_and_sizes = get_cell_walls_positions_and_sizes
+        self._get_fixed_walls_positions_and_sizes = get_fixed_walls_positions_and_sizes
+        self._height = height
+        self._walls = {}
+
+    def sample(self, n_cells, wall_thickness, difficulty=None, random_state=np.random):
+        """
+        Returns the positions and sizes of the merged walls of a random maze, the lists
+        may be shared by all the samples of the same maze so they must not be modified
+
+        Parameters
+        ----------
+        n_cells : int
+            Number of cells on each side of the maze
+        wall_thickness : float
+            Thickness of the walls
+        difficulty : str
+            One of DIFFICULTY_LEVELS, if None the maze is sampled from all the mazes
+        random_state : np.random.RandomState
+            Source of the random numbers, by default the global numpy random state
+        """
+        entry = _get_maze_layouts_entry(n_cells)
+        if entry['draws'] is None:
+            maze = self._generate_maze(entry, n_cells, difficulty, random_state)
+            return self.get_walls(maze, wall_thickness)
+        draws = entry['draws']
+        if difficulty is not None:
+            level = DIFFICULTY_LEVELS.index(difficulty)
+            draws = draws[level*len(draws)//len(DIFFICULTY_LEVELS):
+                          (level + 1)*len(draws)//len(DIFFICULTY_LEVELS)]
+        layout_idx = draws[random_state.randint(len(draws))]
+        return self._get_layout_walls(entry, n_cells, wall_thickness, layout_idx)
+
+    def get_metrics(self, n_cells):
+        """
+        Returns a dict with the mazes of the given size, their probabilities and the
+        arrays longest_path_length and n_dead_ends with their metrics. For sizes that
+        are not enumerated the mazes are the reference sample used for the difficulty
+        """
+        entry = _get_maze_layouts_entry(n_cells)
+        return dict(mazes=entry['mazes'], probabilities=entry['probabilities'],
+                    longest_path_length=entry['longest_path_length'], n_dead_ends=entry['n_dead_ends'])
+
+    def get_walls(self, maze, wall_thickness):
+        """ Returns the positions and sizes of the merged walls of the given maze """
+        return merge_boxes(*self._get_unmerged_walls(maze, wall_thickness))
+
+    def _get_unmerged_walls(self, maze, wall_thickness):
+        n_cells = len(maze)
+        positions, sizes = [], []
+        if self._get_fixed_walls_positions_and_sizes is not None:
+            positions, sizes = self._get_fixed_walls_positions_and_sizes(wall_thickness, n_cells, self._height)
+            positions, sizes = list(positions), list(sizes)
+        for (cell_z_idx, cell_x_idx), cell_walls in np.ndenumerate(maze):
+            cell_positions, cell_sizes = self._get_cell_walls_positions_and_sizes(
+                cell_x_idx, cell_z_idx, cell_walls, wall_thickness, n_cells, self._height)
+            positions.extend(cell_positions)
+            sizes.extend(cell_sizes)
+        return positions, sizes
+
+    def _get_layout_walls(self, entry, n_cells, wall_thickness, layout_idx):
+        key = (n_cells, wall_thickness, layout_idx)
+        if key not in self._walls:
+            self._walls[key] = self.get_walls(entry['mazes'][layout_idx], wall_thickness)
+        return self._walls[key]
+
+    @staticmethod
+    def _generate_maze(entry, n_cells, difficulty, random_state):
+        # generate_maze needs a python random generator, it is seeded from random_state
+        random_generator = random.Random(random_state.randint(2**31))
+        for _ in range(MAX_MAZE_GENERATION_TRIES):
+            maze = generate_maze(n_cells, n_cells, random_generator)
+            if difficulty is None or _get_maze_difficulty(entry, maze) == difficulty:
+                return maze
+        LOGGER.warning('Could not generate a %s maze of %ix%i cells after %i tries, using a %s maze',
+                       difficulty, n_cells, n_cells, MAX_MAZE_GENERATION_TRIES,
+                       _get_maze_difficulty(entry, maze))
+        return maze
+
+
+def _get_maze_layouts_entry(n_cells):
+    """
+    Returns the layouts of the mazes of the given size with their metrics, shared by all
+    the libraries because they do not depend on the walls
+    """
+    if n_cells not in _MAZE_LAYOUTS:
+        mazes, counts, longest_path_length, n_dead_ends, is_enumerated = _load_maze_layouts(n_cells)
+        order = np.lexsort((n_dead_ends, longest_path_length))
+        # Each layout is repeated as many times as it was drawn
+        draws = np.repeat(order, counts[order])
+        thresholds = [(longest_path_length[draws[level*len(draws)//len(DIFFICULTY_LEVELS)]],
+                       n_dead_ends[draws[level*len(draws)//len(DIFFICULTY_LEVELS)]])
+                      for level in range(1, len(DIFFICULTY_LEVELS))]
+        _MAZE_LAYOUTS[n_cells] = dict(
+            mazes=mazes,
+            probabilities=counts/np.sum(counts),
+            longest_path_length=longest_path_length,
+            n_dead_ends=n_dead_ends,
+            draws=draws if is_enumerated else None,
+            thresholds=thresholds,
+        )
+    return _MAZE_LAYOUTS[n_cells]
+
+def _load_maze_layouts(n_cells):
+    """
+    Returns the layouts of the mazes of the given size, the number of times each one was
+    drawn, their metrics and whether they are enumerated or a reference sample
+
+    They are read from a npz file on the directory of the package or on the one given by
+    utils.CACHE_DIR_ENV_VAR. The cache is only used if it was written with the same
+    version of the mazes module and the same parameters, otherwise the layouts are
+    computed and the cache is written if possible.
+    """
+    cache_path = os.path.join(get_cache_dir(os.path.dirname(os.path.realpath(__file__))),
+                              'maze_layouts_%i.npz' % n_cells)
+    cache_key = json.dumps(_get_maze_layouts_cache_key(n_cells))
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if str(cache['key']) == cache_key:
+                return (cache['mazes'], cache['counts'], cache['longest_path_length'],
+                        cache['n_dead_ends'], bool(cache['is_enumerated']))
+    except Exception:
+        # A missing or corrupted cache
+        pass
+    mazes, counts = enumerate_maze_layouts(n_cells, n_cells)
+    is_enumerated = mazes is not None
+    if not is_enumerated:
+        random_state = np.random.RandomState([n_cells])
+        mazes = generate_mazes(MAZE_REFERENCE_SAMPLE_SIZE, n_cells, n_cells, random_state)
+        counts = np.ones(len(mazes), dtype=np.int64)
+    longest_path_length = get_longest_path_lengths(mazes)
+    n_dead_ends = get_dead_end_counts(mazes)
+    # Written on a temporary file so other processes never read a partial cache
+    temporary_path = '%s.%i.npz' % (cache_path, os.getpid())
+    try:
+        np.savez(temporary_path, key=cache_key, mazes=mazes, counts=counts,
+                 longest_path_length=longest_path_length, n_dead_ends=n_dead_ends,
+                 is_enumerated=is_enumerated)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return mazes, counts, longest_path_length, n_dead_ends, is_enumerated
+
+def _get_maze_layouts_cache_key(n_cells):
+    """ The layouts depend on the code of the mazes module and the parameters of the enumeration """
+    module_path = os.path.realpath(mazes_module.__file__)
+    return [MAZE_CACHE_FORMAT_VERSION, n_cells, MAZE_REFERENCE_SAMPLE_SIZE, module_path,
+            os.path.getmtime(module_path), os.path.getsize(module_path), np.__version__]
+
+def _get_maze_difficulty(entry, maze):
+    metrics = (get_longest_path_lengths([maze])[0], get_dead_end_counts([maze])[0])
+    level = sum(metrics >= threshold for threshold in entry['thresholds'])
+    return DIFFICULTY_LEVELS[level]
+
+
+_MAZE_LAYOUTS = {}
+WALLS_MAZE_LIBRARY = MazeLibrary(_get_cell_walls_positions_and_sizes, WALL_HEIGHT,
+                                 _get_pillars_positions_and_sizes)
+PLATFORM_MAZE_LIBRARY = MazeLibrary(_get_cell_walls_positions_and_sizes_for_platforms, PLATFORM_HEIGHT)
@@ -1,10 +1,168 @@
-from animalai.envs.arena_config import RGB
+import os
+import json
+from animalai.envs.arena_config import RGB, Vector3, Item, Arena
 from animalai.envs.arena_config import ArenaConfig
 
+CACHE_DIR_ENV_VAR = 'ORANGUTAN_CACHE_DIR'
+# Increase it when the content of the cache of LazyArenaTemplates changes
+CACHE_FORMAT_VERSION = 2
+
 GRAY = RGB(153, 153, 153)
 PINK = RGB(255, 0, 255)
 BLUE = RGB(0, 0, 255)
 
+class ArenaTemplate(object):
+    '''
+    Arena that is used to create many arenas that only differ on the time limit, the
+    blackouts or the colors of the items
+
+    The created arenas have their own copies of the items, built directly from their
+    values, which is much faster than deepcopy. So the created arenas can be modified
+    without changing the template or the other arenas.
+    '''
+    def __init__(self, arena):
+        self._t = arena.t
+        self._items = tuple(_copy_item(item) for item in arena.items)
+        self._blackouts = tuple(getattr(arena, 'blackouts', None) or [])
+
+    @property
+    def items(self):
+        """ Copies of the items of the template """
+        return [_copy_item(item) for item in self._items]
+
+    def create(self, t=None, blackouts=None, colors=None):
+        """
+        Returns a new arena, the template values are used for the None arguments
+
+        Parameters
+        ----------
+        t : int
+            Time limit of the arena
+        blackouts : list
+            Blackouts of the arena
+        colors : dict
+            List of RGB colors of the objects of the item for each item index that has
+            to be changed, an empty list removes the colors of the item
+        """
+        if t is None:
+            t = self._t
+        if blackouts is None:
+            blackouts = self._blackouts
+        items = self.items
+        for item_idx, item_colors in (colors or {}).items():
+            items[item_idx].colors = list(item_colors)
+        return Arena(t=t, items=items, blackouts=list(blackouts))
+
+def _copy_item(item):
+    """ Returns a copy of the item, faster than deepcopy because it only copies the known values """
+    return Item(name=item.name,
+                positions=[Vector3(p.x, p.y, p.z) for p in getattr(item, 'positions', None) or []],
+                rotations=list(getattr(item, 'rotations', None) or []),
+                sizes=[Vector3(size.x, size.y, size.z) for size in getattr(item, 'sizes', None) or []],
+                colors=[RGB(color.r, color.g, color.b) for color in getattr(item, 'colors', None) or []])
+
+class LazyArenaTemplates(object):
+    '''
+    ArenaTemplates of a yaml file that is only loaded the first time an arena is accessed
+
+    The parsed arenas are cached on a json file, next to the yaml file or on the
+    directory given by the environment variable CACHE_DIR_ENV_VAR. The json only contains
+    the values of the arenas, so reading a cache written by someone else cannot run
+    code. The cache is only used
+    if it was written from the same yaml file, with the same version of animalai and the
+    same CACHE_FORMAT_VERSION, otherwise or if it cannot be read the yaml is parsed. If
+    the cache cannot be written, for example because the package is installed on a read
+    only location, the yaml is parsed on each process.
+    '''
+    def __init__(self, yaml_path):
+        self._yaml_path = yaml_path
+        self._templates = None
+
+    @property
+    def is_loaded(self):
+        return self._templates is not None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __len__(self):
+        return len(self._load())
+
+    def get_cache_path(self):
+        """ Returns the path of the json file used as cache """
+        cache_name = os.path.splitext(os.path.basename(self._yaml_path))[0] + '.json'
+        return os.path.join(get_cache_dir(os.path.dirname(self._yaml_path)), cache_name)
+
+    def _load(self):
+        if self._templates is None:
+            self._templates = {key: ArenaTemplate(arena) for key, arena in self._load_arenas().items()}
+        return self._templates
+
+    def _load_arenas(self):
+        cache_path = self.get_cache_path()
+        # The key is compared after a round trip to json, that converts tuples to lists
+        cache_key = json.loads(json.dumps(self._get_cache_key()))
+        try:
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+            if cache['key'] == cache_key:
+                return {int(key): _arena_from_dict(arena) for key, arena in cache['arenas'].items()}
+        except Exception:
+            # A missing or corrupted cache, or one written with another format
+            pass
+        arenas = ArenaConfig(self._yaml_path).arenas
+        # Written on a temporary file so other processes never read a partial cache
+        temporary_path = '%s.%i' % (cache_path, os.getpid())
+        cache = dict(key=cache_key, arenas={key: _arena_to_dict(arena) for key, arena in arenas.items()})
+        try:
+            with open(temporary_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(temporary_path, cache_path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return arenas
+
+    def _get_cache_key(self):
+        yaml_stat = os.stat(self._yaml_path)
+        return (CACHE_FORMAT_VERSION, _get_animalai_version(),
+                os.path.realpath(self._yaml_path), yaml_stat.st_mtime, yaml_stat.st_size)
+
+def get_cache_dir(default_dir):
+    """ Returns the directory given by the environment variable CACHE_DIR_ENV_VAR or default_dir """
+    return os.getenv(CACHE_DIR_ENV_VAR) or default_dir
+
+def _arena_to_dict(arena):
+    """ Returns the arena as a dict of builtin types that can be written to json """
+    items = [dict(
+        name=item.name,
+        positions=[[position.x, position.y, position.z] for position in getattr(item, 'positions', None) or []],
+        rotations=list(getattr(item, 'rotations', None) or []),
+        sizes=[[size.x, size.y, size.z] for size in getattr(item, 'sizes', None) or []],
+        colors=[[color.r, color.g, color.b] for color in getattr(item, 'colors', None) or []],
+    ) for item in arena.items]
+    return dict(t=arena.t, items=items, blackouts=list(getattr(arena, 'blackouts', None) or []))
+
+def _arena_from_dict(arena_dict):
+    """ Inverse of _arena_to_dict """
+    items = [Item(name=item['name'],
+                  positions=[Vector3(*position) for position in item['positions']],
+                  rotations=item['rotations'],
+                  sizes=[Vector3(*size) for size in item['sizes']],
+                  colors=[RGB(*color) for color in item['colors']])
+             for item in arena_dict['items']]
+    return Arena(t=arena_dict['t'], items=items, blackouts=arena_dict['blackouts'])
+
+def _get_animalai_version():
+    """
+    Returns the version of animalai and the path and modification time of the module
+    that defines the arena classes, since not every release defines __version__
+    """
+    import animalai
+    import animalai.envs.arena_config
+    module_path = animalai.envs.arena_config.__file__
+    return (getattr(animalai, '__version__', None), module_path, os.path.getmtime(module_path))
+
 def _str_Vector3(vector3):
     return '(%.1f, %1.f, %.1f)' % (vector3.x, vector3.y, vector3.z)
 
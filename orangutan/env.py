@@ -1,20 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from animalai.envs.environment import UnityEnvironment
+from animalai.envs.arena_config import ArenaConfig
 
-from orangutan.map import ArenaMap
+from orangutan.map import ArenaMapBatch
 
 class EnvWrapper(object):
     '''
     Wrapper around UnityEnvironment that resets each arena if the episode is done
 
-    It will only work correctly if using a single arena on each environment
+    When using a single arena the environment is reset with the next arena of a pre-sampled
+    order each time the episode is done, only that arena is sent to Unity. When using
+    multiple arenas Unity already resets each arena independently with the same arena, so
+    the environment is reset with new arenas for all of them each time reset_every_n_episodes
+    episodes have finished among all the arenas. If it is None it is only reset when asked to,
+    so the same arenas are used for the whole run. When the environment is reset during a
+    step all the arenas are returned as done because their episodes were interrupted.
+
+    Instead of an ArenaConfig reset also accepts an arena source, an object with a
+    sample(n_arenas) method that returns an ArenaConfig such as arenas.pool.ArenaPool.
+
+    reset_stats counts the resets and the time spent resetting. If measure_reset_bytes is
+    True it also counts the bytes sent to Unity and the bytes saved by not sending the
+    whole configuration, measuring them needs to build the protobuf message of the
+    configuration again on each reset.
+
+    Steps can also be pipelined with step_async and step_wait: the step, and the reset
+    if the episode is done, run on a background thread so the caller can prepare the
+    next actions meanwhile.
     '''
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, n_arenas=1, measure_reset_bytes=False, reset_every_n_episodes=None,
+                 **kwargs):
         '''
-        Check UnityEnvironment parameters
+        Check UnityEnvironment parameters, n_arenas must be given as a keyword argument
         '''
-        self._env = UnityEnvironment(*args, **kwargs)
-        self._arenas_configurations = None
+        self._env = UnityEnvironment(*args, n_arenas=n_arenas, **kwargs)
+        self._arena_source = None
+        self._n_arenas = n_arenas
+        self._reset_every_n_episodes = reset_every_n_episodes
+        self._n_episodes = 0
+        self._measure_reset_bytes = measure_reset_bytes
+        self.reset_stats = dict(n_resets=0, bytes_sent=0, bytes_saved=0, reset_time=0.)
+        self._executor = None
+        self._pending_step = None
 
     def __getattr__(self, attr):
         if attr in self.__dict__:
@@ -22,33 +52,126 @@ class EnvWrapper(object):
         return getattr(self._env, attr)
 
     def reset(self, arenas_configurations=None, train_mode=True):
-        """ Shuffle arenas and reset configuration """
+        """ Reset with the next arenas of the configuration """
+        self._check_no_pending_step()
+        return self._reset(arenas_configurations, train_mode)
+
+    def _reset(self, arenas_configurations=None, train_mode=True):
         if arenas_configurations is not None:
-            self._arenas_configurations = arenas_configurations
-        self._arenas_configurations.shuffle_arenas()
-        return self._env.reset(self._arenas_configurations, train_mode)
+            if hasattr(arenas_configurations, 'sample'):
+                self._arena_source = arenas_configurations
+            else:
+                self._arena_source = ArenaRotation(arenas_configurations)
+        arena_config = self._arena_source.sample(self._n_arenas)
+        t0 = time.time()
+        ret = self._env.reset(arena_config, train_mode)
+        self._n_episodes = 0
+        self.reset_stats['reset_time'] += time.time() - t0
+        self.reset_stats['n_resets'] += 1
+        if self._measure_reset_bytes:
+            bytes_sent = arena_config.dict_to_arena_config().ByteSize()
+            self.reset_stats['bytes_sent'] += bytes_sent
+            full_config_size = getattr(self._arena_source, 'full_config_size', bytes_sent)
+            self.reset_stats['bytes_saved'] += full_config_size - bytes_sent
+        return ret
 
     def step(self, *args, **kwargs):
+        self._check_no_pending_step()
+        return self._step(*args, **kwargs)
+
+    def step_async(self, *args, **kwargs):
+        """ Submits a step to the background thread, collect the result with step_wait """
+        self._check_no_pending_step()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_step = self._executor.submit(self._step, *args, **kwargs)
+
+    def step_wait(self):
+        """ Waits for the step submitted with step_async and returns its result """
+        if self._pending_step is None:
+            raise RuntimeError('step_async must be called before step_wait')
+        pending_step, self._pending_step = self._pending_step, None
+        return pending_step.result()
+
+    def close(self):
+        if self._pending_step is not None:
+            self.step_wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._env.close()
+
+    def _step(self, *args, **kwargs):
         ret = self._env.step(*args, **kwargs)
-        if ret['Learner'].local_done[0]:
-            new_ret = self.reset()
+        if self._is_reset_needed(ret['Learner'].local_done):
+            new_ret = self._reset()
             ret['Learner'].visual_observations = new_ret['Learner'].visual_observations
+            ret['Learner'].local_done = [True]*self._n_arenas
         return ret
 
+    def _is_reset_needed(self, local_done):
+        if self._n_arenas == 1:
+            return local_done[0]
+        if self._reset_every_n_episodes is None:
+            return False
+        self._n_episodes += sum(local_done)
+        return self._n_episodes >= self._reset_every_n_episodes
+
+    def _check_no_pending_step(self):
+        if self._pending_step is not None:
+            raise RuntimeError('step_wait must be called before sending a new step or reset')
+
+class ArenaRotation(object):
+    '''
+    Cycles over a random order of the arenas of a configuration
+
+    When all the arenas have been used a new order is sampled.
+    '''
+    def __init__(self, arenas_configurations):
+        self._arenas_configurations = arenas_configurations
+        self._arenas = list(arenas_configurations.arenas.values())
+        self._order = np.random.permutation(len(self._arenas))
+        self._position = 0
+        self._full_config_size = None
+
+    @property
+    def full_config_size(self):
+        """ Size in bytes of the protobuf message of the whole configuration """
+        if self._full_config_size is None:
+            self._full_config_size = self._arenas_configurations.dict_to_arena_config().ByteSize()
+        return self._full_config_size
+
+    def sample(self, n_arenas=1):
+        """ Returns an ArenaConfig with the next n_arenas arenas """
+        arena_config = ArenaConfig()
+        for idx in range(n_arenas):
+            if self._position == len(self._order):
+                self._order = np.random.permutation(len(self._arenas))
+                self._position = 0
+            arena_config.arenas[idx] = self._arenas[self._order[self._position]]
+            self._position += 1
+        return arena_config
+
 class MapEnv(object):
     '''
     Wrapper around UnityEnvironment that resets each arena if the episode is done
     and creates a map with the trajectory of the agent.
 
-    It will only work correctly if using a single arena on each environment
+    When using multiple arenas the maps of all the arenas are updated at once, and only
+    the maps of the arenas whose episode is done are reset. Check EnvWrapper for
+    reset_every_n_episodes, the maps of all the arenas are reset when it is applied.
     '''
-    def __init__(self, *args, map_side=60, **kwargs):
+    def __init__(self, *args, n_arenas=1, map_side=60, map_channels=('occupancy',), **kwargs):
         '''
-        Check UnityEnvironment parameters
+        Check UnityEnvironment parameters, n_arenas must be given as a keyword argument
+
+        map_channels allows to add more information to the map, check ArenaMap.get_heatmap_channels
         '''
-        self._env = EnvWrapper(*args, **kwargs)
-        self._arena_map = None
+        self._env = EnvWrapper(*args, n_arenas=n_arenas, **kwargs)
+        self._n_arenas = n_arenas
+        self._arena_maps = None
         self._map_side = map_side
+        self._map_channels = map_channels
 
     def __getattr__(self, attr):
         if attr in self.__dict__:
@@ -57,29 +180,39 @@ class MapEnv(object):
 
     def reset(self, arenas_configurations=None, train_mode=True):
         ret = self._env.reset(arenas_configurations, train_mode)
-        self._reset_map()
+        self._reset_maps()
         ret = self._add_map_to_brain_info(ret)
         return ret
 
     def step(self, *args, **kwargs):
         ret = self._env.step(*args, **kwargs)
-        if ret['Learner'].local_done[0]:
-            self._reset_map()
-        else:
-            self._update_map(ret)
+        return self._process_step(ret)
+
+    def step_async(self, *args, **kwargs):
+        """ Submits a step to the background thread, collect the result with step_wait """
+        self._env.step_async(*args, **kwargs)
+
+    def step_wait(self):
+        """ Waits for the step submitted with step_async and returns it with the maps updated """
+        ret = self._env.step_wait()
+        return self._process_step(ret)
+
+    def _process_step(self, ret):
+        self._update_maps(ret)
         ret = self._add_map_to_brain_info(ret)
         return ret
 
     def _add_map_to_brain_info(self, ret):
-        heatmap = self._arena_map.get_heatmap(self._map_side)
-        heatmap = np.expand_dims(np.expand_dims(heatmap, axis=2), axis=0)
-        ret['Learner'].trajectory_map = heatmap
+        ret['Learner'].trajectory_map = self._arena_maps.get_heatmaps_channels(
+            self._map_side, self._map_channels)
         return ret
 
-    def _update_map(self, ret):
-        speed = ret['Learner'].vector_observations[0][[0, 2]]
-        previous_action = ret['Learner'].previous_vector_actions
-        self._arena_map.add_point(speed, previous_action)
+    def _update_maps(self, ret):
+        brain_info = ret['Learner']
+        speeds = np.asarray(brain_info.vector_observations)[:, [0, 2]]
+        previous_actions = np.asarray(brain_info.previous_vector_actions)
+        self._arena_maps.add_points(speeds, previous_actions)
+        self._arena_maps.reset(np.asarray(brain_info.local_done))
 
-    def _reset_map(self):
-        self._arena_map = ArenaMap()
+    def _reset_maps(self):
+        self._arena_maps = ArenaMapBatch(self._n_arenas, self._map_side)
@@ -2,55 +2,396 @@
 Map for the position of the agent in the arena
 """
 import numpy as np
-import matplotlib.pyplot as plt
+
+DEFAULT_CAPACITY = 256
+DEFAULT_MAP_SIDE = 60
+# Distance from the center to the border of the heatmap, enough to contain the diagonal of the arena
+MAP_RADIUS = 40*2**0.5*1.05
+# Distance from the start position to the border of the world raster, the agent can cross
+# the whole arena in any direction and the rest is margin for the drift of dead reckoning
+WORLD_RADIUS = 40*1.25
+# Channels that can be computed by get_heatmap_channels, orientation uses two channels
+MAP_CHANNELS = ['occupancy', 'visits', 'recency', 'orientation']
+# The agent always rotates 6 degrees, so there are only 60 possible headings
+ROTATION_STEP = 6
+N_HEADINGS = 360//ROTATION_STEP
+HEADING_SIN = np.sin(np.arange(N_HEADINGS)*ROTATION_STEP*np.pi/180)
+HEADING_COS = np.cos(np.arange(N_HEADINGS)*ROTATION_STEP*np.pi/180)
+SPEED_FACTOR = 1./10/1.625
 
 class ArenaMap():
     """
     Creates a map of the previous positions of the agent in the arena
+
+    The trajectory is stored on preallocated arrays that double their size when
+    they are full, so adding a point has constant cost no matter how long the
+    episode is.
+
+    The visits are also accumulated on a raster on the world frame with the resolution
+    of the pixels of the heatmap, centered on the start position and big enough to
+    contain the arena from any start position. The raster has a fixed size, so both
+    adding a point and creating the heatmap have a constant cost.
+
+    Parameters
+    ----------
+    t : int
+        Time limit of the arena. If given the arrays are allocated with enough
+        capacity for the whole episode and never need to grow.
+    side : int
+        Side in pixels of the heatmaps, it sets the size of the cells of the raster.
+        Heatmaps of other sides can be created but the cells are not resized.
     """
-    def __init__(self):
+    __slots__ = ['_orientation', '_heading', '_orientations', '_position', '_positions', '_n_points',
+                 '_side', '_cell_size', '_world_side', '_current_cell',
+                 '_cell_visits', '_cell_last_step', '_cell_headings']
+
+    def __init__(self, t=None, side=DEFAULT_MAP_SIDE):
+        capacity = t + 1 if t else DEFAULT_CAPACITY
         self._orientation = 0
-        self._orientations = [self._orientation]
+        self._heading = 0
+        self._orientations = np.zeros(capacity, dtype=np.int32)
         self._position = np.zeros(2)
-        self._positions = [self._position.copy()]
+        self._positions = np.zeros((capacity, 2), dtype=np.float32)
+        self._n_points = 1
+        self._side = side
+        self._cell_size, self._world_side = _get_world_raster_shape(side)
+        n_cells = self._world_side**2
+        self._cell_visits = np.zeros(n_cells, dtype=np.int32)
+        self._cell_last_step = np.zeros(n_cells, dtype=np.int32)
+        self._cell_headings = np.zeros((n_cells, 2), dtype=np.float32)
+        self._add_cell()
 
     def add_point(self, speed, previous_action):
         # print(speed.shape, previous_action.shape)
         rotation = previous_action[0, 1]
         if rotation == 1:
-            self._orientation += 6
+            self._orientation += ROTATION_STEP
+            self._heading = (self._heading + 1) % N_HEADINGS
         elif rotation == 2:
-            self._orientation -= 6
+            self._orientation -= ROTATION_STEP
+            self._heading = (self._heading - 1) % N_HEADINGS
+        self._move(speed)
+        self._store_position()
+
+    def _move(self, speed):
+        """ Dead reckoning of the position using the heading table instead of computing sin and cos """
         alpha = -1
-        speed_factor = 1./10/1.625
-        self._position[1] += speed_factor*np.sum(speed*np.array([
-            alpha*np.sin(self._orientation*np.pi/180), np.cos(self._orientation*np.pi/180)]))
-        self._position[0] -= speed_factor*np.sum(speed*np.array([
-            alpha*np.cos(self._orientation*np.pi/180), -np.sin(self._orientation*np.pi/180)]))
-        self._positions.append(self._position.copy())
-        self._orientations.append(self._orientation)
+        sin, cos = HEADING_SIN[self._heading], HEADING_COS[self._heading]
+        speed_x, speed_z = float(speed[0]), float(speed[1])
+        self._position[1] += SPEED_FACTOR*(speed_x*(alpha*sin) + speed_z*cos)
+        self._position[0] -= SPEED_FACTOR*(speed_x*(alpha*cos) + speed_z*(-sin))
+
+    def _store_position(self):
+        if self._n_points == len(self._positions):
+            self._positions = _grow_array(self._positions, self._n_points)
+            self._orientations = _grow_array(self._orientations, self._n_points)
+        self._positions[self._n_points] = self._position
+        self._orientations[self._n_points] = self._orientation
+        self._n_points += 1
+        self._add_cell()
+
+    def _add_cell(self):
+        """ Updates the statistics of the cell of the current position on the world raster """
+        cell = _get_cells(self._position[np.newaxis], self._cell_size, self._world_side)[0]
+        self._current_cell = cell
+        self._cell_visits[cell] += 1
+        self._cell_last_step[cell] = self._n_points - 1
+        self._cell_headings[cell] += HEADING_COS[self._heading], HEADING_SIN[self._heading]
+
+    @property
+    def positions(self):
+        return self._positions[:self._n_points]
+
+    @property
+    def orientations(self):
+        return self._orientations[:self._n_points]
 
     def visualize_trajectory(self):
-        positions = self._get_normalized_positions_to_last_state()
-        plt.scatter(positions[:, 0], positions[:, 1], c=np.linspace(0, 1, len(positions)))
-        plt.xlim(-60, 60)
-        plt.ylim(-60, 60)
+        # Imported here to avoid loading matplotlib when the map is only used for training
+        from orangutan.visualization import visualize_trajectory
+        visualize_trajectory(self)
 
     def _get_normalized_positions_to_last_state(self):
-        positions = np.array(self._positions)
+        positions = self.positions.astype(np.float64)
         positions -= positions[-1:]
-        angles = np.arctan2(positions[:, 0], positions[:, 1]) -self._orientation*np.pi/180
-        radius = np.sqrt(np.sum(positions**2, axis=1))
-        positions[:, 0] = radius*np.sin(angles)
-        positions[:, 1] = radius*np.cos(angles)
-        return positions
+        return _rotate(positions, self._orientation)
+
+    def _get_normalized_cells_to_last_state(self, cells):
+        """
+        Returns the centers of the given cells relative to the current position and
+        orientation of the agent
+
+        The center of the cell of the current position is replaced by the exact position
+        so the agent is always at the center of the map
+        """
+        positions = _get_cell_centers(cells, self._cell_size, self._world_side)
+        positions[cells == self._current_cell] = self._position
+        positions -= self._position
+        return _rotate(positions, self._orientation)
+
+    def get_heatmap(self, side=None):
+        """ Returns the occupancy heatmap, side is the one given on creation if None """
+        side = side or self._side
+        pixels, _ = self._get_cells_pixels(side)
+        return _rasterize(pixels, side)[0]
 
-    def get_heatmap(self, side=60):
+    def get_heatmap_channels(self, side=None, channels=('occupancy',)):
+        """
+        Returns a heatmap with the requested channels stacked on the last axis
+
+        Parameters
+        ----------
+        side : int
+            Side of the heatmap in pixels, if None the side given on creation
+        channels : list of str
+            Any of MAP_CHANNELS
+
+            - occupancy: 1 if the agent has been on the pixel, the same as get_heatmap
+            - visits: number of steps the agent has been on the pixel
+            - recency: (step of last visit + 1)/(current step + 1), so the current position is 1
+            - orientation: mean cosine and sine of the orientation of the agent on the
+              pixel relative to the current orientation, uses two channels
+        """
+        side = side or self._side
+        pixels, cells = self._get_cells_pixels(side)
+        recency = (self._cell_last_step[cells] + 1.)/self._n_points
+        headings = _rotate(self._cell_headings[cells], -self._orientation)
+        return _get_heatmap_channels(
+            pixels, side, channels, self._cell_visits[cells], recency, headings)[0]
+
+    def _get_cells_pixels(self, side):
+        """
+        Returns the pixels of the visited cells that fall inside the heatmap and the
+        indices of those cells
+        """
         assert side % 2 == 0
-        scale = side/2/(40*2**0.5*1.05)
-        positions = (self._get_normalized_positions_to_last_state()*scale + side//2).astype(np.int)
-        heatmap = np.zeros((side, side))
-        for position in positions:
-            heatmap[position[1], position[0]] = 1
-        heatmap = heatmap[::-1]
-        return heatmap
+        cells = np.flatnonzero(self._cell_visits)
+        scale = side/2/MAP_RADIUS
+        pixels = (self._get_normalized_cells_to_last_state(cells)*scale + side//2).astype(int)
+        inside = np.all((pixels >= 0) & (pixels < side), axis=1)
+        return pixels[inside], cells[inside]
+
+class ArenaMapBatch():
+    """
+    Creates the maps of the previous positions of the agents of many arenas at the same time
+
+    It uses the same dead reckoning and world raster as ArenaMap, but the orientations
+    and positions of all the agents are updated with a single vectorized operation and
+    all the heatmaps are created at once. The trajectories are not stored, only the
+    rasters of each arena.
+
+    Parameters
+    ----------
+    n : int
+        Number of arenas
+    side : int
+        Side in pixels of the heatmaps, it sets the size of the cells of the rasters
+    """
+    __slots__ = ['_n', '_orientation', '_heading', '_position', '_n_points',
+                 '_side', '_cell_size', '_world_side', '_current_cell',
+                 '_cell_visits', '_cell_last_step', '_cell_headings']
+
+    def __init__(self, n, side=DEFAULT_MAP_SIDE):
+        self._n = n
+        self._orientation = np.zeros(n, dtype=np.int32)
+        self._heading = np.zeros(n, dtype=np.int64)
+        self._position = np.zeros((n, 2))
+        self._n_points = np.zeros(n, dtype=np.int32)
+        self._side = side
+        self._cell_size, self._world_side = _get_world_raster_shape(side)
+        n_cells = self._world_side**2
+        self._cell_visits = np.zeros((n, n_cells), dtype=np.int32)
+        self._cell_last_step = np.zeros((n, n_cells), dtype=np.int32)
+        self._cell_headings = np.zeros((n, n_cells, 2), dtype=np.float32)
+        self._current_cell = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def position(self):
+        """ Current position of the agent on each arena """
+        return self._position
+
+    @property
+    def orientation(self):
+        """ Current orientation of the agent on each arena in degrees """
+        return self._orientation
+
+    def reset(self, mask=None):
+        """
+        Resets the maps of the arenas selected by the boolean mask, if mask is not
+        given all the maps are reset
+        """
+        rows = np.arange(self._n) if mask is None else np.flatnonzero(mask)
+        if not len(rows):
+            return
+        self._orientation[rows] = 0
+        self._heading[rows] = 0
+        self._position[rows] = 0
+        self._n_points[rows] = 1
+        self._cell_visits[rows] = 0
+        self._cell_last_step[rows] = 0
+        self._cell_headings[rows] = 0
+        self._add_cells(rows)
+
+    def add_points(self, speeds, previous_actions):
+        """
+        Parameters
+        ----------
+        speeds : array
+            Array with shape (n, 2) with the speed of the agent on each arena
+        previous_actions : array
+            Array with shape (n, 2) with the previous action of the agent on each arena
+        """
+        rotation = previous_actions[:, 1]
+        heading_change = (rotation == 1).astype(np.int64) - (rotation == 2)
+        self._orientation += ROTATION_STEP*heading_change
+        self._heading = (self._heading + heading_change) % N_HEADINGS
+        alpha = -1
+        sin, cos = HEADING_SIN[self._heading], HEADING_COS[self._heading]
+        self._position[:, 1] += SPEED_FACTOR*(speeds[:, 0]*(alpha*sin) + speeds[:, 1]*cos)
+        self._position[:, 0] -= SPEED_FACTOR*(speeds[:, 0]*(alpha*cos) + speeds[:, 1]*(-sin))
+        self._n_points += 1
+        self._add_cells(np.arange(self._n))
+
+    def _add_cells(self, rows):
+        """ Updates the statistics of the cells of the current positions of the given arenas """
+        cells = _get_cells(self._position[rows], self._cell_size, self._world_side)
+        self._current_cell[rows] = cells
+        self._cell_visits[rows, cells] += 1
+        self._cell_last_step[rows, cells] = self._n_points[rows] - 1
+        self._cell_headings[rows, cells, 0] += HEADING_COS[self._heading[rows]]
+        self._cell_headings[rows, cells, 1] += HEADING_SIN[self._heading[rows]]
+
+    def get_heatmaps(self, side=None):
+        """
+        Returns an array with shape (n, side, side) with the heatmaps of all the arenas,
+        side is the one given on creation if None
+        """
+        side = side or self._side
+        pixels, maps, _ = self._get_cells_pixels(side)
+        return _rasterize(pixels, side, maps=maps, n_maps=self._n)
+
+    def get_heatmaps_channels(self, side=None, channels=('occupancy',)):
+        """
+        Returns an array with shape (n, side, side, n_channels) with the heatmaps of all
+        the arenas, check ArenaMap.get_heatmap_channels for the description of the channels
+        """
+        side = side or self._side
+        pixels, maps, cells = self._get_cells_pixels(side)
+        recency = (self._cell_last_step[maps, cells] + 1.)/self._n_points[maps]
+        headings = _rotate(self._cell_headings[maps, cells], -self._orientation[maps])
+        return _get_heatmap_channels(
+            pixels, side, channels, self._cell_visits[maps, cells], recency, headings,
+            maps=maps, n_maps=self._n)
+
+    def _get_cells_pixels(self, side):
+        """
+        Returns the pixels of the visited cells that fall inside the heatmaps, the
+        arena of each cell and the indices of the cells
+        """
+        assert side % 2 == 0
+        maps, cells = np.nonzero(self._cell_visits)
+        positions = _get_cell_centers(cells, self._cell_size, self._world_side)
+        # The center of the cell of the current position is replaced by the exact position
+        is_current = cells == self._current_cell[maps]
+        positions[is_current] = self._position[maps[is_current]]
+        positions -= self._position[maps]
+        positions = _rotate(positions, self._orientation[maps])
+        scale = side/2/MAP_RADIUS
+        pixels = (positions*scale + side//2).astype(int)
+        inside = np.all((pixels >= 0) & (pixels < side), axis=1)
+        return pixels[inside], maps[inside], cells[inside]
+
+def _get_world_raster_shape(side):
+    """ Returns the size of the cells of the world raster and the number of cells on each side """
+    cell_size = 2*MAP_RADIUS/side
+    return cell_size, int(np.ceil(2*WORLD_RADIUS/cell_size))
+
+def _get_cells(positions, cell_size, world_side):
+    """
+    Returns the flat index on the world raster of the cell of each position, the start
+    position is at the center of the raster. Positions out of the raster, that can only
+    be reached by the drift of dead reckoning, are stored on the border cells.
+    """
+    indices = np.floor(positions/cell_size + world_side/2).astype(np.int64)
+    indices = np.clip(indices, 0, world_side - 1)
+    return indices[:, 0]*world_side + indices[:, 1]
+
+def _get_cell_centers(cells, cell_size, world_side):
+    """ Returns an array with shape (k, 2) with the positions of the centers of the cells """
+    indices = np.stack([cells//world_side, cells % world_side], axis=1)
+    return (indices + 0.5 - world_side/2)*cell_size
+
+def _get_heatmap_channels(pixels, side, channels, visits, recency, headings, maps=None, n_maps=1):
+    """
+    Creates n_maps heatmaps with the requested channels stacked on the last axis
+
+    Parameters
+    ----------
+    pixels : array
+        Array with shape (k, 2) with the pixels of the visited cells
+    visits, recency : array
+        Arrays with shape (k,) with the number of visits and the recency of each cell
+    headings : array
+        Array with shape (k, 2) with the sum of the cosine and sine of the orientation
+        of the visits relative to the current orientation
+    maps : array
+        Array with shape (k,) with the index of the heatmap of each cell
+    """
+    heatmaps = []
+    for channel in channels:
+        if channel == 'occupancy':
+            heatmaps.append(_rasterize(pixels, side, maps=maps, n_maps=n_maps))
+        elif channel == 'visits':
+            heatmaps.append(_rasterize(pixels, side, visits, maps=maps, n_maps=n_maps))
+        elif channel == 'recency':
+            heatmaps.append(_rasterize(pixels, side, recency, np.maximum, maps, n_maps))
+        elif channel == 'orientation':
+            pixel_visits = np.maximum(_rasterize(pixels, side, visits, maps=maps, n_maps=n_maps), 1)
+            for axis in range(2):
+                heatmaps.append(_rasterize(
+                    pixels, side, headings[:, axis], maps=maps, n_maps=n_maps)/pixel_visits)
+        else:
+            raise KeyError('Unknown channel: %s' % channel)
+    return np.stack(heatmaps, axis=3)
+
+def _rasterize(pixels, side, values=None, ufunc=np.add, maps=None, n_maps=1):
+    """
+    Creates n_maps heatmaps from the given pixels using flat indexing. If values are
+    not given the heatmaps are binary, otherwise the values falling on the same pixel
+    are combined with ufunc. The rows are flipped so the front of the agent is on the
+    top of the heatmap.
+    """
+    heatmap = np.zeros(n_maps*side*side)
+    flat_indices = pixels[:, 1]*side + pixels[:, 0]
+    if maps is not None:
+        flat_indices += maps*side*side
+    if values is None:
+        heatmap[flat_indices] = 1
+    else:
+        ufunc.at(heatmap, flat_indices, values)
+    return heatmap.reshape(n_maps, side, side)[:, ::-1]
+
+def _rotate(positions, orientation):
+    """
+    Rotates the positions the given orientation in degrees, equivalent to the polar
+    transformation. orientation can be a scalar or an array with one value per position.
+    """
+    angle = orientation*np.pi/180
+    cos, sin = np.cos(angle), np.sin(angle)
+    rotated_positions = np.empty_like(positions)
+    rotated_positions[:, 0] = positions[:, 0]*cos - positions[:, 1]*sin
+    rotated_positions[:, 1] = positions[:, 0]*sin + positions[:, 1]*cos
+    return rotated_positions
+
+def _grow_array(array, n_used, axis=0):
+    """ Returns a copy of the array with double capacity on the given axis """
+    shape = list(array.shape)
+    shape[axis] *= 2
+    new_array = np.zeros(shape, dtype=array.dtype)
+    used = (slice(None),)*axis + (slice(0, n_used),)
+    new_array[used] = array[used]
+    return new_array
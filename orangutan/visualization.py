@@ -0,0 +1,22 @@
+"""
+Visualization of the agent trajectory
+
+This is the only module that imports matplotlib, so it is only loaded when
+something is going to be plotted.
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+
+def visualize_trajectory(arena_map):
+    """
+    Scatter plot of the trajectory of the agent relative to its current position
+    and orientation, the color shows the time of each point.
+
+    Parameters
+    ----------
+    arena_map : ArenaMap
+    """
+    positions = arena_map._get_normalized_positions_to_last_state()
+    plt.scatter(positions[:, 0], positions[:, 1], c=np.linspace(0, 1, len(positions)))
+    plt.xlim(-60, 60)
+    plt.ylim(-60, 60)
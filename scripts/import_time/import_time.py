@@ -0,0 +1,67 @@
+"""
+Startup benchmark of the arenas package
+
+It measures the time needed to import orangutan.arenas.generation on a new process, and
+the time needed to access the handwritten arenas for the first time with and without
+the json cache of the yaml file.
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+IMPORT_CODE = """
+import time
+t0 = time.time()
+import orangutan.arenas.generation
+print(time.time() - t0)
+"""
+
+FIRST_ACCESS_CODE = """
+import time
+from orangutan.arenas.food import FOOD_HANDWRITTEN_ARENAS
+t0 = time.time()
+FOOD_HANDWRITTEN_ARENAS[0]
+print(time.time() - t0)
+"""
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    args = parse_args(args)
+    from orangutan.arenas.food import FOOD_HANDWRITTEN_ARENAS
+    cache_path = FOOD_HANDWRITTEN_ARENAS.get_cache_path()
+
+    import_time = min(_measure(IMPORT_CODE) for _ in range(args.n_repetitions))
+    print('Import of orangutan.arenas.generation: %.1f ms' % (import_time*1e3))
+    cold_times, warm_times = [], []
+    for _ in range(args.n_repetitions):
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        cold_times.append(_measure(FIRST_ACCESS_CODE))
+        warm_times.append(_measure(FIRST_ACCESS_CODE))
+    print('First access to handwritten arenas without cache: %.1f ms' % (min(cold_times)*1e3))
+    print('First access to handwritten arenas with cache: %.1f ms' % (min(warm_times)*1e3))
+
+def _measure(code):
+    """ Runs the code on a new process and returns the time it prints """
+    return float(subprocess.check_output([sys.executable, '-c', code]))
+
+def parse_args(args):
+    epilog = """
+    python import_time.py --n_repetitions 5
+    """
+    description = """
+    Measure the startup time of the arenas package
+    """
+    parser = argparse.ArgumentParser(
+        description=description,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog=epilog)
+    parser.add_argument('--n_repetitions', type=int, default=5, help='Number of times each measure is repeated')
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    main()
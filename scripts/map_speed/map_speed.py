@@ -0,0 +1,67 @@
+"""
+Micro-benchmark of the per step cost of ArenaMap
+
+It compares the dead reckoning using the precomputed heading table against computing
+sin and cos of the orientation on each step, as it was done before.
+"""
+import sys
+import argparse
+import time
+import numpy as np
+
+from orangutan.map import ArenaMap, SPEED_FACTOR
+
+
+class TrigonometricArenaMap(ArenaMap):
+    """ ArenaMap that computes sin and cos of the orientation on each step """
+    def _move(self, speed):
+        alpha = -1
+        speed_factor = SPEED_FACTOR
+        self._position[1] += speed_factor*np.sum(speed*np.array([
+            alpha*np.sin(self._orientation*np.pi/180), np.cos(self._orientation*np.pi/180)]))
+        self._position[0] -= speed_factor*np.sum(speed*np.array([
+            alpha*np.cos(self._orientation*np.pi/180), -np.sin(self._orientation*np.pi/180)]))
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    args = parse_args(args)
+    speeds = np.random.uniform(-10, 10, (args.n_steps, 2))
+    previous_actions = np.random.randint(0, 3, (args.n_steps, 1, 2))
+    results = {}
+    for arena_map_class in [TrigonometricArenaMap, ArenaMap]:
+        results[arena_map_class.__name__] = _measure_step_time(
+            arena_map_class, speeds, previous_actions, args.n_repetitions)
+        print('%s: %.2f us per step' % (arena_map_class.__name__, results[arena_map_class.__name__]*1e6))
+    print('Speedup: %.2f' % (results['TrigonometricArenaMap']/results['ArenaMap']))
+
+def _measure_step_time(arena_map_class, speeds, previous_actions, n_repetitions):
+    """ Returns the minimum time per step of add_point over the repetitions """
+    step_times = []
+    for _ in range(n_repetitions):
+        arena_map = arena_map_class(t=len(speeds))
+        t0 = time.time()
+        for speed, previous_action in zip(speeds, previous_actions):
+            arena_map.add_point(speed, previous_action)
+        step_times.append((time.time() - t0)/len(speeds))
+    return min(step_times)
+
+def parse_args(args):
+    epilog = """
+    python map_speed.py --n_steps 1000
+    """
+    description = """
+    Measure the time needed to add a point to ArenaMap
+    """
+    parser = argparse.ArgumentParser(
+        description=description,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog=epilog)
+    parser.add_argument('--n_steps', type=int, default=1000, help='Number of steps of each episode')
+    parser.add_argument('--n_repetitions', type=int, default=10, help='Number of times the episode is repeated')
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    main()
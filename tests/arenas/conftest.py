@@ -0,0 +1,17 @@
+import pytest
+import numpy as np
+from animalai.envs.arena_config import Vector3, Item
+
+
+def _create_random_item():
+    positions = [Vector3(*np.random.uniform(0, 40, 3).tolist())]
+    sizes = [Vector3(*np.random.uniform(0.5, 8, 3).tolist())]
+    rotations = np.random.choice([0, 45, 90, 30], 1).tolist()
+    if np.random.randint(2):
+        rotations = []
+    return Item(positions=positions, rotations=rotations, sizes=sizes)
+
+@pytest.fixture
+def create_random_item():
+    """ Function that returns an item with random position, size and rotation using the global random state """
+    return _create_random_item
@@ -0,0 +1,107 @@
+import os
+import json
+import sys
+import shutil
+import subprocess
+import pytest
+import yaml
+from animalai.envs.arena_config import ArenaConfig, RGB
+
+from orangutan.arenas.food import (
+    FOOD_HANDWRITTEN_ARENAS, create_arena_with_15_badgoal_labyrinth)
+from orangutan.arenas.generation import create_arena
+from orangutan.arenas import utils
+from orangutan.arenas.utils import LazyArenaTemplates
+
+FOOD_YAML_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..',
+                              'orangutan', 'arenas', 'food.yaml')
+
+
+def test_handwritten_arena_does_not_share_items_with_template():
+    arena = create_arena_with_15_badgoal_labyrinth(t=250)
+    template = FOOD_HANDWRITTEN_ARENAS[2]
+    assert arena.t == 250
+    assert utils._arena_to_dict(arena)['items'] == utils._arena_to_dict(template.create())['items']
+    arena.items[0].name = 'Modified'
+    arena.items[0].positions[0].x = -1
+    arena.items.pop()
+    other_arena = create_arena_with_15_badgoal_labyrinth(t=250)
+    assert len(other_arena.items) == len(template.items)
+    assert other_arena.items[0].name != 'Modified'
+    assert other_arena.items[0].positions[0].x != -1
+
+def test_template_colors_override():
+    template = FOOD_HANDWRITTEN_ARENAS[2]
+    arena = template.create(colors={0: [RGB(255, 0, 0)], 1: []})
+    assert arena.items[0].colors[0].r == 255
+    assert not arena.items[1].colors
+    assert not template.create().items[0].colors
+
+def test_remove_color_does_not_modify_template():
+    template = FOOD_HANDWRITTEN_ARENAS[2]
+    colors = [getattr(item, 'colors', None) for item in template.items]
+    arena = create_arena(create_arena_with_15_badgoal_labyrinth, 250, remove_color=True)
+    assert all(not item.colors for item in arena.items)
+    assert [getattr(item, 'colors', None) for item in template.items] == colors
+
+def test_blackouts_do_not_modify_template():
+    arena = create_arena(create_arena_with_15_badgoal_labyrinth, 250, add_blackouts=True)
+    assert arena.blackouts
+    assert not FOOD_HANDWRITTEN_ARENAS[2].create().blackouts
+
+def test_handwritten_arenas_are_not_loaded_on_import():
+    code = 'import orangutan.arenas.generation; from orangutan.arenas.food import FOOD_HANDWRITTEN_ARENAS; ' \
+        'assert not FOOD_HANDWRITTEN_ARENAS.is_loaded'
+    subprocess.check_call([sys.executable, '-c', code])
+
+@pytest.fixture
+def yaml_path(tmpdir, monkeypatch):
+    monkeypatch.setenv(utils.CACHE_DIR_ENV_VAR, str(tmpdir.join('cache')))
+    tmpdir.mkdir('cache')
+    yaml_path = str(tmpdir.join('food.yaml'))
+    shutil.copy(FOOD_YAML_PATH, yaml_path)
+    return yaml_path
+
+def test_lazy_arena_templates_use_cache(yaml_path, tmpdir, monkeypatch):
+    templates = LazyArenaTemplates(yaml_path)
+    assert not templates.is_loaded
+    assert len(templates) == len(FOOD_HANDWRITTEN_ARENAS)
+    assert templates.get_cache_path() == str(tmpdir.join('cache', 'food.json'))
+    assert os.path.exists(templates.get_cache_path())
+    assert not os.path.exists(str(tmpdir.join('food.json')))
+    def fail(*args, **kwargs):
+        raise AssertionError('The yaml should not be parsed')
+    monkeypatch.setattr(utils, 'ArenaConfig', fail)
+    cached_templates = LazyArenaTemplates(yaml_path)
+    assert len(cached_templates[2].items) == len(templates[2].items)
+
+def test_lazy_arena_templates_parse_yaml_if_it_changes(yaml_path):
+    assert len(LazyArenaTemplates(yaml_path)) == len(FOOD_HANDWRITTEN_ARENAS)
+    arena_config = ArenaConfig(yaml_path)
+    arena_config.arenas = {0: arena_config.arenas[0]}
+    with open(yaml_path, 'w') as f:
+        yaml.dump(arena_config, f)
+    assert len(LazyArenaTemplates(yaml_path)) == 1
+
+@pytest.mark.parametrize('cache_content', ['corrupted', json.dumps(dict(key=['other version'], arenas={}))])
+def test_lazy_arena_templates_ignore_invalid_cache(yaml_path, cache_content):
+    templates = LazyArenaTemplates(yaml_path)
+    with open(templates.get_cache_path(), 'w') as f:
+        f.write(cache_content)
+    assert len(templates) == len(FOOD_HANDWRITTEN_ARENAS)
+
+def test_lazy_arena_templates_cache_keeps_the_arenas(yaml_path):
+    arenas = ArenaConfig(yaml_path).arenas
+    LazyArenaTemplates(yaml_path)._load()
+    cached_arenas = LazyArenaTemplates(yaml_path)._load_arenas()
+    assert sorted(cached_arenas.keys()) == sorted(arenas.keys())
+    for key, arena in arenas.items():
+        assert utils._arena_to_dict(cached_arenas[key]) == utils._arena_to_dict(arena)
+
+def test_lazy_arena_templates_remove_temporary_file_if_cache_cannot_be_written(
+        yaml_path, tmpdir, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('Could not replace the cache')
+    monkeypatch.setattr(utils.os, 'replace', fail)
+    assert len(LazyArenaTemplates(yaml_path)) == len(FOOD_HANDWRITTEN_ARENAS)
+    assert not tmpdir.join('cache').listdir()
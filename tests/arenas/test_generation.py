@@ -0,0 +1,127 @@
+import pytest
+import yaml
+import random
+import threading
+import numpy as np
+
+from orangutan.arenas.generation import (
+    generate_arena_config, generate_arenas, ArenaSampler, _build_alias_table)
+
+
+class NoAliasDumper(yaml.Dumper):
+    """ Objects shared between arenas are not shared anymore after pickling """
+    def ignore_aliases(self, data):
+        return True
+
+def _dump_arenas(arena_config):
+    return yaml.dump(arena_config.arenas, Dumper=NoAliasDumper)
+
+def test_generate_arena_config_is_deterministic_with_seed():
+    arena_config_1 = generate_arena_config(t=500, n=1, seed=7)
+    arena_config_2 = generate_arena_config(t=500, n=1, seed=7)
+    assert _dump_arenas(arena_config_1) == _dump_arenas(arena_config_2)
+
+def test_generate_arena_config_depends_on_seed():
+    arena_config_1 = generate_arena_config(t=500, n=1, seed=7)
+    arena_config_2 = generate_arena_config(t=500, n=1, seed=8)
+    assert _dump_arenas(arena_config_1) != _dump_arenas(arena_config_2)
+
+@pytest.mark.parametrize('caller_seed', [0, 1])
+def test_generation_does_not_modify_caller_random_state(caller_seed):
+    np.random.seed(caller_seed)
+    random.seed(caller_seed)
+    expected = np.random.rand(), random.random()
+    np.random.seed(caller_seed)
+    random.seed(caller_seed)
+    generate_arena_config(500, 1, seed=7)
+    list(generate_arenas(500, n_arenas=3, seed=7))
+    assert (np.random.rand(), random.random()) == expected
+
+def test_generation_on_other_thread_does_not_use_global_random_state():
+    np.random.seed(0)
+    expected = np.random.rand(2000).tolist()
+    np.random.seed(0)
+    arenas = []
+    thread = threading.Thread(target=lambda: arenas.extend(generate_arenas(500, n_arenas=30, seed=7)))
+    thread.start()
+    values = [np.random.rand() for _ in range(2000)]
+    thread.join()
+    assert values == expected
+    assert _dump_arenas_list(arenas) == _dump_arenas_list(generate_arenas(500, n_arenas=30, seed=7))
+
+def _dump_arenas_list(arenas):
+    return yaml.dump(list(arenas), Dumper=NoAliasDumper)
+
+def test_parallel_generation_is_identical_to_serial():
+    arena_config_serial = generate_arena_config(t=500, n=1, seed=7)
+    arena_config_parallel = generate_arena_config(t=500, n=1, seed=7, n_jobs=2)
+    assert _dump_arenas(arena_config_serial) == _dump_arenas(arena_config_parallel)
+
+def _create_arena_a(t, random_state):
+    return 'a'
+
+def _create_arena_b(t, random_state):
+    return 'b'
+
+CATEGORIES_AB = [
+    ('a', [(_create_arena_a, 1)], dict()),
+    ('b', [(_create_arena_b, 3)], dict()),
+]
+
+def test_generate_arenas_yields_n_arenas():
+    arenas = list(generate_arenas(t=500, n_arenas=5, seed=7))
+    assert len(arenas) == 5
+    assert all(arena.t == 500 for arena in arenas)
+
+def test_generate_arenas_is_deterministic_with_seed():
+    arenas_1 = list(generate_arenas(t=500, n_arenas=5, seed=7))
+    arenas_2 = list(generate_arenas(t=500, n_arenas=5, seed=7))
+    assert yaml.dump(arenas_1, Dumper=NoAliasDumper) == yaml.dump(arenas_2, Dumper=NoAliasDumper)
+
+def test_generate_arenas_samples_proportionally_to_weights():
+    arenas = list(generate_arenas(t=500, n_arenas=400, seed=7, categories=CATEGORIES_AB))
+    assert arenas.count('b')/len(arenas) == pytest.approx(0.75, abs=0.1)
+
+def test_generate_arenas_without_limit():
+    arenas = generate_arenas(t=500, seed=7, categories=CATEGORIES_AB)
+    assert len([next(arenas) for _ in range(1000)]) == 1000
+
+@pytest.mark.parametrize('weights', [
+    [1, 3],
+    [1, 1, 1],
+    [5, 0, 2, 1],
+    [12, 8, 8, 16, 4, 1],
+])
+def test_alias_table_gives_weight_probabilities(weights):
+    probabilities, aliases = _build_alias_table(weights)
+    sampled_probabilities = np.zeros(len(weights))
+    for idx, (probability, alias) in enumerate(zip(probabilities, aliases)):
+        sampled_probabilities[idx] += probability/len(weights)
+        sampled_probabilities[alias] += (1 - probability)/len(weights)
+    assert np.allclose(sampled_probabilities, np.array(weights)/np.sum(weights))
+
+def test_arena_sampler_samples_proportionally_to_weights():
+    arena_sampler = ArenaSampler(t=500, categories=CATEGORIES_AB, seed=7)
+    arenas = list(arena_sampler.sample(400).arenas.values())
+    assert arenas.count('b')/len(arenas) == pytest.approx(0.75, abs=0.1)
+
+def test_arena_sampler_weights_can_be_changed():
+    arena_sampler = ArenaSampler(t=500, categories=CATEGORIES_AB, seed=7)
+    assert arena_sampler.get_weights() == {('a', '_create_arena_a'): 1, ('b', '_create_arena_b'): 3}
+    arena_sampler.set_weights({('b', '_create_arena_b'): 0})
+    assert set(arena_sampler.sample(20).arenas.values()) == {'a'}
+
+@pytest.mark.parametrize('weights', [[0, 0], [1, -1]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        _build_alias_table(weights)
+
+@pytest.mark.parametrize('weights', [{('a', '_create_arena_a'): 0, ('b', '_create_arena_b'): 0},
+                                     {('a', '_create_arena_a'): -1}])
+def test_arena_sampler_rejects_invalid_weights(weights):
+    arena_sampler = ArenaSampler(t=500, categories=CATEGORIES_AB, seed=7)
+    with pytest.raises(ValueError):
+        arena_sampler.set_weights(weights)
+    assert arena_sampler.get_weights() == {('a', '_create_arena_a'): 1, ('b', '_create_arena_b'): 3}
+    with pytest.raises(ValueError):
+        ArenaSampler(t=500, categories=[('a', [(_create_arena_a, 0)], dict())])
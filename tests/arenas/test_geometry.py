@@ -5,7 +5,7 @@ from animalai.envs.arena_config import Vector3, RGB, Item, Arena, ArenaConfig
 from orangutan.arenas.geometry import (
     get_angle_looking_center, get_position_in_front_of_agent, _get_object_vertices,
     detect_collision_between_two_items, CollisionDetected, detect_object_out_of_arena,
-    detect_collisions
+    detect_collisions, collides
 )
 from orangutan.arenas.utils import _str_Vector3
 
@@ -61,6 +61,9 @@ def test_get_object_vertices(item, ref_angle, vertices):
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(2, 0, 0)], rotations=[45], sizes=[Vector3(2, 0, 2)])),
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(2, 0, 0)], rotations=[10], sizes=[Vector3(2, 0, 2)])),
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(2, 0, 0)], rotations=[], sizes=[Vector3(2, 0, 2)])),
+    # Crossing objects do not have any vertex inside the other
+    (Item(positions=[Vector3(5, 0, 5)], rotations=[0], sizes=[Vector3(10, 0, 1)]), Item(positions=[Vector3(5, 0, 5)], rotations=[0], sizes=[Vector3(1, 0, 10)])),
+    (Item(positions=[Vector3(0, 0, 0)], rotations=[45], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(1, 0, 1)], rotations=[45], sizes=[Vector3(2, 0, 2)])),
 ])
 def test_objects_do_collide(item_ref, item):
     with pytest.raises(CollisionDetected):
@@ -71,6 +74,9 @@ def test_objects_do_collide(item_ref, item):
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(0, 0, 2)], rotations=[0], sizes=[Vector3(2, 0, 2)])),
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(2, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)])),
     (Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(1.5, 0, 0)], rotations=[0], sizes=[Vector3(1, 0, 1)])),
+    # Rotated objects touching by one side
+    (Item(positions=[Vector3(0, 0, 0)], rotations=[45], sizes=[Vector3(2, 0, 2)]), Item(positions=[Vector3(2**0.5, 0, 2**0.5)], rotations=[45], sizes=[Vector3(2, 0, 2)])),
+    (Item(positions=[Vector3(0, 0, 0)], rotations=[30], sizes=[Vector3(2, 0, 4)]), Item(positions=[Vector3(3**0.5, 0, -1)], rotations=[30], sizes=[Vector3(2, 0, 4)])),
 ])
 def test_objects_dont_collide(item_ref, item):
     detect_collision_between_two_items(item_ref, item)
@@ -95,3 +101,26 @@ def test_collision_detected_is_raised_on_death_maze():
     with pytest.raises(CollisionDetected):
         for idx in range(1, 4):
             detect_collisions(arena.items[-idx], arena.items[:-idx])
+
+def _detect_collisions_returns_true(new_item, existing_items):
+    try:
+        detect_collisions(new_item, existing_items)
+    except CollisionDetected:
+        return True
+    return False
+
+def test_collides_gives_same_result_as_detect_collisions_on_death_maze():
+    arena = ArenaConfig(os.path.join(RESOURCES_PATH, 'death_maze.yaml')).arenas[0]
+    for idx in range(1, len(arena.items)):
+        expected = _detect_collisions_returns_true(arena.items[idx], arena.items[:idx])
+        assert collides(arena.items[idx], arena.items[:idx]) == expected
+
+def test_collides_with_object_out_of_arena():
+    item = Item(positions=[Vector3(0, 0, 0)], rotations=[0], sizes=[Vector3(2, 0, 2)])
+    assert collides(item, [])
+
+def test_collides_on_debug_mode_raises_with_description():
+    item = Item(positions=[Vector3(10, 0, 10)], rotations=[0], sizes=[Vector3(2, 0, 2)])
+    assert not collides(item, [], debug=True)
+    with pytest.raises(CollisionDetected, match='collides with'):
+        collides(item, [item], debug=True)
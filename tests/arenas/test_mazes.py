@@ -0,0 +1,180 @@
+import os
+import pytest
+import logging
+import numpy as np
+
+from orangutan.arenas.mazes import (
+    generate_mazes, generate_maze, enumerate_maze_layouts, get_dead_end_counts,
+    get_longest_path_lengths, ENUMERATION_N_DRAWS, N, S, W, E)
+from orangutan.arenas.spatial_reasoning import (
+    create_arena_with_walls_maze, create_arena_with_death_maze, create_arena_with_platform_maze,
+    _add_walls_maze, _get_cell_walls_positions_and_sizes, DIFFICULTY_LEVELS, WALL_HEIGHT,
+    MazeLibrary, WALLS_MAZE_LIBRARY, MAX_MAZE_GENERATION_TRIES,
+    _get_maze_layouts_entry, _load_maze_layouts)
+from orangutan.arenas import spatial_reasoning, utils
+
+
+def _get_reachable_cells(maze):
+    height, width = maze.shape
+    reachable, pending = {(0, 0)}, [(0, 0)]
+    while pending:
+        row, col = pending.pop()
+        for wall, neighbor in [(N, (row - 1, col)), (S, (row + 1, col)), (W, (row, col - 1)), (E, (row, col + 1))]:
+            if not maze[row, col] & wall and neighbor not in reachable:
+                reachable.add(neighbor)
+                pending.append(neighbor)
+    return reachable
+
+@pytest.mark.parametrize('width, height', [(1, 1), (3, 3), (5, 4), (2, 7)])
+def test_generated_mazes_are_perfect(width, height):
+    mazes = generate_mazes(50, width, height)
+    assert mazes.shape == (50, height, width)
+    for maze in mazes:
+        assert (maze[0] & N).all() and (maze[-1] & S).all()
+        assert (maze[:, 0] & W).all() and (maze[:, -1] & E).all()
+        # Walls are shared by neighbor cells
+        assert np.array_equal(maze[:-1] & S > 0, maze[1:] & N > 0)
+        assert np.array_equal(maze[:, :-1] & E > 0, maze[:, 1:] & W > 0)
+        # A tree that connects all the cells has n_cells - 1 passages
+        n_passages = np.count_nonzero(~maze[:, :-1] & E) + np.count_nonzero(~maze[:-1] & S)
+        assert n_passages == width*height - 1
+        assert len(_get_reachable_cells(maze)) == width*height
+
+def test_generated_mazes_are_different():
+    mazes = generate_mazes(20, 5, 5)
+    assert len(set(maze.tobytes() for maze in mazes)) > 1
+
+def test_walls_maze_uses_given_maze():
+    maze = generate_mazes(1, 3, 3)[0]
+    arenas = []
+    for _ in range(2):
+        arena = create_arena_with_walls_maze(t=250, difficulty='easy')
+        arena.items = []
+        _add_walls_maze(arena, n_cells=3, wall_thickness=1, maze=maze)
+        arenas.append(arena)
+    positions = [[(p.x, p.z) for item in arena.items for p in item.positions] for arena in arenas]
+    assert positions[0] == positions[1]
+
+@pytest.mark.parametrize('difficulty', DIFFICULTY_LEVELS)
+@pytest.mark.parametrize('func', [create_arena_with_walls_maze, create_arena_with_death_maze,
+                                  create_arena_with_platform_maze])
+def test_create_maze_arenas(func, difficulty):
+    arena = func(t=250, difficulty=difficulty)
+    assert arena.items
+
+@pytest.mark.parametrize('width, height', [(1, 1), (3, 3), (5, 4), (2, 7)])
+def test_generated_maze_is_perfect(width, height):
+    for _ in range(50):
+        maze = generate_maze(width, height)
+        assert maze.shape == (height, width)
+        assert maze.dtype == np.uint8
+        assert np.array_equal(maze[:-1] & S > 0, maze[1:] & N > 0)
+        assert np.array_equal(maze[:, :-1] & E > 0, maze[:, 1:] & W > 0)
+        assert len(_get_reachable_cells(maze)) == width*height
+
+def test_maze_metrics():
+    # Single row with all the inner walls removed
+    maze = np.array([[[N | S | W, N | S, N | S | E]]], dtype=np.uint8)
+    assert get_longest_path_lengths(maze).tolist() == [2]
+    assert get_dead_end_counts(maze).tolist() == [2]
+    mazes = generate_mazes(20, 4, 4)
+    assert (get_longest_path_lengths(mazes) >= 6).all()
+    assert (get_longest_path_lengths(mazes) <= 15).all()
+
+def test_enumerated_maze_layouts_are_different_perfect_mazes():
+    layouts, counts = enumerate_maze_layouts(3, 3)
+    assert len(set(layout.tobytes() for layout in layouts)) == len(layouts) == len(counts)
+    assert counts.sum() == ENUMERATION_N_DRAWS
+    for layout in layouts:
+        assert len(_get_reachable_cells(layout)) == 9
+    assert enumerate_maze_layouts(5, 5) == (None, None)
+
+def test_maze_library_is_the_same_on_every_instance():
+    library = MazeLibrary(_get_cell_walls_positions_and_sizes, WALL_HEIGHT)
+    other_library = MazeLibrary(_get_cell_walls_positions_and_sizes, WALL_HEIGHT)
+    np.random.seed(0)
+    assert np.array_equal(library.get_metrics(4)['mazes'], other_library.get_metrics(4)['mazes'])
+
+@pytest.mark.parametrize('n_cells', [3, 5])
+def test_maze_library_samples_by_difficulty(n_cells):
+    library = MazeLibrary(_get_cell_walls_positions_and_sizes, WALL_HEIGHT)
+    metrics = library.get_metrics(n_cells)
+    path_lengths = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        sampled_walls = [library.sample(n_cells, 1, difficulty) for _ in range(50)]
+        path_lengths[difficulty] = [_get_longest_path_length_from_walls(walls, n_cells)
+                                    for walls in sampled_walls]
+    assert max(path_lengths['easy']) <= min(path_lengths['medium'])
+    assert max(path_lengths['medium']) <= min(path_lengths['hard'])
+    assert min(metrics['longest_path_length']) <= min(path_lengths['easy'])
+
+def _get_longest_path_length_from_walls(walls, n_cells):
+    return get_longest_path_lengths([_get_maze_from_walls(walls, n_cells)])[0]
+
+def _get_maze_from_walls(walls, n_cells):
+    """ Rebuilds the maze looking for a wall at the middle of each side of the cells """
+    positions, sizes = walls
+    cell_size = 40/n_cells
+    maze = np.zeros((n_cells, n_cells), dtype=np.uint8)
+    maze[0] |= N
+    maze[-1] |= S
+    maze[:, 0] |= W
+    maze[:, -1] |= E
+    def is_covered(x, z):
+        return any(abs(p.x - x) < s.x/2 and abs(p.z - z) < s.z/2 for p, s in zip(positions, sizes))
+    for row in range(n_cells):
+        for col in range(n_cells):
+            if row < n_cells - 1 and is_covered((col + 0.5)*cell_size, (row + 1)*cell_size):
+                maze[row, col] |= S
+                maze[row + 1, col] |= N
+            if col < n_cells - 1 and is_covered((col + 1)*cell_size, (row + 0.5)*cell_size):
+                maze[row, col] |= E
+                maze[row, col + 1] |= W
+    return maze
+
+def test_big_mazes_are_generated_with_the_given_random_state():
+    samples = [WALLS_MAZE_LIBRARY.sample(5, 1, random_state=np.random.RandomState(0)) for _ in range(2)]
+    assert _to_floats(samples[0]) == _to_floats(samples[1])
+    assert len(set(str(_to_floats(WALLS_MAZE_LIBRARY.sample(5, 1))) for _ in range(20))) > 10
+
+def _to_floats(maze_walls):
+    positions, sizes = maze_walls
+    return [(p.x, p.z, s.x, s.z) for p, s in zip(positions, sizes)]
+
+def test_arena_items_are_not_shared_between_maze_arenas():
+    np.random.seed(0)
+    arenas = [create_arena_with_death_maze(t=250, difficulty='easy') for _ in range(2)]
+    assert not set(map(id, arenas[0].items)) & set(map(id, arenas[1].items))
+
+@pytest.mark.parametrize('n_cells', [3, 4, 5])
+@pytest.mark.parametrize('difficulty', DIFFICULTY_LEVELS)
+def test_sampled_maze_metrics_are_between_the_thresholds_of_the_difficulty(n_cells, difficulty):
+    thresholds = _get_maze_layouts_entry(n_cells)['thresholds']
+    level = DIFFICULTY_LEVELS.index(difficulty)
+    random_state = np.random.RandomState(0)
+    for _ in range(5):
+        maze = _get_maze_from_walls(WALLS_MAZE_LIBRARY.sample(n_cells, 1, difficulty, random_state), n_cells)
+        metrics = (get_longest_path_lengths([maze])[0], get_dead_end_counts([maze])[0])
+        # The layouts with the metrics of a threshold may be on both sides of it
+        if level > 0:
+            assert metrics >= thresholds[level - 1]
+        if level < len(thresholds):
+            assert metrics <= thresholds[level]
+
+def test_warning_is_logged_if_maze_of_requested_difficulty_is_not_found(caplog, monkeypatch):
+    monkeypatch.setattr(spatial_reasoning, '_get_maze_difficulty', lambda entry, maze: 'easy')
+    with caplog.at_level(logging.WARNING):
+        WALLS_MAZE_LIBRARY.sample(5, 1, 'hard', np.random.RandomState(0))
+    assert 'after %i tries' % MAX_MAZE_GENERATION_TRIES in caplog.text
+
+def test_maze_layouts_are_read_from_cache(tmpdir, monkeypatch):
+    monkeypatch.setenv(utils.CACHE_DIR_ENV_VAR, str(tmpdir))
+    layouts = _load_maze_layouts(3)
+    assert os.path.exists(str(tmpdir.join('maze_layouts_3.npz')))
+    assert len(tmpdir.listdir()) == 1
+    def fail(*args, **kwargs):
+        raise AssertionError('The layouts should not be enumerated')
+    monkeypatch.setattr(spatial_reasoning, 'enumerate_maze_layouts', fail)
+    cached_layouts = _load_maze_layouts(3)
+    for array, cached_array in zip(layouts, cached_layouts):
+        assert np.array_equal(array, cached_array)
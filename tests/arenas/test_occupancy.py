@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+from animalai.envs.arena_config import Vector3, Item, Arena
+
+from orangutan.arenas.geometry import collides
+from orangutan.arenas.occupancy import OccupancyGrid
+from orangutan.arenas.placement import place_items, get_items_sampler
+from orangutan.arenas import obstacles, avoidance
+
+
+def test_is_free():
+    wall = Item(name='Wall', sizes=[Vector3(4, 1, 2)], rotations=[0], positions=[Vector3(10, 0, 10)])
+    occupancy_grid = OccupancyGrid([wall])
+    assert not occupancy_grid.is_free(10, 10)
+    assert not occupancy_grid.is_free(11.9, 10.9)
+    assert occupancy_grid.is_free(10, 13)
+    assert occupancy_grid.is_free(30, 30)
+    assert not occupancy_grid.is_free(-1, 10)
+    assert not occupancy_grid.is_free(10, 41)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_sampled_positions_do_not_collide(seed, create_random_item):
+    np.random.seed(seed)
+    existing_items = [create_random_item() for _ in range(10)]
+    occupancy_grid = OccupancyGrid(existing_items)
+    positions = occupancy_grid.sample_free_positions(1, 50)
+    assert positions.shape == (50, 2)
+    for x, z in positions:
+        item = Item(name='Cardbox1', sizes=[Vector3(1.4, 1, 1.4)], rotations=[45], positions=[Vector3(x, 0, z)])
+        assert not collides(item, existing_items)
+
+def test_sample_free_positions_is_empty_when_arena_is_full():
+    wall = Item(name='Wall', sizes=[Vector3(40, 1, 40)], rotations=[0], positions=[Vector3(20, 0, 20)])
+    assert not len(OccupancyGrid([wall]).sample_free_positions(1, 10))
+
+def test_add_updates_distances():
+    occupancy_grid = OccupancyGrid()
+    distances = occupancy_grid.distances.copy()
+    assert occupancy_grid.sample_free_positions(15, 10).shape == (10, 2)
+    occupancy_grid.add(Item(name='Wall', sizes=[Vector3(2, 1, 2)], rotations=[0], positions=[Vector3(20, 0, 20)]))
+    assert (occupancy_grid.distances <= distances).all()
+    assert not len(occupancy_grid.sample_free_positions(15, 10))
+
+def test_place_items_with_occupancy_grid(create_random_item):
+    np.random.seed(7)
+    existing_items = [create_random_item() for _ in range(15)]
+    occupancy_grid = OccupancyGrid(existing_items)
+    for _ in range(20):
+        box, = place_items(get_items_sampler(
+            lambda: [Item(name='Cardbox1', sizes=[Vector3(2, 1, 2)])], occupancy_grid=occupancy_grid),
+            existing_items)
+        assert not collides(box, existing_items)
+        existing_items.append(box)
+        occupancy_grid.add(box)
+
+@pytest.mark.parametrize('module', [obstacles, avoidance])
+def test_rewards_are_placed_with_occupancy_grid(module, monkeypatch):
+    n_calls = []
+    sample_free_positions = OccupancyGrid.sample_free_positions
+    def counting_sample_free_positions(self, *args, **kwargs):
+        n_calls.append(1)
+        return sample_free_positions(self, *args, **kwargs)
+    monkeypatch.setattr(OccupancyGrid, 'sample_free_positions', counting_sample_free_positions)
+    random_state = np.random.RandomState(0)
+    for _ in range(10):
+        arena = Arena(t=250, items=[])
+        module._add_rewards_to_arena(arena, random_state=random_state)
+        # The goals are placed on top of or inside the other items
+        placed_items = [item for item in arena.items if 'Goal' not in item.name]
+        for idx, item in enumerate(placed_items):
+            assert not collides(item, placed_items[:idx])
+    assert n_calls
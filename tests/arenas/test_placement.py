@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+from animalai.envs.arena_config import Vector3, Item
+
+from orangutan.arenas.geometry import collides
+from orangutan.arenas.placement import (
+    place_items, get_items_sampler, get_free_positions, PlacementError, ObjectsGrid)
+
+
+def _create_box():
+    return [Item(name='Cardbox1', sizes=[Vector3(2, 1, 2)], rotations=[0])]
+
+def test_place_items_on_empty_arena():
+    box, = place_items(get_items_sampler(_create_box), [])
+    assert not collides(box, [])
+
+def test_place_items_does_not_collide_with_existing_items(create_random_item):
+    np.random.seed(7)
+    existing_items = [create_random_item() for _ in range(15)]
+    for _ in range(20):
+        box, = place_items(get_items_sampler(_create_box), existing_items)
+        assert not collides(box, existing_items)
+
+def test_place_items_moves_all_the_items_together():
+    def create_items():
+        return [Item(name='Wall', sizes=[Vector3(2, 1, 2)], rotations=[0]),
+                Item(name='Ramp', sizes=[Vector3(2, 1, 2)], rotations=[0], positions=[Vector3(0, 0, 2)])]
+    platform, ramp = place_items(get_items_sampler(create_items), [])
+    assert ramp.positions[0].x == platform.positions[0].x
+    assert ramp.positions[0].z == pytest.approx(platform.positions[0].z + 2)
+
+def test_place_items_raises_error_when_arena_is_full():
+    wall = Item(name='Wall', sizes=[Vector3(40, 1, 40)], rotations=[0], positions=[Vector3(20, 0, 20)])
+    with pytest.raises(PlacementError):
+        place_items(get_items_sampler(_create_box), [wall], max_batches=3)
+
+def test_get_free_positions_gives_same_result_as_collides(create_random_item):
+    np.random.seed(7)
+    for _ in range(20):
+        existing_items = [create_random_item() for _ in range(10)]
+        items = [create_random_item()]
+        relative_position = items[0].positions[0]
+        positions = np.random.uniform(0, 40, (50, 2)) - [relative_position.x, relative_position.z]
+        is_free = get_free_positions(items, existing_items, positions)
+        for position, position_is_free in zip(positions, is_free):
+            item = Item(positions=[Vector3(relative_position.x + position[0], 0, relative_position.z + position[1])],
+                        sizes=items[0].sizes, rotations=items[0].rotations)
+            assert position_is_free != collides(item, existing_items)
+
+def test_objects_grid_returns_all_the_pairs_whose_circles_overlap():
+    np.random.seed(7)
+    centers, radius = np.random.uniform(-5, 45, (100, 2)), np.random.uniform(0.1, 10, 100)
+    query_centers, query_radius = np.random.uniform(-5, 45, (50, 2)), np.random.uniform(0.1, 3, 50)
+    query_idx, object_idx = ObjectsGrid(centers, radius).get_close_pairs(query_centers, query_radius)
+    pairs = set(zip(query_idx, object_idx))
+    assert len(pairs) == len(query_idx)
+    distances = np.sqrt(np.sum((query_centers[:, np.newaxis] - centers)**2, axis=2))
+    for query, obj in np.argwhere(distances < query_radius[:, np.newaxis] + radius):
+        assert (query, obj) in pairs
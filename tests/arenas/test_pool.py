@@ -0,0 +1,86 @@
+import pytest
+import time
+
+from orangutan.arenas.pool import ArenaPool
+from orangutan.arenas.generation import CATEGORIES
+
+
+def _create_arena_a(t, random_state):
+    return 'a'
+
+def _create_arena_b(t, random_state):
+    return 'b'
+
+def _create_arena_that_fails(t, random_state):
+    raise ValueError('Could not create arena')
+
+def _create_arena_that_sometimes_fails(t, random_state):
+    if random_state.randint(2):
+        raise ValueError('Could not create arena')
+    return 'c'
+
+CATEGORIES_AB = [
+    ('a', [(_create_arena_a, 1)], dict()),
+    ('b', [(_create_arena_b, 3)], dict()),
+]
+
+
+@pytest.fixture
+def arena_pool():
+    arena_pool = ArenaPool(t=500, categories=CATEGORIES_AB, maxsize=4)
+    yield arena_pool
+    arena_pool.stop()
+
+def test_sample_returns_requested_number_of_arenas(arena_pool):
+    arena_config = arena_pool.sample(5)
+    assert sorted(arena_config.arenas.keys()) == list(range(5))
+    assert set(arena_config.arenas.values()).issubset({'a', 'b'})
+
+def test_categories_are_sampled_proportionally_to_weights(arena_pool):
+    arenas = list(arena_pool.sample(400).arenas.values())
+    assert arenas.count('b')/len(arenas) == pytest.approx(0.75, abs=0.1)
+
+def test_queues_are_bounded(arena_pool):
+    time.sleep(0.2)
+    metrics = arena_pool.get_metrics()
+    assert metrics['queue_depth'] == {'a': 4, 'b': 4}
+
+def test_metrics_count_sampled_arenas(arena_pool):
+    arena_pool.sample(3)
+    metrics = arena_pool.get_metrics()
+    assert metrics['n_sampled'] == 3
+    assert sum(metrics['n_produced'].values()) >= 3
+    assert metrics['consumer_wait'] >= 0
+    assert set(metrics['throughput'].keys()) == {'a', 'b'}
+    assert metrics['n_failures'] == {'a': 0, 'b': 0}
+
+def test_pool_with_default_categories():
+    arena_pool = ArenaPool(t=500, maxsize=2)
+    arena_config = arena_pool.sample(4)
+    arena_pool.stop()
+    assert len(arena_config.arenas) == 4
+    assert len(arena_pool.get_metrics()['queue_depth']) == len(CATEGORIES)
+
+def test_sample_raises_producer_exception_after_consecutive_failures():
+    arena_pool = ArenaPool(t=500, categories=[('failing', [(_create_arena_that_fails, 1)], dict())],
+                           max_consecutive_failures=3)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            arena_pool.sample(1)
+    arena_pool.stop()
+    assert arena_pool.get_metrics()['n_failures'] == {'failing': 3}
+
+def test_producer_retries_after_failures():
+    arena_pool = ArenaPool(t=500, categories=[('c', [(_create_arena_that_sometimes_fails, 1)], dict())],
+                           maxsize=2, seed=0)
+    arenas = list(arena_pool.sample(20).arenas.values())
+    arena_pool.stop()
+    assert arenas == ['c']*20
+    assert arena_pool.get_metrics()['n_failures']['c'] > 0
+
+def test_throughput_does_not_count_time_blocked_on_full_queue(arena_pool):
+    time.sleep(0.3)
+    metrics = arena_pool.get_metrics()
+    assert metrics['queue_depth'] == {'a': 4, 'b': 4}
+    # Creating the fake arenas takes microseconds, the producers are blocked the rest of the time
+    assert metrics['throughput']['a'] > 4/0.3*10
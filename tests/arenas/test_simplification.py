@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+from animalai.envs.arena_config import Vector3, RGB, Item, Arena
+
+from orangutan.arenas.simplification import merge_adjacent_objects, merge_boxes
+from orangutan.arenas.spatial_reasoning import WALLS_MAZE_LIBRARY, PLATFORM_MAZE_LIBRARY
+from orangutan.arenas.mazes import generate_mazes
+
+
+def _get_covered_cells(items, resolution=0.25):
+    """ Returns the number of times each cell of the arena is covered by an object """
+    centers = (np.arange(int(40/resolution)) + 0.5)*resolution
+    covered = np.zeros((len(centers), len(centers)), dtype=int)
+    for item in items:
+        for position, size in zip(item.positions, item.sizes):
+            covered += (np.abs(centers[:, np.newaxis] - position.x) < size.x/2) & \
+                (np.abs(centers[np.newaxis] - position.z) < size.z/2)
+    return covered
+
+def _get_covered_cells_by_boxes(positions, sizes):
+    return _get_covered_cells([Item(positions=positions, sizes=sizes)])
+
+@pytest.mark.parametrize('n_cells', [3, 4, 5])
+@pytest.mark.parametrize('wall_thickness', [1, 4])
+def test_merged_walls_maze_covers_the_same_area(n_cells, wall_thickness):
+    maze = generate_mazes(1, n_cells, n_cells, np.random.RandomState(n_cells))[0]
+    positions, sizes = WALLS_MAZE_LIBRARY._get_unmerged_walls(maze, wall_thickness)
+    merged_positions, merged_sizes = WALLS_MAZE_LIBRARY.get_walls(maze, wall_thickness)
+    assert len(merged_positions) == len(merged_sizes) < len(positions)
+    merged_covered = _get_covered_cells_by_boxes(merged_positions, merged_sizes)
+    assert np.array_equal(_get_covered_cells_by_boxes(positions, sizes) > 0, merged_covered > 0)
+    assert merged_covered.max() == 1
+
+def test_merged_platform_maze_covers_the_same_area():
+    maze = generate_mazes(1, 4, 4, np.random.RandomState(0))[0]
+    positions, sizes = PLATFORM_MAZE_LIBRARY._get_unmerged_walls(maze, 6)
+    merged_positions, merged_sizes = PLATFORM_MAZE_LIBRARY.get_walls(maze, 6)
+    assert len(merged_positions) < len(positions)
+    assert np.array_equal(_get_covered_cells_by_boxes(positions, sizes) > 0,
+                          _get_covered_cells_by_boxes(merged_positions, merged_sizes) > 0)
+
+def test_sampled_mazes_are_merged():
+    np.random.seed(0)
+    positions, sizes = WALLS_MAZE_LIBRARY.sample(4, 1)
+    assert len(merge_boxes(positions, sizes)[0]) == len(positions)
+
+def test_only_objects_with_same_appearance_are_merged():
+    def create_wall(x, name='Wall', rotation=0, color=None):
+        return Item(name=name, positions=[Vector3(x, 0, 10)], rotations=[rotation],
+                    sizes=[Vector3(2, 5, 1)], colors=[color] if color is not None else [])
+    arena = Arena(t=250, items=[
+        create_wall(1), create_wall(3),
+        create_wall(5, color=RGB(255, 0, 0)), create_wall(7, color=RGB(0, 0, 255)),
+        create_wall(9, rotation=90), create_wall(11),
+        create_wall(13, name='GoodGoal'), create_wall(15, name='GoodGoal'),
+    ])
+    assert merge_adjacent_objects(arena) == (8, 7)
+    names = sorted(item.name for item in arena.items)
+    assert names.count('GoodGoal') == 2
+    sizes_x = sorted(size.x for item in arena.items if item.name == 'Wall' for size in item.sizes)
+    assert sizes_x == [2, 2, 2, 2, 4]
+
+def test_objects_that_do_not_share_whole_side_are_not_merged():
+    arena = Arena(t=250, items=[Item(name='Wall', positions=[Vector3(1, 0, 10), Vector3(3, 0, 10.5)],
+                                     rotations=[0, 0], sizes=[Vector3(2, 5, 1), Vector3(2, 5, 2)])])
+    assert merge_adjacent_objects(arena) == (2, 2)
@@ -0,0 +1,18 @@
+import os
+import shutil
+import tempfile
+
+# orangutan.arenas.utils.CACHE_DIR_ENV_VAR, not imported because it needs animalai
+CACHE_DIR_ENV_VAR = 'ORANGUTAN_CACHE_DIR'
+_CACHE_DIR = None
+
+
+def pytest_configure(config):
+    """ The caches written while testing go to a temporary directory instead of the package """
+    global _CACHE_DIR
+    _CACHE_DIR = tempfile.mkdtemp()
+    os.environ[CACHE_DIR_ENV_VAR] = _CACHE_DIR
+
+def pytest_unconfigure(config):
+    os.environ.pop(CACHE_DIR_ENV_VAR, None)
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
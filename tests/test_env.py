@@ -49,3 +49,10 @@ def test_map_wrapper():
     for _ in range(10):
         env.step([1, 0])
     env.close()
+
+def test_map_wrapper_with_two_arenas():
+    env = _create_environment(os.path.join(RESOURCES_PATH, 'death_maze.yaml'), MapEnv, n_arenas=2)
+    for _ in range(10):
+        ret = env.step([[1, 0], [1, 0]])
+    assert ret['Learner'].trajectory_map.shape == (2, 60, 60, 1)
+    env.close()
@@ -0,0 +1,228 @@
+import pytest
+import threading
+import numpy as np
+
+pytest.importorskip('animalai')
+import orangutan.env
+from orangutan.env import EnvWrapper, MapEnv, ArenaRotation
+
+
+class FakeBrainInfo(object):
+    def __init__(self, n_arenas, done):
+        self.local_done = list(done) if isinstance(done, list) else [done]*n_arenas
+        self.vector_observations = np.ones((n_arenas, 3))
+        self.previous_vector_actions = np.ones((n_arenas, 2))
+        self.visual_observations = [np.zeros((n_arenas, 84, 84, 3))]
+
+
+class FakeUnityEnvironment(object):
+    """
+    Stand-in for UnityEnvironment whose episodes last episode_length steps on the arenas
+    with even index, the episodes of the arenas with odd index never end
+    """
+    episode_length = 3
+
+    def __init__(self, *args, n_arenas=1, **kwargs):
+        self.n_arenas = n_arenas
+        self.n_steps = 0
+        self.n_resets = 0
+        self.threads = set()
+        self.closed = False
+
+    def reset(self, arenas_configurations=None, train_mode=True):
+        self.n_resets += 1
+        self.threads.add(threading.current_thread())
+        return {'Learner': FakeBrainInfo(self.n_arenas, False)}
+
+    def step(self, vector_action=None):
+        self.n_steps += 1
+        self.threads.add(threading.current_thread())
+        done = [self.n_steps % self.episode_length == 0 and not idx % 2 for idx in range(self.n_arenas)]
+        return {'Learner': FakeBrainInfo(self.n_arenas, done)}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeArenaConfigProto(object):
+    def __init__(self, n_arenas):
+        self.n_arenas = n_arenas
+
+    def ByteSize(self):
+        return 10*self.n_arenas
+
+
+class FakeArenaConfig(object):
+    def __init__(self, n_arenas=0):
+        self.arenas = {idx: 'arena_%i' % idx for idx in range(n_arenas)}
+
+    def dict_to_arena_config(self):
+        return FakeArenaConfigProto(len(self.arenas))
+
+
+@pytest.fixture
+def fake_unity(monkeypatch):
+    monkeypatch.setattr(orangutan.env, 'UnityEnvironment', FakeUnityEnvironment)
+    monkeypatch.setattr(orangutan.env, 'ArenaConfig', FakeArenaConfig)
+
+
+@pytest.mark.parametrize('env_class', [EnvWrapper, MapEnv])
+def test_step_async_gives_same_results_as_step(fake_unity, env_class):
+    envs = [env_class(n_arenas=1) for _ in range(2)]
+    for env in envs:
+        env.reset(FakeArenaConfig(5))
+    for _ in range(7):
+        ret = envs[0].step([1, 0])
+        envs[1].step_async([1, 0])
+        ret_async = envs[1].step_wait()
+        assert ret['Learner'].local_done == ret_async['Learner'].local_done
+        if env_class is MapEnv:
+            assert np.array_equal(ret['Learner'].trajectory_map, ret_async['Learner'].trajectory_map)
+    assert envs[0]._env.n_resets == envs[1]._env.n_resets == 3
+    for env in envs:
+        env.close()
+
+def test_step_async_resets_on_background_thread(fake_unity):
+    env = EnvWrapper(n_arenas=1)
+    env.reset(FakeArenaConfig(5))
+    for _ in range(3):
+        env.step_async([1, 0])
+        env.step_wait()
+    assert env._env.n_resets == 2
+    assert len(env._env.threads) == 2
+    env.close()
+    assert env._env.closed
+
+def test_step_wait_without_step_async_raises(fake_unity):
+    env = EnvWrapper(n_arenas=1)
+    with pytest.raises(RuntimeError):
+        env.step_wait()
+
+def test_step_while_step_is_pending_raises(fake_unity):
+    env = EnvWrapper(n_arenas=1)
+    env.reset(FakeArenaConfig(5))
+    env.step_async([1, 0])
+    with pytest.raises(RuntimeError):
+        env.step([1, 0])
+    with pytest.raises(RuntimeError):
+        env.step_async([1, 0])
+    env.close()
+
+@pytest.mark.parametrize('env_class', [EnvWrapper, MapEnv])
+def test_reset_while_step_is_pending_raises(fake_unity, env_class):
+    env = env_class(n_arenas=1)
+    env.reset(FakeArenaConfig(5))
+    env.step_async([1, 0])
+    with pytest.raises(RuntimeError):
+        env.reset()
+    env.step_wait()
+    env.reset()
+    env.close()
+
+def test_arena_rotation_uses_all_arenas_before_repeating(fake_unity):
+    arena_rotation = ArenaRotation(FakeArenaConfig(5))
+    for _ in range(3):
+        arenas = [arena_rotation.sample().arenas[0] for _ in range(5)]
+        assert sorted(arenas) == ['arena_%i' % idx for idx in range(5)]
+
+def test_arena_rotation_returns_n_arenas(fake_unity):
+    arena_rotation = ArenaRotation(FakeArenaConfig(5))
+    arena_config = arena_rotation.sample(3)
+    assert sorted(arena_config.arenas.keys()) == [0, 1, 2]
+    assert len(set(arena_config.arenas.values())) == 3
+
+def test_reset_only_sends_next_arena(fake_unity):
+    env = EnvWrapper(n_arenas=1, measure_reset_bytes=True)
+    env.reset(FakeArenaConfig(5))
+    for _ in range(6):
+        env.step([1, 0])
+    assert env.reset_stats['n_resets'] == 3
+    assert env.reset_stats['bytes_sent'] == 3*10
+    assert env.reset_stats['bytes_saved'] == 3*40
+    env.close()
+
+class FakeArenaSource(object):
+    def __init__(self):
+        self.n_samples = 0
+
+    def sample(self, n_arenas=1):
+        self.n_samples += 1
+        return FakeArenaConfig(n_arenas)
+
+def test_reset_with_arena_source(fake_unity):
+    env = EnvWrapper(n_arenas=1, measure_reset_bytes=True)
+    arena_source = FakeArenaSource()
+    env.reset(arena_source)
+    for _ in range(3):
+        env.step([1, 0])
+    assert arena_source.n_samples == 2
+    assert env.reset_stats['bytes_saved'] == 0
+    env.close()
+
+@pytest.mark.parametrize('env_class', [EnvWrapper, MapEnv])
+def test_n_arenas_is_given_to_unity(fake_unity, env_class):
+    env = env_class(n_arenas=3)
+    env.reset(FakeArenaConfig(5))
+    ret = env.step([1, 0]*3)
+    assert len(ret['Learner'].local_done) == 3
+    env.close()
+
+def test_map_env_only_resets_maps_of_done_arenas(fake_unity):
+    env = MapEnv(n_arenas=2)
+    env.reset(FakeArenaConfig(5))
+    for step_idx in range(1, 7):
+        ret = env.step([1, 0]*2)
+        assert ret['Learner'].local_done == [step_idx % 3 == 0, False]
+        positions = env._arena_maps.position
+        if step_idx % 3 == 0:
+            assert np.array_equal(positions[0], [0, 0])
+        else:
+            assert not np.array_equal(positions[0], [0, 0])
+        assert not np.array_equal(positions[1], [0, 0])
+    assert len(ret['Learner'].trajectory_map) == 2
+    # With several arenas Unity resets each arena on its own
+    assert env._env._env.n_resets == 1
+    env.close()
+
+def test_reset_bytes_are_not_measured_by_default(fake_unity, monkeypatch):
+    def fail(self):
+        raise AssertionError('The protobuf message should not be built')
+    monkeypatch.setattr(FakeArenaConfig, 'dict_to_arena_config', fail)
+    env = EnvWrapper(n_arenas=1)
+    env.reset(FakeArenaConfig(5))
+    for _ in range(3):
+        env.step([1, 0])
+    assert env.reset_stats['n_resets'] == 2
+    assert env.reset_stats['bytes_sent'] == 0
+    env.close()
+
+def test_multiple_arenas_are_not_reset_by_default(fake_unity):
+    env = EnvWrapper(n_arenas=2)
+    env.reset(FakeArenaConfig(5))
+    for _ in range(9):
+        env.step([1, 0]*2)
+    assert env._env.n_resets == 1
+    env.close()
+
+def test_multiple_arenas_are_reset_every_n_episodes(fake_unity):
+    env = EnvWrapper(n_arenas=2, reset_every_n_episodes=2)
+    arena_source = FakeArenaSource()
+    env.reset(arena_source)
+    for step_idx in range(1, 13):
+        ret = env.step([1, 0]*2)
+        if step_idx % 6 == 0:
+            assert ret['Learner'].local_done == [True, True]
+        else:
+            assert ret['Learner'].local_done == [step_idx % 3 == 0, False]
+    assert env._env.n_resets == 3
+    assert arena_source.n_samples == 3
+    env.close()
+
+def test_map_env_resets_all_maps_when_arenas_are_reset(fake_unity):
+    env = MapEnv(n_arenas=2, reset_every_n_episodes=1)
+    env.reset(FakeArenaConfig(5))
+    for _ in range(3):
+        env.step([1, 0]*2)
+    assert env._env._env.n_resets == 2
+    assert np.array_equal(env._arena_maps.position, np.zeros((2, 2)))
+    env.close()
@@ -0,0 +1,44 @@
+"""
+Startup benchmark, each worker of SubprocessUnityEnvironment and the submission
+agent pay the import time of the modules
+"""
+import pytest
+import os
+import sys
+import subprocess
+
+LIBRARY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+IMPORT_TIME_BUDGET = {
+    'orangutan.map': 0.5,
+    'orangutan.env': 3.0,
+}
+LAZY_MODULES = ['matplotlib']
+
+
+def _import_module_on_new_interpreter(module):
+    """ Returns the time needed to import the module and the modules loaded after importing it """
+    code = '; '.join([
+        'import sys, time',
+        't0 = time.time()',
+        'import %s' % module,
+        'print(time.time() - t0)',
+        'print(" ".join(sys.modules))',
+    ])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([LIBRARY_PATH, os.getenv('PYTHONPATH', '')]))
+    output = subprocess.check_output([sys.executable, '-c', code], env=env).decode().splitlines()
+    return float(output[0]), output[1].split()
+
+def test_map_import_time_is_within_budget():
+    elapsed_time, modules = _import_module_on_new_interpreter('orangutan.map')
+    print('orangutan.map import time: %.3f s' % elapsed_time)
+    assert elapsed_time < IMPORT_TIME_BUDGET['orangutan.map']
+    for module in LAZY_MODULES:
+        assert module not in modules
+
+def test_env_import_time_is_within_budget():
+    pytest.importorskip('animalai')
+    elapsed_time, modules = _import_module_on_new_interpreter('orangutan.env')
+    print('orangutan.env import time: %.3f s' % elapsed_time)
+    assert elapsed_time < IMPORT_TIME_BUDGET['orangutan.env']
+    for module in LAZY_MODULES:
+        assert module not in modules
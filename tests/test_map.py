@@ -0,0 +1,191 @@
+import pytest
+import numpy as np
+
+from orangutan.map import ArenaMap, ArenaMapBatch, MAP_RADIUS, WORLD_RADIUS
+
+FORWARD = np.array([[1, 0]])
+TURN_LEFT = np.array([[0, 1]])
+TURN_RIGHT = np.array([[0, 2]])
+
+
+def _create_arena_map_with_random_trajectory(n_steps, t=None, seed=7):
+    np.random.seed(seed)
+    arena_map = ArenaMap(t)
+    for _ in range(n_steps):
+        speed = np.random.uniform(-10, 10, 2)
+        previous_action = np.random.randint(0, 3, (1, 2))
+        arena_map.add_point(speed, previous_action)
+    return arena_map
+
+def test_arena_map_starts_with_a_single_point():
+    arena_map = ArenaMap()
+    assert len(arena_map.positions) == 1
+    assert len(arena_map.orientations) == 1
+
+@pytest.mark.parametrize('t', [None, 10, 2000])
+def test_arena_map_stores_all_points(t):
+    arena_map = _create_arena_map_with_random_trajectory(1000, t)
+    assert len(arena_map.positions) == 1001
+    assert len(arena_map.orientations) == 1001
+
+def test_arena_map_moves_forward_on_positive_speed():
+    arena_map = ArenaMap()
+    arena_map.add_point(np.array([0, 16.25]), FORWARD)
+    assert pytest.approx([0, 1]) == arena_map.positions[-1].tolist()
+
+@pytest.mark.parametrize('previous_action, orientation', [
+    (TURN_LEFT, 6),
+    (TURN_RIGHT, -6),
+    (FORWARD, 0),
+])
+def test_arena_map_orientation(previous_action, orientation):
+    arena_map = ArenaMap()
+    arena_map.add_point(np.zeros(2), previous_action)
+    assert arena_map.orientations[-1] == orientation
+
+def test_arena_map_growth_does_not_change_trajectory():
+    arena_map_small = _create_arena_map_with_random_trajectory(500, t=10)
+    arena_map_big = _create_arena_map_with_random_trajectory(500, t=1000)
+    assert np.array_equal(arena_map_small.positions, arena_map_big.positions)
+    assert np.array_equal(arena_map_small.orientations, arena_map_big.orientations)
+
+def test_heatmap_has_current_position_on_center():
+    arena_map = _create_arena_map_with_random_trajectory(100)
+    heatmap = arena_map.get_heatmap(60)
+    assert heatmap.shape == (60, 60)
+    assert heatmap[29, 30] == 1
+
+def _get_reference_heatmap(positions, orientation, side):
+    """
+    Heatmap computed with the polar transformation of the centers of the visited cells of
+    the world raster, with the cell of the current position centered on that position
+    """
+    cell_size = 2*MAP_RADIUS/side
+    world_side = int(np.ceil(2*WORLD_RADIUS/cell_size))
+    cells = {}
+    for position in positions.astype(np.float64):
+        cell = tuple(np.clip(np.floor(position/cell_size + world_side/2), 0, world_side - 1))
+        cells[cell] = (np.array(cell) + 0.5 - world_side/2)*cell_size
+    cells[cell] = positions[-1].astype(np.float64)
+    positions = np.array(list(cells.values())) - cells[cell]
+    angles = np.arctan2(positions[:, 0], positions[:, 1]) - orientation*np.pi/180
+    radius = np.sqrt(np.sum(positions**2, axis=1))
+    positions[:, 0] = radius*np.sin(angles)
+    positions[:, 1] = radius*np.cos(angles)
+    scale = side/2/MAP_RADIUS
+    positions = (positions*scale + side//2).astype(int)
+    heatmap = np.zeros((side, side))
+    for position in positions:
+        if 0 <= position[0] < side and 0 <= position[1] < side:
+            heatmap[position[1], position[0]] = 1
+    return heatmap[::-1]
+
+@pytest.mark.parametrize('side', [20, 60])
+def test_heatmap_is_equal_to_reference(side):
+    np.random.seed(7)
+    arena_map = ArenaMap(side=side)
+    for _ in range(1000):
+        arena_map.add_point(np.random.uniform(-10, 10, 2), np.random.randint(0, 3, (1, 2)))
+    reference = _get_reference_heatmap(arena_map.positions, arena_map.orientations[-1], side)
+    assert np.array_equal(reference, arena_map.get_heatmap())
+
+def test_visited_cells_do_not_grow_if_agent_does_not_move():
+    arena_map = ArenaMap()
+    for _ in range(1000):
+        arena_map.add_point(np.zeros(2), TURN_LEFT)
+    assert np.count_nonzero(arena_map._cell_visits) == 1
+
+def test_world_raster_does_not_grow_with_the_episode():
+    arena_map = _create_arena_map_with_random_trajectory(10)
+    n_cells = arena_map._cell_visits.size
+    for _ in range(5000):
+        arena_map.add_point(np.random.uniform(-10, 10, 2), np.random.randint(0, 3, (1, 2)))
+    assert arena_map._cell_visits.size == n_cells
+    assert arena_map.get_heatmap().shape == (60, 60)
+
+def test_positions_out_of_the_world_raster_are_kept_on_the_border():
+    arena_map = ArenaMap()
+    for _ in range(1000):
+        arena_map.add_point(np.array([0, 16.25]), FORWARD)
+    assert np.sum(arena_map._cell_visits) == 1001
+    assert arena_map.get_heatmap()[29, 30] == 1
+
+@pytest.mark.parametrize('channels, n_channels', [
+    (['occupancy'], 1),
+    (['occupancy', 'visits', 'recency'], 3),
+    (['orientation'], 2),
+    (['occupancy', 'visits', 'recency', 'orientation'], 5),
+])
+def test_heatmap_channels_shape(channels, n_channels):
+    arena_map = _create_arena_map_with_random_trajectory(100)
+    assert arena_map.get_heatmap_channels(60, channels).shape == (60, 60, n_channels)
+
+def test_occupancy_channel_is_equal_to_heatmap():
+    arena_map = _create_arena_map_with_random_trajectory(100)
+    heatmap = arena_map.get_heatmap_channels(60, ['occupancy'])[:, :, 0]
+    assert np.array_equal(arena_map.get_heatmap(60), heatmap)
+
+def test_visits_channel_counts_all_the_steps():
+    arena_map = _create_arena_map_with_random_trajectory(100)
+    heatmap = arena_map.get_heatmap_channels(60, ['visits'])[:, :, 0]
+    assert np.sum(heatmap) == 101
+
+def test_recency_channel_is_one_on_current_position():
+    arena_map = _create_arena_map_with_random_trajectory(100)
+    heatmap = arena_map.get_heatmap_channels(60, ['recency'])[:, :, 0]
+    assert heatmap[29, 30] == 1
+    assert np.max(heatmap) == 1
+
+def test_orientation_channel_when_turning_and_moving_forward():
+    arena_map = ArenaMap()
+    for _ in range(15):
+        arena_map.add_point(np.zeros(2), TURN_LEFT)
+    for _ in range(100):
+        arena_map.add_point(np.array([0, 16.25]), FORWARD)
+    heatmap = arena_map.get_heatmap_channels(60, ['orientation'])
+    assert pytest.approx(1) == heatmap[29, 30, 0]
+    assert pytest.approx(0) == heatmap[29, 30, 1]
+
+def test_unknown_channel_raises_error():
+    with pytest.raises(KeyError):
+        ArenaMap().get_heatmap_channels(60, ['color'])
+
+def _step_arena_maps_and_batch(arena_maps, arena_map_batch, n_steps):
+    for _ in range(n_steps):
+        speeds = np.random.uniform(-10, 10, (len(arena_maps), 2))
+        previous_actions = np.random.randint(0, 3, (len(arena_maps), 2))
+        arena_map_batch.add_points(speeds, previous_actions)
+        for arena_map, speed, previous_action in zip(arena_maps, speeds, previous_actions):
+            arena_map.add_point(speed, previous_action[np.newaxis])
+
+def test_arena_map_batch_is_equal_to_many_arena_maps():
+    np.random.seed(7)
+    arena_maps = [ArenaMap() for _ in range(4)]
+    arena_map_batch = ArenaMapBatch(4)
+    _step_arena_maps_and_batch(arena_maps, arena_map_batch, 300)
+    heatmaps = arena_map_batch.get_heatmaps(60)
+    assert heatmaps.shape == (4, 60, 60)
+    for heatmap, arena_map in zip(heatmaps, arena_maps):
+        assert np.array_equal(arena_map.get_heatmap(60), heatmap)
+
+def test_arena_map_batch_channels_are_equal_to_many_arena_maps():
+    np.random.seed(7)
+    channels = ['occupancy', 'visits', 'recency', 'orientation']
+    arena_maps = [ArenaMap() for _ in range(3)]
+    arena_map_batch = ArenaMapBatch(3)
+    _step_arena_maps_and_batch(arena_maps, arena_map_batch, 300)
+    heatmaps = arena_map_batch.get_heatmaps_channels(60, channels)
+    assert heatmaps.shape == (3, 60, 60, 5)
+    for heatmap, arena_map in zip(heatmaps, arena_maps):
+        assert np.allclose(arena_map.get_heatmap_channels(60, channels), heatmap, atol=1e-5)
+
+def test_arena_map_batch_only_resets_masked_arenas():
+    np.random.seed(7)
+    arena_maps = [ArenaMap() for _ in range(3)]
+    arena_map_batch = ArenaMapBatch(3)
+    _step_arena_maps_and_batch(arena_maps, arena_map_batch, 100)
+    arena_map_batch.reset(np.array([False, True, False]))
+    arena_maps[1] = ArenaMap()
+    _step_arena_maps_and_batch(arena_maps, arena_map_batch, 100)
+    for heatmap, arena_map in zip(arena_map_batch.get_heatmaps(60), arena_maps):
+        assert np.array_equal(arena_map.get_heatmap(60), heatmap)